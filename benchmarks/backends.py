@@ -0,0 +1,65 @@
+"""Validation time of the 'voluptuous' and 'compiled' backends on the same
+documents.
+"""
+from voluptuary import BACKENDS, to_validator
+
+from .common import best_of, report
+
+SCHEMA = {
+    'type': 'object',
+    'required': ['id', 'name', 'tags'],
+    'properties': {
+        'id': {'type': 'integer', 'minimum': 0},
+        'name': {'type': 'string'},
+        'score': {'type': 'number', 'minimum': 0, 'maximum': 100},
+        'tags': {
+            'type': 'array',
+            'items': {'type': 'string'},
+            'maxItems': 10,
+        },
+        'location': {
+            'type': 'object',
+            'properties': {
+                'lat': {'type': 'number'},
+                'lon': {'type': 'number'},
+            },
+            'additionalProperties': False,
+        },
+    },
+}
+
+DOCUMENTS = [
+    {
+        'id': i,
+        'name': 'item-%s' % i,
+        'score': i % 100,
+        'tags': ['a', 'b', 'c'],
+        'location': {'lat': 1.5, 'lon': -2.5},
+    } for i in range(1000)
+]
+
+
+def validate_all(validator):
+    for document in DOCUMENTS:
+        validator(document)
+
+
+def main():
+    rows = []
+    for backend in BACKENDS:
+        validator = to_validator(SCHEMA, backend=backend)
+        seconds = best_of(lambda: validate_all(validator))
+        rows.append((
+            backend,
+            '%.2f' % (seconds * 1e3),
+            '%.0f' % (len(DOCUMENTS) / seconds),
+        ))
+    report(
+        'validation of %s documents' % len(DOCUMENTS),
+        ('backend', 'total ms', 'docs/s'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""`validate_many` against a plain loop over the converted schema, for a
+batch where one in ten records is invalid.
+"""
+import voluptuous
+
+from voluptuary import BACKENDS, to_validator
+from voluptuary.batch import validate_many
+
+from .backends import SCHEMA
+from .common import best_of, report
+
+N_RECORDS = 10000
+
+
+def make_records():
+    records = []
+    for i in range(N_RECORDS):
+        record = {'id': i, 'name': 'item-%s' % i, 'tags': ['a', 'b']}
+        if i % 10 == 0:
+            record['id'] = -1
+        records.append(record)
+    return records
+
+
+def plain_loop(schema, records):
+    results = []
+    for record in records:
+        try:
+            results.append((True, schema(record), []))
+        except voluptuous.MultipleInvalid as e:
+            results.append((False, record, e.errors))
+    return results
+
+
+def main():
+    records = make_records()
+    rows = []
+    for backend in BACKENDS:
+        schema = to_validator(SCHEMA, backend=backend)
+        loop = best_of(lambda: plain_loop(schema, records))
+        batch = best_of(lambda: list(validate_many(schema, records)))
+        for name, seconds in (('loop', loop), ('validate_many', batch)):
+            rows.append((
+                backend,
+                name,
+                '%.1f' % (seconds * 1e3),
+                '%.0f' % (N_RECORDS / seconds),
+            ))
+    report(
+        'validation of %s records' % N_RECORDS,
+        ('backend', 'method', 'total ms', 'records/s'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
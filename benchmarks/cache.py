@@ -0,0 +1,67 @@
+"""Cold start cost of converting many schemas, with and without a warm
+`SchemaCache`.
+"""
+import shutil
+import tempfile
+
+from voluptuary import to_voluptuous
+from voluptuary.cache import SchemaCache
+
+from .common import best_of, report
+
+
+def make_schemas(n_schemas):
+    return [
+        {
+            'definitions': {
+                'id': {'type': 'integer', 'minimum': 0},
+                'name': {'type': 'string', 'maxLength': 64},
+            },
+            'type': 'object',
+            'required': ['id'],
+            'properties': dict(
+                {
+                    'id': {'$ref': '#/definitions/id'},
+                    'tags': {
+                        'type': 'array',
+                        'items': {'$ref': '#/definitions/name'},
+                    },
+                }, **{
+                    'field%s' % j: {'type': 'number', 'maximum': i}
+                    for j in range(20)
+                }
+            ),
+        } for i in range(n_schemas)
+    ]
+
+
+def main():
+    schemas = make_schemas(200)
+    directory = tempfile.mkdtemp()
+    try:
+        cache = SchemaCache(directory)
+        for schema in schemas:
+            cache.to_voluptuous(schema)
+
+        def convert():
+            for schema in schemas:
+                to_voluptuous(schema)
+
+        def load():
+            cache = SchemaCache(directory)
+            for schema in schemas:
+                cache.to_voluptuous(schema)
+
+        rows = [
+            ('to_voluptuous', '%.1f' % (best_of(convert, repeat=3) * 1e3)),
+            ('warm SchemaCache', '%.1f' % (best_of(load, repeat=3) * 1e3)),
+        ]
+    finally:
+        shutil.rmtree(directory)
+    report(
+        'startup for %s schemas' % len(schemas), ('method', 'total ms'), rows
+    )
+
+
+if __name__ == '__main__':
+    main()
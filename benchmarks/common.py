@@ -0,0 +1,28 @@
+"""Small helpers shared by the benchmark scripts
+
+Each benchmark is a plain script, run from the repository root with e.g.
+
+    $ python -m benchmarks.object_width
+"""
+import timeit
+
+
+def best_of(func, number=1, repeat=5):
+    """Return the best time (in seconds) of a single call to `func`"""
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def report(title, header, rows):
+    """Print a simple table of benchmark results"""
+    print(title)
+    print('-' * len(title))
+    widths = [
+        max(len(str(x)) for x in column)
+        for column in zip(header, *rows)
+    ]
+    fmt = '  '.join('{:>%s}' % w for w in widths)
+    print(fmt.format(*header))
+    for row in rows:
+        print(fmt.format(*row))
+    print()
@@ -0,0 +1,150 @@
+"""Schemas and documents for comparing validators
+
+Each corpus is a `Corpus(name, schema, documents)`. The documents are all
+valid, so every engine does the full amount of work on each of them.
+"""
+import collections
+
+Corpus = collections.namedtuple('Corpus', ['name', 'schema', 'documents'])
+
+
+def deep_nesting(depth=40, n_documents=200):
+    """Objects nested `depth` levels deep, each level with a few values"""
+    schema = {'type': 'object', 'properties': {'leaf': {'type': 'boolean'}}}
+    for _ in range(depth):
+        schema = {
+            'type': 'object',
+            'required': ['id'],
+            'properties': {
+                'id': {'type': 'integer', 'minimum': 0},
+                'name': {'type': 'string'},
+                'child': schema,
+            },
+            'additionalProperties': False,
+        }
+
+    def make_document(i):
+        document = {'leaf': True}
+        for level in range(depth):
+            document = {'id': i + level, 'name': 'n', 'child': document}
+        return document
+
+    return Corpus(
+        'deep nesting', schema, [make_document(i) for i in range(n_documents)]
+    )
+
+
+_WIDE_TYPES = (
+    ({'type': 'integer', 'minimum': 0}, lambda i: i),
+    ({'type': 'number', 'maximum': 1e9}, lambda i: i / 2),
+    ({'type': 'string'}, lambda i: 'value-%s' % i),
+    ({'type': 'boolean'}, lambda i: i % 2 == 0),
+    ({'type': 'null'}, lambda i: None),
+)
+
+
+def wide_objects(n_properties=200, n_documents=200):
+    """Flat objects with many properties of mixed types"""
+    properties = {
+        'p%s' % i: _WIDE_TYPES[i % len(_WIDE_TYPES)][0]
+        for i in range(n_properties)
+    }
+    schema = {
+        'type': 'object',
+        'required': sorted(properties)[:n_properties // 2],
+        'properties': properties,
+        'additionalProperties': False,
+    }
+    documents = [
+        {
+            'p%s' % i: _WIDE_TYPES[i % len(_WIDE_TYPES)][1](i + j)
+            for i in range(n_properties)
+        } for j in range(n_documents)
+    ]
+    return Corpus('wide objects', schema, documents)
+
+
+def long_arrays(length=1000, n_documents=20):
+    """Long arrays of small objects"""
+    schema = {
+        'type': 'array',
+        'items': {
+            'type': 'object',
+            'required': ['x', 'y'],
+            'properties': {
+                'x': {'type': 'number'},
+                'y': {'type': 'number'},
+                'label': {'type': 'string'},
+            },
+        },
+        'maxItems': length,
+    }
+    documents = [
+        [{'x': i, 'y': i * 0.5, 'label': 'p'} for i in range(length)]
+        for _ in range(n_documents)
+    ]
+    return Corpus('long arrays', schema, documents)
+
+
+def heavy_refs(n_definitions=50, depth=6, n_documents=20):
+    """A recursive tree, whose nodes refer to many shared definitions"""
+    definitions = {
+        'field%s' % i: {'type': 'string' if i % 2 else 'integer'}
+        for i in range(n_definitions)
+    }
+    definitions['node'] = {
+        'type': 'object',
+        'properties': dict(
+            {
+                'field%s' % i: {'$ref': '#/definitions/field%s' % i}
+                for i in range(0, n_definitions, 5)
+            },
+            children={
+                'type': 'array',
+                'items': {'$ref': '#/definitions/node'},
+            },
+        ),
+    }
+    schema = {'definitions': definitions, '$ref': '#/definitions/node'}
+
+    def make_node(level):
+        node = {
+            'field%s' % i: 'a' if i % 2 else i
+            for i in range(0, n_definitions, 5)
+        }
+        if level < depth:
+            node['children'] = [make_node(level + 1), make_node(level + 1)]
+        return node
+
+    tree = make_node(0)
+    return Corpus('heavy $ref', schema, [tree] * n_documents)
+
+
+def any_of(n_branches=8, n_documents=1000):
+    """Documents matching one of several object shapes, spread evenly"""
+    branches = [
+        {
+            'type': 'object',
+            'required': ['kind', 'value%s' % i],
+            'properties': {
+                'kind': {'type': 'string'},
+                'value%s' % i: {'type': 'integer'},
+            },
+        } for i in range(n_branches)
+    ]
+    schema = {'anyOf': branches}
+    documents = [
+        {'kind': 'k', 'value%s' % (i % n_branches): i}
+        for i in range(n_documents)
+    ]
+    return Corpus('anyOf', schema, documents)
+
+
+def all_corpora():
+    return [
+        deep_nesting(),
+        wide_objects(),
+        long_arrays(),
+        heavy_refs(),
+        any_of(),
+    ]
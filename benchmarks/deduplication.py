@@ -0,0 +1,71 @@
+"""Conversion time and memory of a schema which repeats the same
+subschemas many times, with and without deduplication.
+"""
+import tracemalloc
+
+import voluptuary
+from voluptuary import Converter
+
+from .common import best_of, report
+
+ADDRESS = {
+    'type': 'object',
+    'required': ['street', 'city'],
+    'properties': {
+        'street': {'maxLength': 255},
+        'city': {'maxLength': 255},
+        'zip': {'type': 'string'},
+        'number': {'type': 'integer', 'minimum': 0},
+    },
+}
+
+
+def make_schema(n_properties):
+    return {
+        'type': 'object',
+        'properties': {
+            'address%s' % i: ADDRESS for i in range(n_properties)
+        },
+    }
+
+
+def measure(schema):
+    seconds = best_of(lambda: Converter(schema).convert())
+    tracemalloc.start()
+    converter = Converter(schema)
+    result = converter.convert()
+    del converter._interned, converter._ref_cache, converter._resolver
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return seconds, size, converter.deduplicated
+
+
+def main():
+    schema = make_schema(500)
+    rows = []
+    for name in ('deduplicated', 'not deduplicated'):
+        if name == 'not deduplicated':
+            # every subschema looks unique
+            original = voluptuary.canonical_key
+            voluptuary.canonical_key = lambda schema, memo=None: None
+        try:
+            seconds, size, deduplicated = measure(schema)
+        finally:
+            if name == 'not deduplicated':
+                voluptuary.canonical_key = original
+        rows.append((
+            name,
+            '%.1f' % (seconds * 1e3),
+            '%.0f' % (size / 1024),
+            deduplicated,
+        ))
+    report(
+        'conversion of %s repeated address objects' % 500,
+        ('', 'total ms', 'memory KiB', 'nodes deduplicated'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Validation time of a `oneOf` over many object variants, which are told
+apart by the value of their "type" property, with and without dispatching
+on that value.
+"""
+import voluptuary
+import voluptuary.compiled
+from voluptuary import BACKENDS, to_validator
+
+from .common import best_of, report
+
+N_VARIANTS = 40
+
+
+def make_schema():
+    return {
+        'oneOf': [
+            {
+                'type': 'object',
+                # `enum` is not enforced without dispatching, so each
+                # variant also requires its own payload
+                'required': ['type', 'id', 'payload%s' % i],
+                'properties': {
+                    'type': {'type': 'string', 'enum': ['event%s' % i]},
+                    'id': {'type': 'integer'},
+                    'payload%s' % i: {'type': 'string'},
+                },
+            } for i in range(N_VARIANTS)
+        ],
+    }
+
+
+DOCUMENTS = [
+    {
+        'type': 'event%s' % (i % N_VARIANTS),
+        'id': i,
+        'payload%s' % (i % N_VARIANTS): 'x',
+    } for i in range(1000)
+]
+
+
+def validate_all(validator):
+    for document in DOCUMENTS:
+        validator(document)
+
+
+def measure(backend, dispatch):
+    if not dispatch:
+        original = voluptuary.discriminate
+        voluptuary.discriminate = voluptuary.compiled.discriminate = \
+            lambda schemas, resolver: None
+    try:
+        validator = to_validator(make_schema(), backend=backend)
+    finally:
+        if not dispatch:
+            voluptuary.discriminate = voluptuary.compiled.discriminate = \
+                original
+    return best_of(lambda: validate_all(validator))
+
+
+def main():
+    rows = []
+    for backend in BACKENDS:
+        for dispatch in (False, True):
+            seconds = measure(backend, dispatch)
+            rows.append((
+                backend,
+                'dispatch' if dispatch else 'try every variant',
+                '%.2f' % (seconds * 1e3),
+                '%.0f' % (len(DOCUMENTS) / seconds),
+            ))
+    report(
+        'validation of %s documents against oneOf %s variants'
+        % (len(DOCUMENTS), N_VARIANTS),
+        ('backend', '', 'total ms', 'docs/s'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""Validation time of values against large enums, with `Enum` (a set
+lookup) and voluptuous' `In` over a list (a linear scan).
+"""
+from voluptuous import In
+
+from voluptuary import Enum
+
+from .common import best_of, report
+
+SIZES = (10, 250, 5000)
+N_VALUES = 10000
+
+
+def main():
+    rows = []
+    for size in SIZES:
+        codes = ['C%05d' % i for i in range(size)]
+        values = [codes[i % size] for i in range(N_VALUES)]
+        row = [size]
+        for validator in (Enum(codes), In(codes)):
+
+            def validate_all():
+                for value in values:
+                    validator(value)
+
+            seconds = best_of(validate_all, repeat=3)
+            row.append('%.0f' % (N_VALUES / seconds))
+        rows.append(row)
+    report(
+        'validation of %s strings' % N_VALUES,
+        ('enum size', 'Enum values/s', 'In values/s'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Validation time when reporting every error, at most 10 errors, and only
+the first error (fail fast), of valid documents and of documents with an
+error in each of many properties.
+"""
+from voluptuary import BACKENDS, to_validator
+
+from .common import best_of, report
+
+N_PROPERTIES = 100
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'p%s' % i: {'type': 'integer', 'minimum': 0}
+        for i in range(N_PROPERTIES)
+    },
+}
+
+VALID = [{'p%s' % i: i for i in range(N_PROPERTIES)}] * 200
+INVALID = [{'p%s' % i: -1 for i in range(N_PROPERTIES)}] * 200
+
+
+def validate_all(validator, documents):
+    for document in documents:
+        try:
+            validator(document)
+        except Exception:
+            pass
+
+
+def main():
+    rows = []
+    for backend in BACKENDS:
+        for name, max_errors in (
+            ('collect all', None),
+            ('at most 10', 10),
+            ('fail fast', 1),
+        ):
+            validator = to_validator(SCHEMA, backend, max_errors=max_errors)
+            valid = best_of(lambda: validate_all(validator, VALID))
+            invalid = best_of(lambda: validate_all(validator, INVALID))
+            rows.append((
+                backend,
+                name,
+                '%.0f' % (len(VALID) / valid),
+                '%.0f' % (len(INVALID) / invalid),
+            ))
+    report(
+        'validation of objects with %s properties' % N_PROPERTIES,
+        ('backend', 'errors', 'valid docs/s', 'invalid docs/s'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
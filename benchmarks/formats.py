@@ -0,0 +1,71 @@
+"""Time taken by the checker of each format in `voluptuary.formats`, on
+valid strings, compared to a generic parser where there is an obvious one.
+"""
+import datetime
+import ipaddress
+
+from voluptuary.formats import FORMATS
+
+from .common import best_of, report
+
+VALUES = {
+    'date-time': ['2017-07-21T17:32:28Z', '2016-02-29T00:00:00.5+01:00'],
+    'email': ['first.last+tag@example.co.uk', 'a@b.org'],
+    'hostname': ['api.eu-west-1.example.com', 'localhost'],
+    'ipv4': ['192.168.1.255', '10.0.0.1'],
+    'ipv6': ['2001:db8::ff00:42:8329', 'fe80::1:2:3:4'],
+    'uri': ['https://example.com/a/b?c=d#e', 'urn:isbn:0451450523'],
+}
+N_VALUES = 10000
+
+
+def _strptime(value):
+    if '.' in value:
+        datetime.datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f%z')
+    else:
+        datetime.datetime.strptime(value, '%Y-%m-%dT%H:%M:%S%z')
+    return True
+
+
+def _ipaddress(value):
+    ipaddress.IPv4Address(value)
+    return True
+
+
+BASELINES = {
+    'date-time': ('datetime.strptime', _strptime),
+    'ipv4': ('ipaddress', _ipaddress),
+}
+
+
+def values_per_second(checker, values):
+
+    def check_all():
+        for value in values:
+            checker(value)
+
+    return len(values) / best_of(check_all, repeat=3)
+
+
+def main():
+    rows = []
+    for name, examples in sorted(VALUES.items()):
+        values = (examples * N_VALUES)[:N_VALUES]
+        checker = FORMATS[name]
+        assert all(checker(value) for value in examples)
+        row = [name, '%.0f' % values_per_second(checker, values)]
+        if name in BASELINES:
+            baseline, check = BASELINES[name]
+            row += [baseline, '%.0f' % values_per_second(check, values)]
+        else:
+            row += ['-', '-']
+        rows.append(row)
+    report(
+        'format checks of %s strings' % N_VALUES,
+        ('format', 'values/s', 'baseline', 'baseline values/s'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Time taken by `import voluptuary`, measured with `python -X importtime`
+in fresh interpreters.
+"""
+import subprocess
+import sys
+
+from .common import report
+
+MODULES = ('voluptuary', 'voluptuous', 'jsonschema')
+
+
+def import_times(statement):
+    """Return the cumulative import time (in us) of each top level module
+    imported while running `statement`
+    """
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    ).stderr
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        if name in MODULES:
+            times[name] = int(cumulative)
+    return times
+
+
+def main(repeat=5):
+    rows = []
+    for statement in (
+        'import voluptuary',
+        'import voluptuary; voluptuary.to_voluptuous('
+        '{"definitions": {"a": {}}, "$ref": "#/definitions/a"})',
+    ):
+        runs = [import_times(statement) for _ in range(repeat)]
+        best = {
+            name: min(run.get(name, 0) for run in runs)
+            for name in MODULES
+        }
+        rows.append(
+            [statement[:40]] +
+            ['%.1f' % (best[name] / 1e3) if best[name] else '-'
+             for name in MODULES]
+        )
+    report(
+        'import time (ms, best of %s)' % repeat,
+        ('statement', ) + MODULES,
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Conversion time of a new version of a large bundled schema, converting
+it from scratch and updating an incremental `Converter`.
+
+Each new version changes one definition. The definitions refer to each
+other in a chain, so changing an early one invalidates more of the schema
+than changing a late one.
+"""
+import copy
+import json
+
+from voluptuary import Converter
+
+from .common import best_of, report
+
+
+def make_bundle(n_definitions):
+    """Many distinct definitions, each referring to the one before it"""
+    definitions = {}
+    for i in range(n_definitions):
+        properties = {
+            'id%s' % i: {'type': 'integer', 'minimum': i},
+            'name%s' % i: {'type': 'string', 'maxLength': i + 1},
+            'tags': {
+                'type': 'array',
+                'items': {'type': 'string', 'pattern': '^t%s' % i},
+            },
+            'nested': {
+                'type': 'object',
+                'properties': {
+                    'x%s' % i: {'type': 'number'},
+                    'y': {'enum': [i, 'a%s' % i]},
+                },
+            },
+        }
+        if i:
+            properties['previous'] = {'$ref': '#/definitions/d%s' % (i - 1)}
+        definitions['d%s' % i] = {
+            'type': 'object',
+            'required': ['id%s' % i],
+            'properties': properties,
+        }
+    return {
+        'definitions': definitions,
+        'type': 'object',
+        'properties': {
+            'd%s' % i: {'$ref': '#/definitions/d%s' % i}
+            for i in range(0, n_definitions, 7)
+        },
+    }
+
+
+def new_version(schema, i, minimum):
+    schema = copy.deepcopy(schema)
+    schema['definitions']['d%s' % i]['properties']['id%s' % i]['minimum'] = (
+        minimum
+    )
+    return schema
+
+
+def main(n_definitions=2000):
+    schema = make_bundle(n_definitions)
+    rows = []
+    for changed in (n_definitions - 1, n_definitions * 3 // 4, 0):
+        versions = [new_version(schema, changed, -i) for i in range(1, 6)]
+        full = best_of(
+            lambda: Converter(versions[0]).convert(), repeat=3
+        )
+        converter = Converter(schema, incremental=True)
+        converter.convert()
+        versions = iter(versions * 2)
+        update = best_of(
+            lambda: converter.update(next(versions)), repeat=5
+        )
+        rows.append((
+            'd%s' % changed,
+            '%.0f' % (full * 1e3),
+            '%.0f' % (update * 1e3),
+            '%.1fx' % (full / update),
+        ))
+    report(
+        'new version of a %.1f MB schema of %s definitions'
+        % (len(json.dumps(schema)) / 1e6, n_definitions),
+        ('changed', 'full ms', 'update ms', 'speedup'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Throughput of `is_valid`, of catching the `Invalid` raised by validation,
+and of validating `anyOf` schemas (whose branches are probed first).
+
+Half of the documents are invalid, so the cost of building errors shows.
+"""
+import voluptuous
+
+from voluptuary import BACKENDS, to_validator
+
+from .common import best_of, report
+from .corpora import any_of
+
+CORPUS = any_of()
+DOCUMENTS = [
+    document if i % 2 else dict(document, kind=1)
+    for i, document in enumerate(CORPUS.documents)
+]
+
+
+def catching_invalid(validate):
+
+    def is_valid(value):
+        try:
+            validate(value)
+        except voluptuous.Invalid:
+            return False
+        return True
+
+    return is_valid
+
+
+def main():
+    rows = []
+    for backend in BACKENDS:
+        schema = to_validator(CORPUS.schema, backend=backend)
+        row = [backend]
+        for probe in (schema.is_valid, catching_invalid(schema)):
+
+            def probe_all():
+                for document in DOCUMENTS:
+                    probe(document)
+
+            seconds = best_of(probe_all, repeat=3)
+            row.append('%.0f' % (len(DOCUMENTS) / seconds))
+
+        valid = CORPUS.documents
+
+        def validate_valid():
+            for document in valid:
+                schema(document)
+
+        seconds = best_of(validate_valid, repeat=3)
+        row.append('%.0f' % (len(valid) / seconds))
+        rows.append(row)
+    report(
+        '%s documents against anyOf of %s branches, half invalid'
+        % (len(DOCUMENTS), len(CORPUS.schema['anyOf'])),
+        ('', 'is_valid/s', 'catching Invalid/s', 'valid docs validated/s'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
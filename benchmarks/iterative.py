@@ -0,0 +1,84 @@
+"""Conversion time of the iterative engine (`Converter._convert`) and of a
+recursive one driving the same node converters, on deep and wide schemas.
+
+The recursive engine fails with a `RecursionError` on the deepest schemas.
+"""
+from voluptuary import Converter
+
+from .common import best_of, report
+from .corpora import deep_nesting, wide_objects
+
+
+class RecursiveConverter(Converter):
+    """Converts the subschemas each node yields by a nested conversion,
+    so the depth of Python calls grows with the nesting of the schema"""
+
+    def _convert_node(self, schema):
+        steps = super()._convert_node(schema)
+        value = error = None
+        while True:
+            try:
+                if error is None:
+                    subschema = steps.send(value)
+                else:
+                    subschema = steps.throw(error)
+            except StopIteration as e:
+                return e.value
+            try:
+                value, error = self._convert(subschema), None
+            except Exception as e:
+                value, error = None, e
+        # a generator, which never yields
+        yield
+
+
+def items_chain(depth):
+    """Arrays of arrays, `depth` levels deep"""
+    schema = {'type': 'integer'}
+    for _ in range(depth):
+        schema = {'type': 'array', 'items': schema}
+    return schema
+
+
+def time_conversion(converter_class, schema, optimize):
+    try:
+        return best_of(
+            lambda: converter_class(schema, optimize=optimize).convert(),
+            repeat=7,
+        )
+    except RecursionError:
+        return None
+
+
+def main():
+    schemas = [
+        ('deep nesting 40', deep_nesting(depth=40, n_documents=0).schema),
+        ('deep nesting 150', deep_nesting(depth=150, n_documents=0).schema),
+        ('deep nesting 1000', deep_nesting(depth=1000, n_documents=0).schema),
+        ('items chain 1000', items_chain(1000)),
+        ('wide objects 200', wide_objects(n_documents=0).schema),
+        ('wide objects 2000', wide_objects(2000, n_documents=0).schema),
+    ]
+    rows = []
+    for name, schema in schemas:
+        for optimize in (True, False):
+            recursive = time_conversion(RecursiveConverter, schema, optimize)
+            iterative = time_conversion(Converter, schema, optimize)
+            rows.append((
+                name,
+                'yes' if optimize else 'no',
+                'RecursionError' if recursive is None
+                else '%.2f' % (recursive * 1e3),
+                '%.2f' % (iterative * 1e3),
+                '-' if recursive is None
+                else '%.2fx' % (recursive / iterative),
+            ))
+    report(
+        'conversion time of the recursive and iterative engines',
+        ('schema', 'optimize', 'recursive ms', 'iterative ms', 'speedup'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
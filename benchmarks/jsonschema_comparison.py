@@ -0,0 +1,156 @@
+"""Conversion time and validation throughput of voluptuary's backends and
+jsonschema's Draft4Validator, over the corpora in `benchmarks.corpora`.
+
+    $ python -m benchmarks.jsonschema_comparison --json results.json
+    $ python -m benchmarks.jsonschema_comparison --baseline results.json
+
+`--json` saves the results, and `--baseline` compares against saved
+results, to spot regressions. "break-even docs" is how many documents have
+to be validated before converting pays off, compared to jsonschema.
+"""
+import argparse
+import json
+import platform
+import warnings
+
+import voluptuous
+
+import voluptuary
+from voluptuary import to_validator
+
+from .common import best_of, report
+from .corpora import all_corpora
+
+
+def _jsonschema(schema):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        import jsonschema
+    return jsonschema.Draft4Validator(schema).validate
+
+
+ENGINES = (
+    ('jsonschema', _jsonschema),
+    ('voluptuous', lambda schema: to_validator(schema, 'voluptuous')),
+    ('compiled', lambda schema: to_validator(schema, 'compiled')),
+)
+
+
+def check_documents(corpus, engine, validate):
+    """Make sure every document is valid, so the timings are comparable"""
+    for document in corpus.documents:
+        try:
+            validate(document)
+        except Exception as e:
+            raise Exception(
+                '%s rejects a document of the %r corpus: %s'
+                % (engine, corpus.name, e)
+            )
+
+
+def measure(corpus):
+    """Return {engine: {'convert_seconds', 'validate_seconds'}}"""
+    results = {}
+    for engine, make_validator in ENGINES:
+        validate = make_validator(corpus.schema)
+        check_documents(corpus, engine, validate)
+
+        def validate_all():
+            for document in corpus.documents:
+                validate(document)
+
+        results[engine] = {
+            'convert_seconds': best_of(
+                lambda: make_validator(corpus.schema)
+            ),
+            'validate_seconds': best_of(validate_all, repeat=3),
+        }
+    return results
+
+
+def break_even(result, reference, n_documents):
+    """How many documents it takes for `result` to beat `reference`"""
+    extra_seconds = result['convert_seconds'] - reference['convert_seconds']
+    saved_per_document = (
+        reference['validate_seconds'] - result['validate_seconds']
+    ) / n_documents
+    if extra_seconds <= 0:
+        return 0
+    elif saved_per_document <= 0:
+        return 'never'
+    return '%.0f' % (extra_seconds / saved_per_document)
+
+
+def print_results(corpus, results, baseline=None):
+    reference = results['jsonschema']
+    n_documents = len(corpus.documents)
+    header = (
+        'engine', 'convert ms', 'validate ms', 'docs/s', 'vs jsonschema',
+        'break-even docs'
+    )
+    if baseline is not None:
+        header += ('vs baseline', )
+    rows = []
+    for engine, _ in ENGINES:
+        result = results[engine]
+        row = (
+            engine,
+            '%.2f' % (result['convert_seconds'] * 1e3),
+            '%.2f' % (result['validate_seconds'] * 1e3),
+            '%.0f' % (n_documents / result['validate_seconds']),
+            '%.2fx' % (
+                reference['validate_seconds'] / result['validate_seconds']
+            ),
+            break_even(result, reference, n_documents),
+        )
+        if baseline is not None:
+            before = baseline.get(engine)
+            if before is None:
+                row += ('-', )
+            else:
+                row += ('%+.0f%%' % (
+                    100 * (result['validate_seconds'] /
+                           before['validate_seconds'] - 1)
+                ), )
+        rows.append(row)
+    report(
+        '%s (%s documents)' % (corpus.name, n_documents), header, rows
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--json', help='save the results to this file')
+    parser.add_argument(
+        '--baseline', help='compare validation time to results saved here'
+    )
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['corpora']
+
+    all_results = {}
+    for corpus in all_corpora():
+        results = all_results[corpus.name] = measure(corpus)
+        print_results(
+            corpus,
+            results,
+            baseline.get(corpus.name, {}) if args.baseline else None,
+        )
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'versions': {
+                    'python': platform.python_version(),
+                    'voluptuary': voluptuary.__version__,
+                    'voluptuous': voluptuous.__version__,
+                },
+                'corpora': all_results,
+            }, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Validation time of `not`, probing the inner schema with `is_valid`, and
+calling it and catching the `Invalid` it raises.
+"""
+import voluptuous
+
+from voluptuary import to_validator, to_voluptuous
+
+from .common import best_of, report
+
+SCHEMAS = (
+    ('not null', {'not': {'type': 'null'}}),
+    ('not enum', {'not': {'enum': ['a', 'b', 'c']}}),
+    ('not pattern', {'not': {'pattern': '^x-'}}),
+)
+VALUES = ['value-%s' % i for i in range(10000)]
+
+
+class RaisingNot:
+    """`not`, the way it could be built from voluptuous validators"""
+
+    def __init__(self, schema):
+        self.schema = voluptuous.Schema(schema)
+
+    def __call__(self, value):
+        try:
+            self.schema(value)
+        except voluptuous.Invalid:
+            return value
+        raise voluptuous.Invalid('value must not be valid')
+
+
+def main():
+    rows = []
+    for name, json_schema in SCHEMAS:
+        raising = RaisingNot(to_voluptuous(json_schema['not']))
+        row = [name]
+        for validator in (
+            to_voluptuous(json_schema),
+            to_validator(json_schema, 'compiled'),
+            raising,
+        ):
+
+            def validate_all():
+                for value in VALUES:
+                    validator(value)
+
+            seconds = best_of(validate_all, repeat=3)
+            row.append('%.0f' % (len(VALUES) / seconds))
+        rows.append(row)
+    report(
+        'validation of %s values which pass `not`' % len(VALUES),
+        ('', 'voluptuous/s', 'compiled/s', 'catching Invalid/s'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Conversion time of `type: object` schemas as the number of properties
+grows. Time per property should stay roughly flat (linear total cost).
+"""
+from voluptuary import to_voluptuous
+
+from .common import best_of, report
+
+
+def wide_object(n_props):
+    return {
+        'type': 'object',
+        'required': ['prop%s' % i for i in range(0, n_props, 2)],
+        'properties': {
+            'prop%s' % i: {'type': 'integer', 'minimum': 0}
+            for i in range(n_props)
+        },
+    }
+
+
+def main():
+    rows = []
+    for n_props in (50, 100, 200, 400, 800, 1600):
+        schema = wide_object(n_props)
+        seconds = best_of(lambda: to_voluptuous(schema))
+        rows.append((
+            n_props,
+            '%.2f' % (seconds * 1e3),
+            '%.2f' % (seconds * 1e6 / n_props),
+        ))
+    report(
+        'object conversion vs. property count',
+        ('properties', 'total ms', 'us/property'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
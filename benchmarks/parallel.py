@@ -0,0 +1,43 @@
+"""`validate_parallel` against `validate_many` on one large batch. The
+speedup depends on the number of cores available.
+"""
+import os
+
+from voluptuary import BACKENDS, to_validator
+from voluptuary.batch import validate_many, validate_parallel
+
+from .backends import SCHEMA
+from .batch import make_records
+from .common import best_of, report
+
+
+def main():
+    records = make_records() * 10
+    rows = []
+    for backend in BACKENDS:
+        schema = to_validator(SCHEMA, backend=backend)
+        for name, run in (
+            ('validate_many', lambda: list(validate_many(schema, records))),
+            (
+                'validate_parallel',
+                lambda: list(validate_parallel(SCHEMA, records, backend)),
+            ),
+        ):
+            seconds = best_of(run, repeat=3)
+            rows.append((
+                backend,
+                name,
+                '%.1f' % (seconds * 1e3),
+                '%.0f' % (len(records) / seconds),
+            ))
+    report(
+        'validation of %s records on %s cpus' % (
+            len(records), os.cpu_count()
+        ),
+        ('backend', 'method', 'total ms', 'records/s'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Validation time of wide objects against `patternProperties`, when each
+property name is searched for with the patterns combined into one
+alternation, and with each pattern in turn.
+"""
+from voluptuary import PatternSet, to_validator
+
+from .common import best_of, report
+
+N_PATTERNS = (1, 10, 50)
+N_PROPERTIES = 200
+N_DOCUMENTS = 100
+
+
+def make_schema(n_patterns):
+    return {
+        'type': 'object',
+        'properties': {'id': {'type': 'integer'}},
+        'patternProperties': {
+            '^x%s_[a-z]+$' % i: {'type': 'string'} for i in range(n_patterns)
+        },
+    }
+
+
+def make_documents():
+    """Objects where a few properties match a pattern, and most don't"""
+    documents = []
+    for j in range(N_DOCUMENTS):
+        document = {'p%s' % i: i for i in range(N_PROPERTIES)}
+        document.update(id=j, x0_name='a')
+        documents.append(document)
+    return documents
+
+
+def main():
+    documents = make_documents()
+    rows = []
+    for n_patterns in N_PATTERNS:
+        schema = make_schema(n_patterns)
+        for backend in ('voluptuous', 'compiled'):
+            row = [n_patterns, backend]
+            for combined in (True, False):
+                PatternSet.__init__ = _init if combined else _init_uncombined
+                validate = to_validator(schema, backend)
+
+                def validate_all():
+                    for document in documents:
+                        validate(document)
+
+                seconds = best_of(validate_all, repeat=3)
+                row.append('%.0f' % (len(documents) / seconds))
+            PatternSet.__init__ = _init
+            rows.append(row)
+    report(
+        'validation of objects with %s properties' % N_PROPERTIES,
+        ('patterns', 'backend', 'combined docs/s', 'one by one docs/s'),
+        rows,
+    )
+
+
+_init = PatternSet.__init__
+
+
+def _init_uncombined(self, patterns):
+    _init(self, patterns)
+    self._combined = None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Resolving local refs: the pointer index used by `Resolver`, walking the
+pointer on every lookup, and jsonschema's `RefResolver`.
+"""
+import warnings
+
+from voluptuary import Resolver, index_pointers, to_voluptuous
+
+from .common import best_of, report
+
+N_DEFINITIONS = 500
+
+
+def make_schema():
+    definitions = {
+        'thing%s' % i: {
+            'type': 'object',
+            'properties': {
+                'id': {'type': 'integer'},
+                'tag': {'$ref': '#/definitions/tag'},
+            },
+        } for i in range(N_DEFINITIONS)
+    }
+    definitions['tag'] = {'type': 'string', 'maxLength': 32}
+    return {
+        'definitions': definitions,
+        'type': 'array',
+        'items': [
+            {'$ref': '#/definitions/thing%s' % i}
+            for i in range(N_DEFINITIONS)
+        ],
+    }
+
+
+def main():
+    schema = make_schema()
+    refs = [
+        '#/definitions/thing%s/properties/id' % (i % N_DEFINITIONS)
+        for i in range(20000)
+    ]
+    indexed = Resolver(schema)
+    indexed.resolve(refs[0])
+    walked = Resolver(schema)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        from jsonschema import RefResolver
+    jsonschema_resolver = RefResolver('', schema)
+
+    def resolve_with_jsonschema():
+        for ref in refs:
+            with jsonschema_resolver.resolving(ref):
+                pass
+
+    rows = [
+        (name, '%.3f' % (best_of(func) * 1e6 / len(refs)))
+        for name, func in (
+            ('Resolver (index)', lambda: [indexed.resolve(r) for r in refs]),
+            (
+                'Resolver (walk)',
+                lambda: [walked._walk_pointer(r[1:]) for r in refs],
+            ),
+            ('jsonschema RefResolver', resolve_with_jsonschema),
+        )
+    ]
+    report('resolving a local ref', ('resolver', 'us/ref'), rows)
+
+    report(
+        'one-time costs for %s definitions' % N_DEFINITIONS,
+        ('step', 'total ms'),
+        [
+            (
+                'index_pointers',
+                '%.2f' % (best_of(lambda: index_pointers(schema)) * 1e3),
+            ),
+            (
+                'to_voluptuous',
+                '%.2f' % (best_of(lambda: to_voluptuous(schema)) * 1e3),
+            ),
+        ],
+    )
+
+
+if __name__ == '__main__':
+    main()
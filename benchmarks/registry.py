@@ -0,0 +1,92 @@
+"""Cold start and lookups of a shared registry of converted schemas, with
+many threads asking for the schemas of a few tenants at once.
+
+Compares `SchemaRegistry` with a dict checked under a lock, converting
+outside of it (so concurrent misses convert the same schema again).
+"""
+import threading
+import time
+
+import voluptuary
+from voluptuary.registry import SchemaRegistry
+
+from .common import best_of, report
+from .corpora import wide_objects
+
+N_THREADS = 16
+N_TENANTS = 8
+TENANTS = [
+    ('tenant%s' % i, wide_objects(n_properties=100 + i, n_documents=0).schema)
+    for i in range(N_TENANTS)
+]
+
+
+class LockedDict(object):
+    """A dict of converted schemas, converting outside of the lock"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._schemas = {}
+        self.misses = 0
+
+    def get(self, schema, key):
+        with self._lock:
+            result = self._schemas.get(key)
+        if result is None:
+            result = voluptuary.to_voluptuous(schema)
+            with self._lock:
+                self.misses += 1
+                self._schemas[key] = result
+        return result
+
+
+def cold_start(registry):
+    """Every thread asks for every tenant's schema"""
+    started = threading.Barrier(N_THREADS)
+
+    def get_all():
+        started.wait()
+        for key, schema in TENANTS:
+            registry.get(schema, key)
+
+    threads = [threading.Thread(target=get_all) for _ in range(N_THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    rows = []
+    for name, make_registry in (
+        ('dict + lock', LockedDict),
+        ('SchemaRegistry', SchemaRegistry),
+    ):
+        registry = make_registry()
+        seconds = cold_start(registry)
+        key, schema = TENANTS[0]
+        lookup = best_of(lambda: registry.get(schema, key), number=10000)
+        rows.append((
+            name,
+            registry.misses,
+            '%.0f' % (seconds * 1e3),
+            '%.0f' % (1 / lookup),
+        ))
+    registry = SchemaRegistry()
+    registry.get(schema)
+    rows.append((
+        'SchemaRegistry by content hash', '-', '-',
+        '%.0f' % (1 / best_of(lambda: registry.get(schema), number=1000)),
+    ))
+    report(
+        '%s threads asking for the schemas of %s tenants'
+        % (N_THREADS, N_TENANTS),
+        ('', 'conversions', 'cold start ms', 'lookups/s'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
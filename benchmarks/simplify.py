@@ -0,0 +1,37 @@
+"""Validation and conversion time of converted schemas, with and without
+`simplify` flattening the nested wrappers.
+"""
+from voluptuary import Converter
+
+from .backends import DOCUMENTS, SCHEMA
+from .common import best_of, report
+
+
+def validate_all(validator):
+    for document in DOCUMENTS:
+        validator(document)
+
+
+def main():
+    rows = []
+    for optimize in (False, True):
+        convert_seconds = best_of(
+            lambda: Converter(SCHEMA, optimize=optimize).convert()
+        )
+        validator = Converter(SCHEMA, optimize=optimize).convert()
+        seconds = best_of(lambda: validate_all(validator))
+        rows.append((
+            'simplified' if optimize else 'not simplified',
+            '%.2f' % (convert_seconds * 1e3),
+            '%.2f' % (seconds * 1e3),
+            '%.0f' % (len(DOCUMENTS) / seconds),
+        ))
+    report(
+        'validation of %s documents' % len(DOCUMENTS),
+        ('', 'convert ms', 'validate ms', 'docs/s'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
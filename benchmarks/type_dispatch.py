@@ -0,0 +1,45 @@
+"""Validation time of a value against a list of types, with a table lookup
+by the type of the value (`TypeDispatch`) and by trying each type in turn.
+"""
+import voluptuous
+from voluptuous import Any, Schema
+
+from voluptuary import to_voluptuous
+
+from .common import best_of, report
+
+TYPES = ['null', 'string', 'integer', 'object']
+VALUES = [None, 'a', 1, {'a': 1}] * 2500
+
+
+def validate_all(validator):
+    for value in VALUES:
+        validator(value)
+
+
+def main():
+    dispatch = to_voluptuous({'type': TYPES})
+    # what a list of types used to be converted to
+    any_type = Schema(Any(
+        Schema(None),
+        Schema(str),
+        Schema(int),
+        Schema({}, extra=voluptuous.ALLOW_EXTRA),
+    ))
+    rows = []
+    for name, validator in (('Any', any_type), ('TypeDispatch', dispatch)):
+        seconds = best_of(lambda: validate_all(validator))
+        rows.append((
+            name,
+            '%.2f' % (seconds * 1e3),
+            '%.0f' % (len(VALUES) / seconds),
+        ))
+    report(
+        'validation of %s values against %s' % (len(VALUES), TYPES),
+        ('', 'total ms', 'values/s'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
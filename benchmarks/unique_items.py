@@ -0,0 +1,49 @@
+"""Validation time of `uniqueItems` on arrays of IDs and of small objects,
+with `find_duplicate` (linear) and with comparing every pair of items.
+"""
+from voluptuary import find_duplicate, json_key
+
+from .common import best_of, report
+
+SIZES = (100, 1000, 50000)
+# the pairwise comparison takes too long beyond this
+MAX_PAIRWISE = 1000
+
+
+def pairwise_duplicate(items):
+    """The naive approach, with the same JSON equality as `find_duplicate`"""
+    keys = [json_key(item) for item in items]
+    for j in range(len(keys)):
+        for i in range(j):
+            if keys[i] == keys[j]:
+                return i, j
+    return None
+
+
+def main():
+    for name, make_item in (
+        ('ids', lambda i: i),
+        ('objects', lambda i: {'id': i, 'tags': ['a', 'b']}),
+    ):
+        rows = []
+        for size in SIZES:
+            items = [make_item(i) for i in range(size)]
+            row = [size]
+            for check in (find_duplicate, pairwise_duplicate):
+                if check is pairwise_duplicate and size > MAX_PAIRWISE:
+                    row.append('-')
+                    continue
+                assert check(items) is None
+                row.append(
+                    '%.2f' % (best_of(lambda: check(items), repeat=3) * 1e3)
+                )
+            rows.append(row)
+        report(
+            'uniqueItems on arrays of unique %s' % name,
+            ('items', 'linear ms', 'pairwise ms'),
+            rows,
+        )
+
+
+if __name__ == '__main__':
+    main()
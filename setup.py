@@ -21,6 +21,7 @@ setup_params = dict(
     ],
     entry_points={
         'console_scripts': [
+            'voluptuary = voluptuary.cli:main',
         ],
     },
     classifiers=[
@@ -1,17 +1,28 @@
 import voluptuous
 import jsonschema
 
-from voluptuary import to_string, to_voluptuous
+from voluptuary import BACKENDS, to_string, to_validator
 
 
 def check_conversion(schema_in, accepted_targets, unaccepted_targets):
-    schema_out = to_voluptuous(schema_in)
-    for target in accepted_targets:
-        check_jsonschema_validation(schema_in, target, should_validate=True)
-        check_voluptuous_validation(schema_out, target, should_validate=True)
-    for target in unaccepted_targets:
-        check_jsonschema_validation(schema_in, target, should_validate=False)
-        check_voluptuous_validation(schema_out, target, should_validate=False)
+    for backend in BACKENDS:
+        schema_out = to_validator(schema_in, backend=backend)
+        for target in accepted_targets:
+            check_jsonschema_validation(
+                schema_in, target, should_validate=True
+            )
+            check_voluptuous_validation(
+                schema_out, target, should_validate=True
+            )
+            check_is_valid(schema_out, target, should_validate=True)
+        for target in unaccepted_targets:
+            check_jsonschema_validation(
+                schema_in, target, should_validate=False
+            )
+            check_voluptuous_validation(
+                schema_out, target, should_validate=False
+            )
+            check_is_valid(schema_out, target, should_validate=False)
 
 
 def check_jsonschema_validation(schema, target, should_validate):
@@ -36,6 +47,16 @@ def check_voluptuous_validation(schema, target, should_validate):
     )
 
 
+def check_is_valid(schema, target, should_validate):
+    if schema.is_valid(target) != should_validate:
+        raise Exception(
+            'is_valid disagrees with validation:\n'
+            'schema-repr = %r\n'
+            'target      = %s\n'
+            'is_valid    = %s' % (schema, target, not should_validate)
+        )
+
+
 def check_validation(
     validator_name, validator, validator_exception, schema, target,
     should_validate
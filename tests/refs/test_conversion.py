@@ -0,0 +1,228 @@
+import subprocess
+import sys
+
+import voluptuary
+from voluptuary import Converter, RefProxy, Resolver, index_pointers
+from voluptuary import to_string
+
+from ..conversion import check_conversion
+
+
+def test_ref_to_definition():
+    check_conversion(
+        schema_in={
+            'definitions': {
+                'id': {'type': 'integer', 'minimum': 0},
+            },
+            'type': 'object',
+            'properties': {
+                'id': {'$ref': '#/definitions/id'},
+                'parent_id': {'$ref': '#/definitions/id'},
+            },
+        },
+        accepted_targets=(
+            {},
+            {'id': 0},
+            {'id': 1, 'parent_id': 2},
+        ),
+        unaccepted_targets=(
+            {'id': -1},
+            {'id': 1, 'parent_id': 'a'},
+            {'parent_id': 1.5},
+            None,
+            [],
+        ),
+    )
+
+
+def test_repeated_ref_is_converted_once():
+    converter = Converter({
+        'definitions': {
+            'name': {'type': 'string'},
+        },
+        'type': 'array',
+        'items': [
+            {'$ref': '#/definitions/name'},
+            {'$ref': '#/definitions/name'},
+        ],
+    })
+    result = converter.convert()
+    first, second = result.schema.schemas
+    assert first is second
+    assert list(converter._ref_cache) == ['#/definitions/name']
+
+
+def test_recursive_ref():
+    check_conversion(
+        schema_in={
+            'definitions': {
+                'node': {
+                    'type': 'object',
+                    'required': ['value'],
+                    'properties': {
+                        'value': {'type': 'integer'},
+                        'children': {
+                            'type': 'array',
+                            'items': {'$ref': '#/definitions/node'},
+                        },
+                    },
+                    'additionalProperties': False,
+                },
+            },
+            '$ref': '#/definitions/node',
+        },
+        accepted_targets=(
+            {'value': 1},
+            {'value': 1, 'children': []},
+            {'value': 1, 'children': [{'value': 2}]},
+            {'value': 1, 'children': [{'value': 2, 'children': [
+                {'value': 3},
+                {'value': 4, 'children': []},
+            ]}]},
+        ),
+        unaccepted_targets=(
+            {},
+            {'value': 'a'},
+            {'value': 1, 'children': [{}]},
+            {'value': 1, 'children': [{'value': 2, 'children': [
+                {'value': 'a'},
+            ]}]},
+            {'value': 1, 'children': [{'value': 2, 'extra': True}]},
+            None,
+        ),
+    )
+
+
+def test_recursive_ref_to_string():
+    result = Converter({
+        'definitions': {
+            'list': {
+                'type': 'array',
+                'items': {'$ref': '#/definitions/list'},
+            },
+        },
+        '$ref': '#/definitions/list',
+    }).convert()
+    proxy = result.schema[0]
+    assert isinstance(proxy, RefProxy)
+    assert proxy.target is result
+    assert "RefProxy('#/definitions/list')" in to_string(result)
+
+
+def test_ref_json_pointer_escapes():
+    check_conversion(
+        schema_in={
+            'definitions': {
+                'a/b': {'type': 'integer'},
+                'c~d': {'type': 'string'},
+                'e%f': {'type': 'boolean'},
+                'tuple': {'items': [{'type': 'null'}, {'type': 'number'}]},
+            },
+            'type': 'array',
+            'items': [
+                {'$ref': '#/definitions/a~1b'},
+                {'$ref': '#/definitions/c~0d'},
+                {'$ref': '#/definitions/e%25f'},
+                {'$ref': '#/definitions/tuple/items/1'},
+            ],
+        },
+        accepted_targets=([1, 'a', True, 1.5], [1]),
+        unaccepted_targets=(['a'], [1, 1], [1, 'a', 1], [1, 'a', True, 'a']),
+    )
+
+
+def test_unresolvable_ref():
+    try:
+        Converter({'$ref': '#/definitions/missing'}).convert()
+    except Exception as e:
+        assert 'Unresolvable JSON pointer' in str(e)
+    else:
+        assert False, 'expected an exception'
+
+
+def test_non_local_ref_uses_jsonschema(monkeypatch):
+    remote = {
+        'definitions': {'id': {'type': 'integer'}},
+        '$ref': '#/definitions/id',
+    }
+    calls = []
+
+    class FakeResolver(object):
+
+        def __init__(self, schema):
+            pass
+
+        def resolve_in_scope(self, scope, ref):
+            calls.append((scope, ref))
+            if ref == 'remote.json#':
+                return 'remote.json#', remote
+            return 'remote.json' + ref, remote['definitions']['id']
+
+    monkeypatch.setattr(voluptuary, '_JsonschemaResolver', FakeResolver)
+    schema = Converter({
+        'definitions': {'local': {'$ref': 'remote.json#'}},
+        '$ref': '#/definitions/local',
+    }).convert()
+    # the local ref is resolved without jsonschema. The ref within the
+    # remote document is resolved relative to it.
+    assert calls == [
+        ('#/definitions/local', 'remote.json#'),
+        ('remote.json#', '#/definitions/id'),
+    ]
+    assert schema(1) == 1
+
+
+def test_local_refs_do_not_import_jsonschema():
+    code = (
+        'import sys, voluptuary\n'
+        'voluptuary.to_voluptuous({\n'
+        '    "definitions": {"a": {"type": "string"}},\n'
+        '    "$ref": "#/definitions/a",\n'
+        '})\n'
+        'assert "jsonschema" not in sys.modules\n'
+    )
+    subprocess.check_call([sys.executable, '-c', code])
+
+
+def test_index_pointers():
+    schema = {
+        'definitions': {
+            'a/b~c': {'type': 'string', 'enum': [['x']]},
+        },
+        'items': [{'type': 'integer'}, {}],
+        'required': ['x'],
+    }
+    index = index_pointers(schema)
+    assert index == {
+        '': schema,
+        '/definitions': schema['definitions'],
+        '/definitions/a~1b~0c': schema['definitions']['a/b~c'],
+        '/items': schema['items'],
+        '/items/0': schema['items'][0],
+        '/items/1': schema['items'][1],
+    }
+
+
+def test_resolver_uses_index(monkeypatch):
+    schema = {
+        'definitions': {
+            'a': {'type': 'string'},
+            'enum': {'type': 'integer'},
+        },
+        'enum': [{'x': 1}],
+    }
+    resolver = Resolver(schema)
+
+    def fail(pointer):
+        raise AssertionError('pointer was walked: %s' % pointer)
+
+    monkeypatch.setattr(resolver, '_walk_pointer', fail)
+    assert resolver.resolve('#/definitions/a') == (
+        '#/definitions/a', schema['definitions']['a']
+    )
+    assert resolver.resolve('#/definitions/enum') == (
+        '#/definitions/enum', schema['definitions']['enum']
+    )
+    monkeypatch.undo()
+    # data isn't indexed, but can still be pointed to
+    assert resolver.resolve('#/enum/0') == ('#/enum/0', {'x': 1})
@@ -0,0 +1,117 @@
+import itertools
+
+import pytest
+import voluptuous
+
+from voluptuary import BACKENDS, to_validator
+from voluptuary.batch import _next_chunk_size
+from voluptuary.batch import validate_many, validate_parallel
+from voluptuary.cache import SchemaCache
+
+SCHEMA = {
+    'type': 'object',
+    'required': ['id'],
+    'properties': {
+        'id': {'type': 'integer', 'minimum': 0},
+        'tags': {'type': 'array', 'items': {'type': 'string'}},
+    },
+}
+
+
+def summarize(results):
+    return [
+        (ok, sorted((e.path, e.msg) for e in errors))
+        for ok, _, errors in results
+    ]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_validate_many(backend):
+    documents = [
+        {'id': 1},
+        {'id': -1, 'tags': ['a', 2]},
+        {'tags': []},
+        'abc',
+        {'id': 2, 'tags': ['a', 'b']},
+    ]
+    results = list(validate_many(to_validator(SCHEMA, backend), documents))
+    assert summarize(results) == [
+        (True, []),
+        (False, [
+            (['id'], 'value must be at least 0'),
+            (['tags', 1], 'expected str'),
+        ]),
+        (False, [(['id'], 'required key not provided')]),
+        (False, [([], 'expected a dictionary')]),
+        (True, []),
+    ]
+    assert [value for _, value, _ in results] == documents
+    for _, _, errors in results:
+        assert all(e.__traceback__ is None for e in errors)
+
+
+def test_validate_many_with_plain_callable():
+    def is_even(value):
+        if value % 2:
+            raise voluptuous.Invalid('not even')
+        return value // 2
+
+    results = list(validate_many(is_even, [2, 3]))
+    assert results[0] == (True, 1, ())
+    assert not results[1].ok
+    assert [e.msg for e in results[1].errors] == ['not even']
+
+
+def test_validate_many_is_lazy():
+    schema = to_validator({'type': 'integer'})
+    results = validate_many(schema, itertools.count())
+    assert [r.ok for r in itertools.islice(results, 3)] == [True] * 3
+
+
+@pytest.mark.parametrize('chunk_size', [None, 3])
+def test_validate_parallel_matches_validate_many(chunk_size):
+    documents = [{'id': i} if i % 3 else {'id': -i} for i in range(1, 100)]
+    expected = list(validate_many(to_validator(SCHEMA), documents))
+    results = list(
+        validate_parallel(
+            SCHEMA, iter(documents), max_workers=2, chunk_size=chunk_size
+        )
+    )
+    assert summarize(results) == summarize(expected)
+    assert [value for _, value, _ in results] == documents
+
+
+def test_validate_parallel_empty_input():
+    assert list(validate_parallel(SCHEMA, [], max_workers=1)) == []
+
+
+def test_next_chunk_size():
+    # grows and shrinks by at most a factor of two
+    assert _next_chunk_size(100, 100, 0.0001) == 200
+    assert _next_chunk_size(100, 100, 10) == 50
+    # converges on the target chunk duration
+    assert _next_chunk_size(100, 100, 0.04) == 125
+    # is bounded
+    assert _next_chunk_size(16, 16, 10) == 16
+    assert _next_chunk_size(8192, 8192, 0) == 8192
+
+
+def test_validate_many_with_cached_schema(tmpdir, monkeypatch):
+    cache = SchemaCache(str(tmpdir))
+    cache.to_voluptuous(SCHEMA)
+    compiled = []
+    compile_schema = voluptuous.Schema._compile
+
+    def count_compiles(self, schema):
+        compiled.append(schema)
+        return compile_schema(self, schema)
+
+    monkeypatch.setattr(voluptuous.Schema, '_compile', count_compiles)
+    documents = [{'id': i, 'tags': ['a']} for i in range(5)] + [{'id': -1}]
+    schema = cache.to_voluptuous(SCHEMA)
+    # a loaded schema is compiled as it loads, and never again
+    assert compiled
+    del compiled[:]
+    results = list(validate_many(schema, documents))
+    assert [ok for ok, _, _ in results] == [True] * 5 + [False]
+    assert compiled == []
@@ -0,0 +1,153 @@
+import os
+
+import pytest
+import voluptuous
+
+import voluptuary
+from voluptuary.cache import SchemaCache, dumps, loads, schema_key
+from .conversion import check_jsonschema_validation
+from .conversion import check_voluptuous_validation
+
+TREE_SCHEMA = {
+    'definitions': {
+        'node': {
+            'type': 'object',
+            'required': ['value'],
+            'properties': {
+                'value': {'type': 'integer', 'minimum': 0, 'multipleOf': 2},
+                'children': {
+                    'type': 'array',
+                    'items': {'$ref': '#/definitions/node'},
+                    'maxItems': 2,
+                },
+                'name': {'anyOf': [{'type': 'string'}, {'type': 'null'}]},
+            },
+            'additionalProperties': False,
+            'minProperties': 1,
+        },
+    },
+    '$ref': '#/definitions/node',
+}
+
+
+def check_round_trip(schema_in, accepted_targets, unaccepted_targets):
+    schema_out = loads(dumps(voluptuary.to_voluptuous(schema_in)))
+    for target in accepted_targets:
+        check_jsonschema_validation(schema_in, target, should_validate=True)
+        check_voluptuous_validation(schema_out, target, should_validate=True)
+    for target in unaccepted_targets:
+        check_jsonschema_validation(schema_in, target, should_validate=False)
+        check_voluptuous_validation(schema_out, target, should_validate=False)
+
+
+def test_round_trip_recursive_schema():
+    check_round_trip(
+        TREE_SCHEMA,
+        accepted_targets=(
+            {'value': 0},
+            {'value': 2, 'name': None, 'children': [{'value': 4}]},
+            {'value': 2, 'children': [{'value': 4, 'children': [
+                {'value': 6, 'name': 'leaf'},
+            ]}]},
+        ),
+        unaccepted_targets=(
+            {},
+            {'value': 1},
+            {'value': 2, 'extra': 1},
+            {'value': 2, 'children': [{'value': -2}]},
+            {'value': 2, 'children': [{'value': 4, 'children': [
+                {'value': 6, 'name': 1},
+            ]}]},
+            {'value': 2, 'children': [{'value': 4}, {'value': 4}, {}]},
+        ),
+    )
+
+
+def test_round_trip_items_list():
+    check_round_trip(
+        {
+            'type': 'array',
+            'items': [{'type': 'string'}, {'type': 'number'}],
+            'additionalItems': False,
+            'minItems': 1,
+        },
+        accepted_targets=(['a'], ['a', 1.5]),
+        unaccepted_targets=([], [1], ['a', 'b'], ['a', 1, 2]),
+    )
+
+
+def test_cache_hit_does_not_convert(tmpdir, monkeypatch):
+    cache = SchemaCache(str(tmpdir))
+    first = cache.to_voluptuous(TREE_SCHEMA)
+    assert len(os.listdir(str(tmpdir))) == 1
+
+    def fail(schema):
+        raise AssertionError('schema was converted again')
+
+    monkeypatch.setattr(voluptuary, 'to_voluptuous', fail)
+    second = SchemaCache(str(tmpdir)).to_voluptuous(TREE_SCHEMA)
+    assert second is not first
+    assert second({'value': 2}) == {'value': 2}
+
+
+def test_cache_key_is_canonical():
+    assert schema_key({'a': 1, 'b': [1]}) == schema_key({'b': [1], 'a': 1})
+    assert schema_key({'a': 1}) != schema_key({'a': 2})
+
+
+def test_cache_key_covers_versions(monkeypatch):
+    key = schema_key(TREE_SCHEMA)
+    monkeypatch.setattr(voluptuary, '__version__', '999.0.0')
+    assert schema_key(TREE_SCHEMA) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(voluptuous, '__version__', '999.0.0')
+    assert schema_key(TREE_SCHEMA) != key
+
+
+def test_corrupt_entry_is_replaced(tmpdir):
+    cache = SchemaCache(str(tmpdir))
+    path = cache._path(schema_key(TREE_SCHEMA))
+    with open(path, 'wb') as f:
+        f.write(b'not a pickle')
+    schema = cache.to_voluptuous(TREE_SCHEMA)
+    assert schema({'value': 2}) == {'value': 2}
+    with open(path, 'rb') as f:
+        assert loads(f.read())({'value': 2}) == {'value': 2}
+
+
+@pytest.mark.parametrize('data', [
+    # refers to a class which no longer exists
+    b'cvoluptuary\nNoSuchValidator\n.',
+    # or a module
+    b'cvoluptuary.no_such_module\nValidator\n.',
+])
+def test_stale_entry_is_replaced(tmpdir, data):
+    cache = SchemaCache(str(tmpdir))
+    path = cache._path(schema_key(TREE_SCHEMA))
+    with open(path, 'wb') as f:
+        f.write(data)
+    schema = cache.to_voluptuous(TREE_SCHEMA)
+    assert schema({'value': 2}) == {'value': 2}
+    with open(path, 'rb') as f:
+        assert loads(f.read())({'value': 2}) == {'value': 2}
+
+
+def test_eviction_keeps_cache_under_max_bytes(tmpdir):
+    schemas = [
+        {'type': 'object', 'properties': {'p%s' % i: {'type': 'integer'}}}
+        for i in range(10)
+    ]
+    entry_size = len(dumps(voluptuary.to_voluptuous(schemas[0])))
+    cache = SchemaCache(str(tmpdir), max_bytes=entry_size * 3)
+    for schema in schemas:
+        cache.to_voluptuous(schema)
+        sizes = [size for _, size, _ in cache._entries()]
+        assert sum(sizes) <= cache.max_bytes
+    remaining = set(os.listdir(str(tmpdir)))
+    assert len(remaining) == 3
+    assert cache._path(schema_key(schemas[-1])).endswith(
+        tuple(remaining)
+    )
+
+    cache.clear()
+    assert os.listdir(str(tmpdir)) == []
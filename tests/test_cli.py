@@ -0,0 +1,133 @@
+import io
+import json
+import sys
+
+import pytest
+
+from voluptuary.cli import main
+
+SCHEMA = {
+    'type': 'object',
+    'required': ['id'],
+    'properties': {'id': {'type': 'integer'}},
+}
+
+RECORDS = b'''{"id": 1}
+{"id": "a"}
+
+{}
+{"id": 2
+{"id": 3}
+'''
+
+
+@pytest.fixture
+def schema_path(tmpdir):
+    path = tmpdir.join('schema.json')
+    path.write(json.dumps(SCHEMA))
+    return str(path)
+
+
+CONVERTED = "Schema({Required('id'): int})"
+
+
+def test_convert(schema_path, capsys):
+    assert main(['convert', schema_path]) == 0
+    assert CONVERTED in capsys.readouterr().out
+
+
+def test_convert_without_subcommand(schema_path, capsys):
+    assert main([schema_path]) == 0
+    assert CONVERTED in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('backend', ['voluptuous', 'compiled'])
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_validate_file(schema_path, tmpdir, capsys, backend, jobs):
+    records = tmpdir.join('records.ndjson')
+    records.write_binary(RECORDS)
+    argv = ['validate', schema_path, str(records), '--jobs', jobs]
+    assert main(argv + ['--backend', backend]) == 1
+    out, err = capsys.readouterr()
+    lines = out.splitlines()
+    assert lines[0].startswith('line 2: expected int')
+    assert lines[0].endswith("@ data['id']")
+    assert lines[1] == "line 4: required key not provided @ data['id']"
+    assert lines[2].startswith('line 5: invalid JSON: ')
+    assert len(lines) == 3
+    assert err.startswith('5 records, 3 invalid, ')
+    assert err.rstrip().endswith(' MB/s')
+
+
+@pytest.mark.parametrize('backend', ['voluptuous', 'compiled'])
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_invalid_json_with_permissive_schema(tmpdir, capsys, backend, jobs):
+    schema = tmpdir.join('schema.json')
+    schema.write(json.dumps({}))
+    records = tmpdir.join('records.ndjson')
+    records.write_binary(b'{not json\n{"a": 1}\n[1\n{"b": 2}\n')
+    argv = ['validate', str(schema), str(records), '--jobs', jobs]
+    assert main(argv + ['--backend', backend]) == 1
+    out, err = capsys.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 2
+    assert lines[0].startswith('line 1: invalid JSON: ')
+    assert lines[1].startswith('line 3: invalid JSON: ')
+    assert err.startswith('4 records, 2 invalid, ')
+
+
+def test_validate_stdin(schema_path, monkeypatch, capsys):
+    stdin = io.TextIOWrapper(io.BytesIO(b'{"id": 1}\n{"id": 2}\n'))
+    monkeypatch.setattr(sys, 'stdin', stdin)
+    assert main(['validate', schema_path]) == 0
+    out, err = capsys.readouterr()
+    assert out == ''
+    assert err.startswith('2 records, 0 invalid, ')
+
+
+def test_validate_quiet(schema_path, tmpdir, capsys):
+    records = tmpdir.join('records.ndjson')
+    records.write_binary(RECORDS)
+    assert main(['validate', '-q', schema_path, str(records)]) == 1
+    out, err = capsys.readouterr()
+    assert out == ''
+    assert err.startswith('5 records, 3 invalid, ')
+
+
+def test_validate_max_errors(tmpdir, capsys):
+    schema = tmpdir.join('schema.json')
+    schema.write(json.dumps({
+        'type': 'object',
+        'properties': {
+            'a': {'type': 'integer'},
+            'b': {'type': 'integer'},
+        },
+    }))
+    records = tmpdir.join('records.ndjson')
+    records.write_binary(b'{"a": "x", "b": "y"}\n')
+    argv = ['validate', str(schema), str(records)]
+    assert main(argv) == 1
+    assert len(capsys.readouterr().out.splitlines()) == 2
+    assert main(argv + ['--max-errors', '1']) == 1
+    assert len(capsys.readouterr().out.splitlines()) == 1
+
+
+@pytest.mark.parametrize('max_errors', ['0', '-1', 'x'])
+def test_validate_invalid_max_errors(schema_path, capsys, max_errors):
+    with pytest.raises(SystemExit) as e:
+        main(['validate', schema_path, '--max-errors', max_errors])
+    assert e.value.code == 2
+    assert 'expected a positive integer' in capsys.readouterr().err
+
+
+def test_validate_check_formats(tmpdir, capsys):
+    schema = tmpdir.join('schema.json')
+    schema.write(json.dumps({'type': 'string', 'format': 'ipv4'}))
+    records = tmpdir.join('records.ndjson')
+    records.write_binary(b'"1.2.3.4"\n"1.2.3"\n')
+    argv = ['validate', str(schema), str(records)]
+    assert main(argv) == 0
+    assert main(argv + ['--check-formats']) == 1
+    assert capsys.readouterr().out == (
+        'line 2: value is not a valid ipv4\n'
+    )
@@ -0,0 +1,96 @@
+import pytest
+import voluptuous
+
+from voluptuary import to_validator, to_voluptuous
+from voluptuary.compiled import CompiledSchema, _one_of
+from .conversion import check_jsonschema_validation
+from .conversion import check_voluptuous_validation
+
+
+def errors_of(validator, target):
+    with pytest.raises(voluptuous.MultipleInvalid) as exc_info:
+        validator(target)
+    return sorted((e.path, e.msg) for e in exc_info.value.errors)
+
+
+def test_compiled_backend_returns_compiled_schema():
+    schema = to_validator({'type': 'string'}, backend='compiled')
+    assert isinstance(schema, CompiledSchema)
+    assert schema('abc') == 'abc'
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        to_validator({}, backend='wumbo')
+
+
+def test_compiled_error_paths_match_voluptuous():
+    schema_in = {
+        'type': 'object',
+        'required': ['id'],
+        'properties': {
+            'a': {
+                'type': 'object',
+                'properties': {
+                    'b': {'type': 'integer', 'minimum': 0},
+                    'c': {'type': 'array', 'items': {'type': 'string'}},
+                },
+            },
+        },
+        'additionalProperties': False,
+    }
+    target = {'a': {'b': -1, 'c': ['x', 1]}, 'extra': 1}
+    compiled = to_validator(schema_in, backend='compiled')
+    assert errors_of(compiled, target) == errors_of(
+        to_voluptuous(schema_in), target
+    )
+    assert [path for path, _ in errors_of(compiled, target)] == [
+        ['a', 'b'],
+        ['a', 'c', 1],
+        ['extra'],
+        ['id'],
+    ]
+
+
+def test_compiled_scalar_error_is_wrapped():
+    compiled = to_validator({'type': 'string'}, backend='compiled')
+    assert errors_of(compiled, 1) == [([], 'expected str')]
+
+
+def test_compiled_unspecified_required_prop_and_no_additional_props():
+    # The voluptuous backend can't express this conflict (see the skipped
+    # test in tests/objects), but the compiled backend can.
+    schema_in = {
+        'type': 'object',
+        'required': ['name', 'id'],
+        'properties': {
+            'name': {'type': 'string'},
+        },
+        'additionalProperties': False,
+    }
+    schema_out = to_validator(schema_in, backend='compiled')
+    for target in ({}, {'name': ''}, {'name': '', 'id': 1}):
+        check_jsonschema_validation(schema_in, target, should_validate=False)
+        check_voluptuous_validation(schema_out, target, should_validate=False)
+
+
+def test_compiled_bool_is_not_a_number():
+    schema_in = {'type': 'object', 'properties': {
+        'i': {'type': 'integer'},
+        'n': {'type': 'number'},
+    }}
+    schema_out = to_validator(schema_in, backend='compiled')
+    for target in ({'i': True}, {'n': False}):
+        check_jsonschema_validation(schema_in, target, should_validate=False)
+        check_voluptuous_validation(schema_out, target, should_validate=False)
+
+
+def test_one_of_never_accepts_what_no_probe_accepts():
+    def check(value, path):
+        pass
+
+    check_one_of = _one_of([check, check], [lambda value: False] * 2)
+    with pytest.raises(voluptuous.Invalid) as e:
+        check_one_of(1, ['a'])
+    assert e.value.msg == 'not valid under any of the given schemas'
+    assert e.value.path == ['a']
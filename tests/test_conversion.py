@@ -1,11 +1,14 @@
-from voluptuary import to_voluptuous
+import pytest
+
+from voluptuary import BACKENDS, to_validator
 from .conversion import check_jsonschema_validation
 from .conversion import check_voluptuous_validation
 
 
-def test_type_string_schema():
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_type_string_schema(backend):
     schema_in = {'type': 'string'}
-    schema_out = to_voluptuous(schema_in)
+    schema_out = to_validator(schema_in, backend=backend)
     for target in (
         "",
         "a",
@@ -28,9 +31,10 @@ def test_type_string_schema():
         check_voluptuous_validation(schema_out, target, should_validate=False)
 
 
-def test_type_boolean_schema():
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_type_boolean_schema(backend):
     schema_in = {'type': 'boolean'}
-    schema_out = to_voluptuous(schema_in)
+    schema_out = to_validator(schema_in, backend=backend)
     for target in (
         False,
         True,
@@ -53,9 +57,10 @@ def test_type_boolean_schema():
         check_voluptuous_validation(schema_out, target, should_validate=False)
 
 
-def test_type_null_schema():
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_type_null_schema(backend):
     schema_in = {'type': 'null'}
-    schema_out = to_voluptuous(schema_in)
+    schema_out = to_validator(schema_in, backend=backend)
     for target in (None, ):
         check_jsonschema_validation(schema_in, target, should_validate=True)
         check_voluptuous_validation(schema_out, target, should_validate=True)
@@ -71,9 +76,10 @@ def test_type_null_schema():
         check_voluptuous_validation(schema_out, target, should_validate=False)
 
 
-def test_list_of_types_schema():
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_list_of_types_schema(backend):
     schema_in = {'type': ['number', 'string']}
-    schema_out = to_voluptuous(schema_in)
+    schema_out = to_validator(schema_in, backend=backend)
     for target in (
         -1,
         -0,
@@ -103,9 +109,10 @@ def test_list_of_types_schema():
         check_voluptuous_validation(schema_out, target, should_validate=False)
 
 
-def test_type_array_schema():
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_type_array_schema(backend):
     schema_in = {'type': 'array'}
-    schema_out = to_voluptuous(schema_in)
+    schema_out = to_validator(schema_in, backend=backend)
     for target in (
         [],
         [1],
@@ -128,14 +135,15 @@ def test_type_array_schema():
         check_voluptuous_validation(schema_out, target, should_validate=False)
 
 
-def test_type_array_schema_with_items():
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_type_array_schema_with_items(backend):
     schema_in = {
         'type': 'array',
         'items': {
             'type': 'boolean',
         },
     }
-    schema_out = to_voluptuous(schema_in)
+    schema_out = to_validator(schema_in, backend=backend)
 
     for target in (
         [],
@@ -176,7 +184,8 @@ def test_type_array_schema_with_items():
         check_voluptuous_validation(schema_out, target, should_validate=False)
 
 
-def test_type_array_schema_with_items_list():
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_type_array_schema_with_items_list(backend):
     # This form validates an _ordered_ array. The n-th schema in `items` must
     # validate the n-th element in the target being validated.
     #
@@ -185,7 +194,7 @@ def test_type_array_schema_with_items_list():
         'type': 'array',
         'items': [{'type': 'number'}, {'type': 'string'}],
     }
-    schema_out = to_voluptuous(schema_in)
+    schema_out = to_validator(schema_in, backend=backend)
 
     for target in (
         [],
@@ -225,13 +234,14 @@ def test_type_array_schema_with_items_list():
         check_voluptuous_validation(schema_out, target, should_validate=False)
 
 
-def test_type_array_with_items_list_and_additional_items_false():
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_type_array_with_items_list_and_additional_items_false(backend):
     schema_in = {
         'type': 'array',
         'items': [{'type': 'boolean'}, {'type': 'integer'}],
         'additionalItems': False,
     }
-    schema_out = to_voluptuous(schema_in)
+    schema_out = to_validator(schema_in, backend=backend)
 
     for target in (
         [],
@@ -260,14 +270,15 @@ def test_type_array_with_items_list_and_additional_items_false():
         check_voluptuous_validation(schema_out, target, should_validate=False)
 
 
-def test_type_array_with_min_and_max_items():
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_type_array_with_min_and_max_items(backend):
     schema_in = {
         'type': 'array',
         'items': {'type': 'integer'},
         'minItems': 2,
         'maxItems': 5,
     }
-    schema_out = to_voluptuous(schema_in)
+    schema_out = to_validator(schema_in, backend=backend)
 
     for target in (
         [1, 2],
@@ -297,7 +308,8 @@ def test_type_array_with_min_and_max_items():
         check_voluptuous_validation(schema_out, target, should_validate=False)
 
 
-def test_type_array_with_min_and_max_items_and_items_list():
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_type_array_with_min_and_max_items_and_items_list(backend):
     schema_in = {
         'type': 'array',
         'items': [
@@ -306,7 +318,7 @@ def test_type_array_with_min_and_max_items_and_items_list():
         'minItems': 1,
         'maxItems': 4,
     }
-    schema_out = to_voluptuous(schema_in)
+    schema_out = to_validator(schema_in, backend=backend)
 
     for target in (
         [1],
@@ -337,12 +349,13 @@ def test_type_array_with_min_and_max_items_and_items_list():
         check_voluptuous_validation(schema_out, target, should_validate=False)
 
 
-def test_schema_with_any_of():
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_schema_with_any_of(backend):
     schema_in = {'anyOf': [
         {'type': 'string'},
         {'type': 'integer'},
     ]}
-    schema_out = to_voluptuous(schema_in)
+    schema_out = to_validator(schema_in, backend=backend)
 
     for target in (
         'a',
@@ -364,12 +377,13 @@ def test_schema_with_any_of():
         check_voluptuous_validation(schema_out, target, should_validate=False)
 
 
-def test_schema_with_all_of():
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_schema_with_all_of(backend):
     schema_in = {'allOf': [
         {'type': 'string'},
         {'maxLength': 5},
     ]}
-    schema_out = to_voluptuous(schema_in)
+    schema_out = to_validator(schema_in, backend=backend)
 
     for target in (
         '',
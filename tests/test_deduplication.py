@@ -0,0 +1,101 @@
+import pytest
+
+from voluptuary import Converter, canonical_key
+from voluptuary.compiled import Compiler
+from .conversion import check_conversion
+
+ADDRESS = {
+    'type': 'object',
+    'required': ['street'],
+    'properties': {
+        'street': {'type': 'string'},
+        'zip': {'minLength': 1, 'maxLength': 5},
+    },
+}
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'home': ADDRESS,
+        'work': dict(ADDRESS),
+        'name': {'maxLength': 5, 'minLength': 1},
+    },
+}
+
+
+def test_identical_subschemas_are_shared():
+    converter = Converter(SCHEMA)
+    result = converter.convert()
+    home, work = result.schema['home'], result.schema['work']
+    assert home is work
+    # the second address, and the name (the same as zip, with keys in a
+    # different order)
+    assert converter.deduplicated == 2
+
+
+def test_identical_subschemas_are_shared_when_compiled():
+    compiler = Compiler(SCHEMA)
+    compiler.compile()
+    assert compiler.deduplicated == 2
+
+
+def test_deduplicated_schema_conversion():
+    check_conversion(
+        schema_in=SCHEMA,
+        accepted_targets=(
+            {},
+            {'home': {'street': 'a'}, 'work': {'street': 'b', 'zip': '1'}},
+            {'name': 'abc'},
+        ),
+        unaccepted_targets=(
+            {'home': {}},
+            {'work': {'street': 1}},
+            {'home': {'street': 'a', 'zip': '123456'}},
+            {'name': 'abcdef'},
+            {'name': ''},
+        ),
+    )
+
+
+@pytest.mark.parametrize('a, b', [
+    ({'type': 'integer', 'maximum': 1}, {'type': 'integer', 'maximum': 2}),
+    ({'type': 'number', 'maximum': 1}, {'type': 'number', 'maximum': 1.5}),
+    ({'type': 'string'}, {'type': ['string']}),
+])
+def test_different_subschemas_are_not_shared(a, b):
+    # compare the conversions, since simplifying may share equal validators
+    converter = Converter({'type': 'array', 'items': [a, b]}, optimize=False)
+    result = converter.convert()
+    first, second = result.schema.validators[0].schemas
+    assert first is not second
+
+
+def test_canonical_keys():
+    assert canonical_key(ADDRESS) == canonical_key(dict(ADDRESS))
+    assert canonical_key(ADDRESS) != canonical_key(dict(ADDRESS, type='array'))
+    assert canonical_key({'maximum': 1}) != canonical_key({'maximum': 1.0})
+    assert canonical_key({'const': True}) != canonical_key({'const': 1})
+    assert canonical_key([{}]) != canonical_key({})
+    assert canonical_key('#/definitions/a') == '#/definitions/a'
+    # the keys of objects and arrays are digests, however big the schema
+    assert len(canonical_key(SCHEMA)) == len(canonical_key({}))
+
+
+def test_canonical_keys_of_subschemas_are_memoized():
+    memo = {}
+    key = canonical_key(SCHEMA, memo)
+    properties = SCHEMA['properties']
+    assert memo[id(SCHEMA)] == (SCHEMA, key)
+    assert memo[id(properties['home'])][1] == memo[id(properties['work'])][1]
+    assert canonical_key(properties, memo) == canonical_key(dict(properties))
+
+
+def test_canonical_keys_of_non_json_schemas():
+    cycle = {}
+    cycle['not'] = cycle
+    assert canonical_key(cycle) is None
+    memo = {}
+    schema = {'a': {'enum': {1, 2}}, 'b': {'enum': [1, 2]}}
+    assert canonical_key(schema, memo) is None
+    assert canonical_key(schema['a'], memo) is None
+    assert canonical_key(schema['b'], memo) is not None
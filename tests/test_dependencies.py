@@ -0,0 +1,85 @@
+import pytest
+import voluptuous
+
+from voluptuary import BACKENDS, to_validator
+from .conversion import check_conversion
+
+SCHEMA = {
+    'type': 'object',
+    'dependencies': {
+        'credit_card': ['billing_address', 'name'],
+        'name': [],
+        'shipping': {
+            'type': 'object',
+            'required': ['address'],
+            'properties': {'address': {'type': 'string'}},
+        },
+    },
+}
+
+
+def test_dependencies():
+    check_conversion(
+        schema_in=SCHEMA,
+        accepted_targets=(
+            {},
+            {'name': 'a'},
+            {'credit_card': 1, 'billing_address': 'a', 'name': 'b'},
+            {'billing_address': 'a'},
+            {'shipping': True, 'address': 'a'},
+        ),
+        unaccepted_targets=(
+            {'credit_card': 1},
+            {'credit_card': 1, 'name': 'b'},
+            {'shipping': True},
+            {'shipping': True, 'address': 1},
+        ),
+    )
+
+
+def test_dependencies_without_type():
+    check_conversion(
+        schema_in={'dependencies': {'a': ['b']}},
+        accepted_targets=({'a': 1, 'b': 2}, {'b': 1}, 1, 'a', [1]),
+        unaccepted_targets=({'a': 1}, ),
+    )
+
+
+def test_schema_dependencies_without_type():
+    check_conversion(
+        schema_in={
+            'dependencies': {
+                'a': {'required': ['b']},
+                'c': {
+                    'properties': {'c': {}, 'd': {'type': 'integer'}},
+                    'additionalProperties': False,
+                },
+            },
+        },
+        accepted_targets=(
+            {'a': 1, 'b': 2},
+            {'b': 1},
+            {'c': 1, 'd': 2},
+            1,
+            [1],
+        ),
+        unaccepted_targets=(
+            {'a': 1},
+            {'c': 1, 'd': 'x'},
+            {'c': 1, 'e': 2},
+        ),
+    )
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_missing_dependencies_are_reported(backend):
+    validate = to_validator(SCHEMA, backend=backend)
+    with pytest.raises(voluptuous.MultipleInvalid) as e:
+        validate({'credit_card': 1, 'shipping': 1})
+    assert sorted(str(error) for error in e.value.errors) == [
+        "required key not provided @ data['address']",
+        'required key not provided, as a dependency of credit_card '
+        "@ data['billing_address']",
+        'required key not provided, as a dependency of credit_card '
+        "@ data['name']",
+    ]
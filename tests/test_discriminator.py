@@ -0,0 +1,125 @@
+import pytest
+
+from voluptuary import Converter, DiscriminatedUnion, Resolver
+from voluptuary import discriminate, scalar_key
+from .conversion import check_conversion
+
+
+def variant(tag, value_type):
+    return {
+        'type': 'object',
+        'required': ['type', 'value'],
+        'properties': {
+            'type': {'enum': tag},
+            'value': {'type': value_type},
+        },
+    }
+
+
+EVENTS = {
+    'definitions': {
+        'created': variant(['created'], 'integer'),
+        'deleted': variant(['deleted', 'removed'], 'string'),
+    },
+    'oneOf': [
+        {'$ref': '#/definitions/created'},
+        {'$ref': '#/definitions/deleted'},
+        variant([1, None], 'boolean'),
+    ],
+}
+
+
+def test_discriminated_one_of():
+    check_conversion(
+        schema_in=EVENTS,
+        accepted_targets=(
+            {'type': 'created', 'value': 1},
+            {'type': 'removed', 'value': 'a'},
+            {'type': 1.0, 'value': True},
+            {'type': None, 'value': False},
+        ),
+        unaccepted_targets=(
+            {'type': 'created', 'value': 'a'},
+            {'type': 'deleted', 'value': 1},
+            {'type': 'other', 'value': 1},
+            # true is not equal to 1 in JSON
+            {'type': True, 'value': True},
+            {'type': ['created'], 'value': 1},
+            {'type': {}, 'value': 1},
+            # without the discriminator, no branch accepts these
+            {'value': 1},
+            1,
+        ),
+    )
+
+
+def test_discriminated_any_of_without_required_discriminator():
+    check_conversion(
+        schema_in={
+            'anyOf': [
+                {
+                    'type': 'object',
+                    'properties': {
+                        'kind': {'enum': ['a'], 'type': 'string'},
+                        'n': {'type': 'integer'},
+                    },
+                },
+                {
+                    'type': 'object',
+                    'required': ['s'],
+                    'properties': {
+                        'kind': {'enum': ['b']},
+                        's': {'type': 'string'},
+                    },
+                },
+            ],
+        },
+        accepted_targets=(
+            {'kind': 'a', 'n': 1},
+            {'kind': 'b', 's': 'x'},
+            {'n': 1},
+            {'s': 'x'},
+            {},
+        ),
+        unaccepted_targets=(
+            {'kind': 'a', 'n': 'x'},
+            {'kind': 'b'},
+            {'kind': 'c'},
+            'a',
+        ),
+    )
+
+
+def test_union_is_dispatched():
+    schema = Converter(EVENTS).convert()
+    union = schema.schema
+    assert isinstance(union, DiscriminatedUnion)
+    assert union.key == 'type'
+    assert union.choices[scalar_key('deleted')] is \
+        union.choices[scalar_key('removed')]
+    assert union.choices[scalar_key(1)] is union.choices[scalar_key(None)]
+
+
+@pytest.mark.parametrize('schemas', [
+    # a value allowed by two branches
+    [variant(['a', 'b'], 'string'), variant(['b'], 'string')],
+    [variant([1], 'string'), variant([1.0], 'string')],
+    # not an enum of scalars
+    [variant([['a']], 'string'), variant(['b'], 'string')],
+    [variant(['a'], 'string'), {'properties': {'type': {'type': 'string'}}}],
+    # not every branch has the property
+    [variant(['a'], 'string'), {'properties': {}}],
+    [variant(['a'], 'string'), {'type': 'string'}],
+    [variant(['a'], 'string')],
+])
+def test_no_discriminator(schemas):
+    assert discriminate(schemas, Resolver({})) is None
+
+
+def test_scalar_key():
+    assert scalar_key(1) == scalar_key(1.0)
+    assert scalar_key(True) != scalar_key(1)
+    assert scalar_key(False) != scalar_key(0)
+    assert scalar_key('1') != scalar_key(1)
+    with pytest.raises(TypeError):
+        hash(scalar_key([1]))
@@ -0,0 +1,83 @@
+import pytest
+import voluptuous
+
+from voluptuary import BACKENDS, Enum, to_validator, to_voluptuous
+from voluptuary.cache import dumps, loads
+from .conversion import check_conversion
+
+
+def test_enum():
+    check_conversion(
+        schema_in={'enum': ['a', 1, None, True, [1, 'b'], {'x': [1, 2]}]},
+        accepted_targets=(
+            'a', 1, 1.0, None, True, [1, 'b'], [1.0, 'b'], {'x': [1, 2.0]},
+        ),
+        unaccepted_targets=(
+            'b', 2, 1.5, False, [1], ['b', 1], {'x': [2, 1]}, {}, '1', [True],
+        ),
+    )
+
+
+def test_enum_distinguishes_booleans_from_numbers():
+    check_conversion(
+        schema_in={'enum': [0, 1]},
+        accepted_targets=(0, 1, 0.0),
+        unaccepted_targets=(False, True),
+    )
+    check_conversion(
+        schema_in={'enum': [False]},
+        accepted_targets=(False, ),
+        unaccepted_targets=(0, 0.0, None),
+    )
+
+
+def test_enum_with_other_keywords():
+    check_conversion(
+        schema_in={'type': 'string', 'enum': ['a', 'bb', 1], 'maxLength': 1},
+        accepted_targets=('a', ),
+        unaccepted_targets=('bb', 1, 'c'),
+    )
+    check_conversion(
+        schema_in={
+            'type': 'object',
+            'properties': {'code': {'enum': ['GB', 'FR']}},
+            'enum': [{'code': 'GB'}, {'code': 'XX'}, {}],
+        },
+        accepted_targets=({'code': 'GB'}, {}),
+        unaccepted_targets=({'code': 'FR'}, {'code': 'XX'}, 'GB'),
+    )
+
+
+def test_large_enum():
+    codes = ['C%05d' % i for i in range(10000)]
+    check_conversion(
+        schema_in={'type': 'array', 'items': {'enum': codes}},
+        accepted_targets=([], codes[:10], codes[-10:]),
+        unaccepted_targets=(['C10000'], ['c00001'], [1]),
+    )
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_enum_error(backend):
+    validate = to_validator({'enum': ['a', 'b']}, backend=backend)
+    with pytest.raises(voluptuous.MultipleInvalid) as e:
+        validate('c')
+    assert isinstance(e.value.errors[0], voluptuous.InInvalid)
+    assert e.value.errors[0].msg == "value must be one of ['a', 'b']"
+
+
+def test_membership():
+    enum = Enum([1, 'a', [{}], {'b': None}])
+    assert 1.0 in enum
+    assert True not in enum
+    assert [{}] in enum
+    assert {'b': None} in enum
+    assert {'b': False} not in enum
+    assert {1} not in enum
+
+
+def test_round_trip():
+    schema = loads(dumps(to_voluptuous({'enum': ['a', [1]]})))
+    assert schema([1]) == [1]
+    with pytest.raises(voluptuous.MultipleInvalid):
+        schema('b')
@@ -0,0 +1,126 @@
+import pytest
+import voluptuous
+
+from voluptuary import BACKENDS, ConvertedSchema, EnumArray, LimitedSchema
+from voluptuary import to_validator
+from voluptuary import to_voluptuous
+from voluptuary.cache import dumps, loads
+from .conversion import check_jsonschema_validation
+from .conversion import check_voluptuous_validation
+
+SCHEMA = {
+    'type': 'object',
+    'required': ['id'],
+    'properties': {
+        'id': {'type': 'integer'},
+        'a': {'type': 'integer', 'minimum': 0},
+        'b': {'type': 'string'},
+        'c': {
+            'type': 'object',
+            'properties': {
+                'd': {'type': 'integer'},
+                'e': {'type': 'integer'},
+            },
+        },
+        'f': {'type': 'array', 'items': {'type': 'integer'}},
+        'g': {
+            'type': 'array',
+            'items': [{'type': 'integer'}, {'type': 'string'}],
+        },
+    },
+    'additionalProperties': False,
+}
+
+VALID = {'id': 1, 'a': 0, 'c': {'d': 1}, 'f': [1, 2], 'g': [1, 'x']}
+# with an error in every property, and a missing required property
+INVALID = {
+    'a': -1,
+    'b': 1,
+    'c': {'d': 'x', 'e': 'y'},
+    'f': [1, 'x', 'y'],
+    'g': ['x', 1],
+    'x': 1,
+}
+INVALID_DOCUMENTS = [
+    INVALID,
+    {},
+    {'id': 1, 'a': -1},
+    {'id': 1, 'c': {'e': 'y'}},
+    {'id': 1, 'f': [1, 'x']},
+    {'id': 1, 'g': [1, 1]},
+    {'id': 1, 'x': 1},
+]
+
+
+def errors(validator, value):
+    try:
+        validator(value)
+    except voluptuous.MultipleInvalid as e:
+        return e.errors
+    return []
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('max_errors', [None, 1, 2, 100])
+def test_validity_does_not_depend_on_mode(backend, max_errors):
+    validator = to_validator(SCHEMA, backend, max_errors=max_errors)
+    check_jsonschema_validation(SCHEMA, VALID, should_validate=True)
+    check_voluptuous_validation(validator, VALID, should_validate=True)
+    for invalid in INVALID_DOCUMENTS:
+        check_jsonschema_validation(SCHEMA, invalid, should_validate=False)
+        check_voluptuous_validation(validator, invalid, should_validate=False)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_collect_all(backend):
+    found = errors(to_validator(SCHEMA, backend), INVALID)
+    assert set(str(e.path[0]) for e in found) == set(
+        ['a', 'b', 'c', 'f', 'g', 'x', 'id']
+    )
+    assert len(found) >= 9
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('max_errors', [1, 2, 3])
+def test_bounded(backend, max_errors):
+    validator = to_validator(SCHEMA, backend, max_errors=max_errors)
+    assert len(errors(validator, INVALID)) == max_errors
+    assert len(errors(validator, {'f': ['x'] * 10})) == max_errors
+    assert len(errors(validator, {'id': 1, 'b': 1})) == 1
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_invalid_max_errors(backend):
+    with pytest.raises(ValueError):
+        to_validator(SCHEMA, backend, max_errors=0)
+
+
+def test_limited_schemas_are_built():
+    schema = to_voluptuous(SCHEMA, max_errors=2)
+    assert isinstance(schema, LimitedSchema)
+    assert isinstance(schema.schema['c'], LimitedSchema)
+    assert schema.schema['c'].max_errors == 2
+    assert type(to_voluptuous(SCHEMA)) is ConvertedSchema
+
+
+def test_limited_schema_round_trip():
+    schema = loads(dumps(to_voluptuous(SCHEMA, max_errors=1)))
+    assert schema.max_errors == 1
+    assert len(errors(schema, INVALID)) == 1
+
+
+def test_limited_schema_error_messages():
+    found = errors(to_voluptuous(SCHEMA, max_errors=10), INVALID)
+    expected = errors(to_voluptuous(SCHEMA), INVALID)
+    assert sorted(str(e) for e in found) == sorted(str(e) for e in expected)
+
+
+def test_enum_array_collects_errors():
+    array = EnumArray([voluptuous.Schema(int)] * 3, additional_items=True)
+    with pytest.raises(voluptuous.MultipleInvalid) as e:
+        array(['a', 1, 'b'])
+    assert [x.path for x in e.value.errors] == [[0], [2]]
+    array.max_errors = 1
+    with pytest.raises(voluptuous.MultipleInvalid) as e:
+        array(['a', 1, 'b'])
+    assert [x.path for x in e.value.errors] == [[0]]
@@ -0,0 +1,118 @@
+import pytest
+import voluptuous
+
+from voluptuary import BACKENDS, to_validator, to_voluptuous
+from voluptuary.formats import FORMATS, register_format
+from voluptuary.cache import dumps, loads
+
+
+VALID = {
+    'date-time': [
+        '2017-07-21T17:32:28Z',
+        '2017-07-21t17:32:28.123456z',
+        '2016-02-29T00:00:00+01:00',
+        '1990-12-31T23:59:60-08:30',
+    ],
+    'email': ['a@b', 'first.last+tag@example.co.uk', "o'neil@x-y.org"],
+    'hostname': ['localhost', 'a.b-c.example', 'x' * 63 + '.com', '1.2.3'],
+    'ipv4': ['0.0.0.0', '192.168.1.255'],
+    'ipv6': ['::', '::1', 'fe80::1:2:3:4', '2001:db8::ff00:42:8329'],
+    'uri': [
+        'http://example.com/a?b=c#d',
+        'urn:isbn:0451450523',
+        'mailto:a@b.com',
+        'http://[::1]:80/%20',
+    ],
+}
+
+INVALID = {
+    'date-time': [
+        '2017-07-21',
+        '2017-07-21T17:32:28',
+        '2017-07-21 17:32:28Z',
+        '2017-13-01T00:00:00Z',
+        '2017-02-29T00:00:00Z',
+        '1900-02-29T00:00:00Z',
+        '2017-04-31T00:00:00Z',
+        '2017-07-21T24:00:00Z',
+        '2017-07-21T00:60:00Z',
+        '2017-07-21T00:00:61Z',
+        '2017-07-21T00:00:00+24:00',
+        '2017-07-21T00:00:00Z\n',
+        '２０１７-07-21T00:00:00Z',
+    ],
+    'email': ['', 'a', '@b', 'a@', 'a@b@c', 'a b@c', 'a..b@c', 'a@-b'],
+    'hostname': ['', '-a', 'a-', 'a..b', 'a_b', 'x' * 64, 'a.' * 127 + 'ab'],
+    'ipv4': ['', '1.2.3', '1.2.3.256', '01.2.3.4', '::1', ' 1.2.3.4'],
+    'ipv6': ['', '1.2.3.4', ':::', '::g', 'fe80::1%eth0', '1::2::3'],
+    'uri': ['', 'example.com', '//example.com', 'http://a b', '1http:x'],
+}
+
+
+@pytest.mark.parametrize('name', sorted(FORMATS))
+def test_checkers(name):
+    checker = FORMATS[name]
+    for value in VALID[name]:
+        assert checker(value), value
+    for value in INVALID[name]:
+        assert not checker(value), value
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_formats_are_checked(backend):
+    validate = to_validator(
+        {
+            'type': 'object',
+            'properties': {
+                'ip': {'format': 'ipv4'},
+                'at': {'type': 'string', 'format': 'date-time'},
+                'unknown': {'type': 'string', 'format': 'color'},
+            },
+        },
+        backend=backend,
+        check_formats=True,
+    )
+    assert validate({'ip': '1.2.3.4', 'at': '2017-07-21T17:32:28Z'})
+    assert validate({'ip': 1, 'unknown': 'anything'})
+    with pytest.raises(voluptuous.MultipleInvalid) as e:
+        validate({'ip': '1.2.3', 'at': '2017-07-21'})
+    assert sorted((error.path, error.msg) for error in e.value.errors) == [
+        (['at'], 'value is not a valid date-time'),
+        (['ip'], 'value is not a valid ipv4'),
+    ]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_formats_are_ignored_by_default(backend):
+    validate = to_validator({'format': 'ipv4'}, backend=backend)
+    assert validate('x') == 'x'
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_register_format(backend, monkeypatch):
+    monkeypatch.setitem(FORMATS, 'email', FORMATS['email'])
+    monkeypatch.delitem(FORMATS, 'even', raising=False)
+    assert register_format('even', _is_even) is _is_even
+    register_format('email', lambda value: value.endswith('@example.com'))
+    validate = to_validator(
+        {'type': 'array', 'items': [{'format': 'even'}, {'format': 'email'}]},
+        backend=backend,
+        check_formats=True,
+    )
+    assert validate(['12', 'a@example.com'])
+    for value in (['1'], ['2', 'a@b.com']):
+        with pytest.raises(voluptuous.MultipleInvalid):
+            validate(value)
+
+
+def _is_even(value):
+    return int(value) % 2 == 0
+
+
+def test_round_trip():
+    schema = loads(dumps(
+        to_voluptuous({'format': 'hostname'}, check_formats=True)
+    ))
+    assert schema('a.b') == 'a.b'
+    with pytest.raises(voluptuous.MultipleInvalid):
+        schema('a..b')
@@ -0,0 +1,173 @@
+import copy
+
+import pytest
+import voluptuous
+
+from voluptuary import Converter
+from .conversion import check_jsonschema_validation
+
+SCHEMA = {
+    'definitions': {
+        'id': {'type': 'integer', 'minimum': 0},
+        'name': {'type': 'string', 'maxLength': 5},
+        'person': {
+            'type': 'object',
+            'required': ['id'],
+            'properties': {
+                'id': {'$ref': '#/definitions/id'},
+                'name': {'$ref': '#/definitions/name'},
+                'friends': {
+                    'type': 'array',
+                    'items': {'$ref': '#/definitions/person'},
+                },
+            },
+        },
+    },
+    'type': 'object',
+    'properties': {
+        'owner': {'$ref': '#/definitions/person'},
+        'count': {'type': 'integer', 'maximum': 10},
+        'label': {'type': 'string'},
+    },
+}
+
+
+def changed(schema, path, value):
+    schema = copy.deepcopy(schema)
+    node = schema
+    for key in path[:-1]:
+        node = node[key]
+    node[path[-1]] = value
+    return schema
+
+
+def is_valid(schema, value):
+    try:
+        schema(value)
+    except voluptuous.Invalid:
+        return False
+    return True
+
+
+def check_versions(converter, schema, values):
+    """Check that `converter.update(schema)` validates like `schema`"""
+    validate = converter.update(schema)
+    for value in values:
+        valid = is_valid(validate, value)
+        check_jsonschema_validation(schema, value, should_validate=valid)
+        assert valid == is_valid(Converter(schema).convert(), value)
+
+
+VALUES = [
+    {},
+    {'count': 11},
+    {'count': 5, 'label': 'a'},
+    {'owner': {'id': 1}},
+    {'owner': {'id': -1}},
+    {'owner': {'id': 1, 'name': 'abcdef'}},
+    {'owner': {'id': 1, 'friends': [{'id': 2, 'name': 'a'}]}},
+    {'owner': {'id': 1, 'friends': [{'id': -2}]}},
+    {'owner': {'id': 1, 'friends': [{'id': 2, 'name': 'abcdef'}]}},
+    {'owner': {'id': 1, 'friends': [{'name': 'a'}]}},
+]
+
+
+@pytest.mark.parametrize('optimize', [True, False])
+@pytest.mark.parametrize('path, value', [
+    (['properties', 'count', 'maximum'], 20),
+    (['properties', 'label'], {'type': 'integer'}),
+    # refs whose targets changed
+    (['definitions', 'id', 'minimum'], -5),
+    (['definitions', 'name'], {'type': 'string', 'maxLength': 10}),
+    (['definitions', 'person', 'required'], ['name']),
+    (['definitions', 'person', 'properties', 'friends', 'maxItems'], 0),
+])
+def test_update(optimize, path, value):
+    converter = Converter(SCHEMA, optimize=optimize, incremental=True)
+    converter.convert()
+    new_schema = changed(SCHEMA, path, value)
+    check_versions(converter, new_schema, VALUES)
+    # and back
+    check_versions(converter, SCHEMA, VALUES)
+
+
+def test_unchanged_subschemas_are_reused():
+    converter = Converter(SCHEMA, incremental=True)
+    before = converter.convert()
+    after = converter.update(
+        changed(SCHEMA, ['properties', 'count', 'maximum'], 20)
+    )
+    assert after is not before
+    assert after.schema['owner'] is before.schema['owner']
+    assert after.schema['label'] is before.schema['label']
+    assert after.schema['count'] is not before.schema['count']
+
+
+def test_dependents_of_changed_refs_are_converted_again():
+    schema = {
+        'definitions': {
+            'a': {'$ref': '#/definitions/b'},
+            'b': {'$ref': '#/definitions/c'},
+            'c': {'type': 'integer'},
+        },
+        'type': 'object',
+        'properties': {
+            'x': {'$ref': '#/definitions/a'},
+            'y': {'type': 'string'},
+        },
+    }
+    converter = Converter(schema, incremental=True)
+    before = converter.convert()
+    new_schema = changed(schema, ['definitions', 'c'], {'type': 'string'})
+    after = converter.update(new_schema)
+    assert after.schema['y'] is before.schema['y']
+    assert after({'x': 'a'}) == {'x': 'a'}
+    with pytest.raises(voluptuous.MultipleInvalid):
+        after({'x': 1})
+
+
+def test_discriminator_of_changed_ref():
+    def variant(tag):
+        return {
+            'type': 'object',
+            'properties': {'kind': {'enum': [tag]}},
+        }
+
+    schema = {
+        'definitions': {'a': variant('a'), 'b': variant('b')},
+        'oneOf': [{'$ref': '#/definitions/a'}, {'$ref': '#/definitions/b'}],
+    }
+    converter = Converter(schema, incremental=True)
+    converter.convert()
+    new_schema = changed(schema, ['definitions', 'b'], variant('c'))
+    check_versions(
+        converter, new_schema, [{'kind': 'a'}, {'kind': 'b'}, {'kind': 'c'}]
+    )
+
+
+def test_unused_conversions_are_dropped():
+    converter = Converter(SCHEMA, incremental=True)
+    converter.convert()
+    sizes = {(len(converter._interned), len(converter._ref_cache))}
+    for i in range(5):
+        converter.update(
+            changed(SCHEMA, ['definitions', 'id', 'minimum'], i)
+        )
+        sizes.add((len(converter._interned), len(converter._ref_cache)))
+    assert len(sizes) == 1
+
+
+def test_update_after_failed_update():
+    converter = Converter(SCHEMA, incremental=True)
+    converter.convert()
+    broken = changed(SCHEMA, ['definitions', 'id'], {'$ref': '#/missing'})
+    with pytest.raises(Exception):
+        converter.update(broken)
+    check_versions(converter, SCHEMA, VALUES)
+
+
+def test_update_needs_incremental_converter():
+    converter = Converter(SCHEMA)
+    converter.convert()
+    with pytest.raises(ValueError):
+        converter.update(SCHEMA)
@@ -0,0 +1,118 @@
+import pytest
+import voluptuous
+
+from voluptuary import BACKENDS, AnyOf, OneOf, to_validator, to_voluptuous
+from voluptuary.batch import filter_valid
+from voluptuary.cache import dumps, loads
+
+BRANCHES = {
+    'anyOf': [
+        {
+            'type': 'object',
+            'required': ['a'],
+            'properties': {'a': {'type': 'integer', 'minimum': 0}},
+        },
+        {
+            'type': 'object',
+            'required': ['b'],
+            'properties': {'b': {'type': 'string', 'pattern': '^x'}},
+        },
+    ],
+}
+ONE_OF = {
+    'oneOf': [{'type': 'integer'}, {'type': 'number', 'minimum': 2}],
+}
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('max_errors', [None, 1])
+def test_is_valid(backend, max_errors):
+    schema = to_validator(BRANCHES, backend=backend, max_errors=max_errors)
+    assert schema.is_valid({'a': 1})
+    assert schema.is_valid({'b': 'xy', 'c': None})
+    assert not schema.is_valid({'a': -1})
+    assert not schema.is_valid({'b': 'y'})
+    assert not schema.is_valid([])
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_is_valid_with_recursive_refs(backend):
+    schema = to_validator(
+        {
+            'definitions': {
+                'tree': {
+                    'type': 'object',
+                    'properties': {
+                        'children': {
+                            'type': 'array',
+                            'items': {'$ref': '#/definitions/tree'},
+                        },
+                    },
+                    'additionalProperties': False,
+                },
+            },
+            '$ref': '#/definitions/tree',
+        },
+        backend=backend,
+    )
+    assert schema.is_valid({'children': [{'children': []}, {}]})
+    assert not schema.is_valid({'children': [{'children': [{'x': 1}]}]})
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_one_of_errors(backend):
+    validate = to_validator(ONE_OF, backend=backend)
+    assert validate(2.5) == 2.5
+    # valid against both branches
+    with pytest.raises(voluptuous.MultipleInvalid):
+        validate(3)
+    with pytest.raises(voluptuous.MultipleInvalid):
+        validate(1.5)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_any_of_errors(backend):
+    validate = to_validator(BRANCHES, backend=backend)
+    with pytest.raises(voluptuous.MultipleInvalid) as e:
+        validate({'a': -1})
+    assert e.value.errors[0].path == ['a']
+
+
+@pytest.mark.parametrize('union, json_schema', [
+    (AnyOf, BRANCHES),
+    (OneOf, ONE_OF),
+])
+def test_valid_values_are_not_validated(monkeypatch, union, json_schema):
+    schema = to_voluptuous(json_schema)
+    assert isinstance(schema.schema, union)
+
+    def fail(*args):
+        raise AssertionError('a valid value should only be probed')
+
+    monkeypatch.setattr(voluptuous.Any, '_exec', fail)
+    monkeypatch.setattr(voluptuous.SomeOf, '_exec', fail)
+    for value in ({'a': 1}, 2.5):
+        if schema.is_valid(value):
+            assert schema(value) == value
+
+
+def test_is_valid_after_pickling():
+    schema = loads(dumps(to_voluptuous(BRANCHES)))
+    assert schema.is_valid({'a': 1})
+    assert not schema.is_valid({'a': -1})
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_filter_valid(backend):
+    schema = to_validator(BRANCHES, backend=backend)
+    documents = [{'a': 1}, {'a': -1}, {'b': 'x'}, None, {'b': 'y'}]
+    assert list(filter_valid(schema, iter(documents))) == [
+        {'a': 1}, {'b': 'x'}
+    ]
+
+
+def test_filter_valid_with_a_voluptuous_schema():
+    schema = voluptuous.Schema({'a': int})
+    assert list(filter_valid(schema, [{'a': 1}, {'a': 'b'}, {}])) == [
+        {'a': 1}, {}
+    ]
@@ -0,0 +1,217 @@
+import re
+import sys
+
+import pytest
+import voluptuous
+
+from voluptuary import Converter, to_string, to_voluptuous
+from voluptuary.compiled import Compiler, compile_schema
+from .conversion import check_conversion
+
+# deeper than the recursion limit allows converting by recursion
+DEPTH = sys.getrecursionlimit() + 100
+
+
+class RecursiveConverter(Converter):
+    """Converts the subschemas each node yields by a nested conversion"""
+
+    def _convert_node(self, schema):
+        steps = super()._convert_node(schema)
+        value = error = None
+        while True:
+            try:
+                if error is None:
+                    subschema = steps.send(value)
+                else:
+                    subschema = steps.throw(error)
+            except StopIteration as e:
+                return e.value
+            try:
+                value, error = self._convert(subschema), None
+            except Exception as e:
+                value, error = None, e
+        # a generator, which never yields
+        yield
+
+
+def nested(schema, wrap, depth=DEPTH):
+    for _ in range(depth):
+        schema = wrap(schema)
+    return schema
+
+
+def properties_chain(depth=DEPTH):
+    return nested(
+        {'type': 'integer'},
+        lambda schema: {'type': 'object', 'properties': {'a': schema}},
+        depth,
+    )
+
+
+def items_chain(depth=DEPTH):
+    return nested(
+        {'type': 'integer'},
+        lambda schema: {'type': 'array', 'items': schema},
+        depth,
+    )
+
+
+def refs_chain(depth=DEPTH):
+    definitions = {'d%s' % depth: {'type': 'integer'}}
+    for i in range(depth):
+        definitions['d%s' % i] = {
+            'type': 'object',
+            'properties': {'a': {'$ref': '#/definitions/d%s' % (i + 1)}},
+        }
+    return {'definitions': definitions, '$ref': '#/definitions/d0'}
+
+
+def without_addresses(string):
+    return re.sub(r' at 0x[0-9a-f]+', '', string)
+
+
+def is_valid(schema, value):
+    try:
+        schema(value)
+    except voluptuous.Invalid:
+        return False
+    return True
+
+
+@pytest.mark.parametrize('make_schema', [properties_chain, refs_chain])
+def test_deep_objects(make_schema):
+    schema = Converter(make_schema()).convert()
+    assert is_valid(schema, {'a': {'a': {}}})
+    assert not is_valid(schema, {'a': {'a': 1}})
+    assert not is_valid(schema, {'a': []})
+
+
+@pytest.mark.parametrize('optimize', [True, False])
+def test_deep_arrays(optimize):
+    schema = Converter(items_chain(), optimize=optimize).convert()
+    assert is_valid(schema, [[[]], []])
+    assert not is_valid(schema, [[[1]]])
+    assert not is_valid(schema, [1])
+
+
+def test_recursive_conversion_fails():
+    with pytest.raises(RecursionError):
+        RecursiveConverter(properties_chain()).convert()
+
+
+@pytest.mark.parametrize('make_schema', [
+    properties_chain, items_chain, refs_chain,
+])
+def test_deep_schemas_compile(make_schema):
+    schema = compile_schema(make_schema())
+    assert schema.is_valid([[[]]] if make_schema is items_chain else {})
+    assert not schema.is_valid('a')
+    with pytest.raises(voluptuous.MultipleInvalid):
+        schema('a')
+
+
+@pytest.mark.parametrize('wrap', [
+    lambda schema: {'anyOf': [schema, {'type': 'string'}]},
+    lambda schema: {'allOf': [schema, {}]},
+    lambda schema: {'not': schema},
+])
+def test_deep_combinators(wrap):
+    # validating values which go through every level recurses
+    to_voluptuous(nested({'type': 'integer'}, wrap))
+    check_conversion(
+        nested({'type': 'integer'}, wrap, depth=50), [1, 2], [None]
+    )
+
+
+def test_deep_schema_with_tracer():
+    events = []
+    Converter(properties_chain(), tracer=events.append).convert()
+    nodes = [e for e in events if e.kind == 'node']
+    assert nodes[-1].depth == 0
+    assert max(e.depth for e in nodes) > DEPTH
+
+
+def test_deep_schema_update():
+    converter = Converter(refs_chain(), incremental=True)
+    converter.convert()
+    schema = refs_chain()
+    schema['definitions']['d%s' % DEPTH] = {'type': 'string'}
+    schema = converter.update(schema)
+    assert is_valid(schema, {'a': {'a': {}}})
+
+
+def test_nested_arrays():
+    check_conversion(
+        items_chain(depth=50),
+        [[], nested([1], lambda value: [value], depth=49)],
+        [[1], nested(['a'], lambda value: [value], depth=49)],
+    )
+
+
+@pytest.mark.parametrize('json_schema', [
+    properties_chain(50),
+    items_chain(50),
+    refs_chain(50),
+    {
+        'definitions': {
+            'node': {
+                'type': 'object',
+                'properties': {
+                    'value': {'enum': [1, 2], 'type': 'integer'},
+                    'children': {
+                        'type': 'array',
+                        'items': {'$ref': '#/definitions/node'},
+                        'uniqueItems': True,
+                    },
+                    'kind': {'oneOf': [
+                        {'type': 'string', 'maxLength': 3},
+                        {'type': 'number', 'minimum': 0},
+                    ]},
+                },
+                'patternProperties': {'^x-': {'type': 'boolean'}},
+                'dependencies': {'value': ['kind']},
+            },
+        },
+        'anyOf': [
+            {'$ref': '#/definitions/node'},
+            {'not': {'type': 'null'}},
+        ],
+    },
+])
+@pytest.mark.parametrize('optimize', [True, False])
+def test_same_result_as_recursive_conversion(json_schema, optimize):
+    iterative = Converter(json_schema, optimize=optimize)
+    recursive = RecursiveConverter(json_schema, optimize=optimize)
+    assert without_addresses(to_string(iterative.convert())) == \
+        without_addresses(to_string(recursive.convert()))
+    assert iterative.deduplicated == recursive.deduplicated
+
+
+def test_failed_ref_restores_the_scope():
+    json_schema = {
+        'definitions': {
+            'a': {'type': 'object', 'properties': {'b': {'$ref': '#/b'}}},
+        },
+        'type': 'object',
+        'properties': {'a': {'$ref': '#/definitions/a'}},
+    }
+    converter = Converter(json_schema)
+    with pytest.raises(Exception):
+        converter.convert()
+    assert converter._resolver._scopes == ['']
+    assert converter._ref_cache == {}
+
+
+def test_failed_ref_restores_the_scope_when_compiled():
+    json_schema = {
+        'definitions': {
+            'a': {'type': 'object', 'properties': {'b': {'$ref': '#/b'}}},
+        },
+        'type': 'object',
+        'properties': {'a': {'$ref': '#/definitions/a'}},
+    }
+    compiler = Compiler(json_schema)
+    with pytest.raises(Exception):
+        compiler.compile()
+    assert compiler._resolver._scopes == ['']
+    assert compiler._ref_cache == {}
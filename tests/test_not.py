@@ -0,0 +1,119 @@
+import pytest
+import voluptuous
+
+from voluptuary import BACKENDS, NOT_MESSAGE, Enum, Not, is_valid
+from voluptuary import to_validator, to_voluptuous
+from voluptuary.cache import dumps, loads
+from .conversion import check_conversion
+
+
+def test_not_type():
+    check_conversion(
+        schema_in={'not': {'type': ['null', 'boolean']}},
+        accepted_targets=(0, 'a', [], {}),
+        unaccepted_targets=(None, True, False),
+    )
+
+
+def test_not_enum_with_other_keywords():
+    check_conversion(
+        schema_in={'type': 'string', 'not': {'enum': ['a', 'b']}},
+        accepted_targets=('c', ''),
+        unaccepted_targets=('a', 'b', 1),
+    )
+
+
+def test_not_pattern():
+    check_conversion(
+        schema_in={'type': 'string', 'not': {'pattern': '^x'}},
+        accepted_targets=('a', 'ax'),
+        unaccepted_targets=('x', 'xa'),
+    )
+
+
+def test_not_object():
+    check_conversion(
+        schema_in={
+            'type': 'object',
+            'not': {
+                'type': 'object',
+                'required': ['a'],
+                'properties': {'a': {'type': 'integer', 'minimum': 0}},
+            },
+        },
+        accepted_targets=({}, {'a': -1}, {'a': 'x'}),
+        unaccepted_targets=({'a': 0}, {'a': 1, 'b': 2}),
+    )
+
+
+def test_not_not():
+    check_conversion(
+        schema_in={'not': {'not': {'type': 'integer', 'multipleOf': 2}}},
+        accepted_targets=(2, 0, -4),
+        unaccepted_targets=(1, 'a', 2.5),
+    )
+
+
+def test_not_anything():
+    check_conversion(
+        schema_in={'type': 'array', 'items': {'not': {}}},
+        accepted_targets=([], ),
+        unaccepted_targets=([None], [1, 2]),
+    )
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_not_error(backend):
+    validate = to_validator(
+        {'type': 'object', 'properties': {'a': {'not': {'type': 'null'}}}},
+        backend=backend,
+    )
+    with pytest.raises(voluptuous.MultipleInvalid) as e:
+        validate({'a': None})
+    assert e.value.errors[0].path == ['a']
+    assert e.value.errors[0].msg == NOT_MESSAGE
+
+
+@pytest.mark.parametrize('json_schema, valid, invalid', [
+    ({'not': {'type': 'null'}}, 1, None),
+    (
+        {'not': {'type': 'object', 'properties': {'a': {'type': 'integer'}}}},
+        {'a': 'b'},
+        {'a': 1},
+    ),
+])
+def test_round_trip(json_schema, valid, invalid):
+    schema = loads(dumps(to_voluptuous(json_schema)))
+    assert schema(valid) == valid
+    with pytest.raises(voluptuous.MultipleInvalid):
+        schema(invalid)
+    assert is_valid(schema, valid)
+    assert not is_valid(schema, invalid)
+    assert 'Not(' in repr(schema)
+
+
+def test_not_probes_without_raising(monkeypatch):
+    schema = to_voluptuous({'not': {'enum': [1]}}).schema
+    assert isinstance(schema, Not)
+
+    def fail(self, value):
+        raise AssertionError('the enum should not be called')
+
+    monkeypatch.setattr(Enum, '__call__', fail)
+    assert schema(2) == 2
+    with pytest.raises(voluptuous.Invalid):
+        schema(1)
+    assert schema.is_valid(2)
+    assert not schema.is_valid(1)
+
+
+@pytest.mark.parametrize('schema, value, valid', [
+    (int, 1, True),
+    (int, 'a', False),
+    (None, None, True),
+    (None, 0, False),
+    (voluptuous.Schema({'a': int}), {'a': 1}, True),
+    (voluptuous.Schema({'a': int}), {'a': 'b'}, False),
+])
+def test_is_valid(schema, value, valid):
+    assert is_valid(schema, value) is valid
@@ -0,0 +1,147 @@
+import pytest
+import voluptuous
+
+from voluptuary import BACKENDS, PatternSet, compile_pattern, to_validator
+from voluptuary import to_voluptuous
+from voluptuary.cache import dumps, loads
+from .conversion import check_conversion
+
+
+def test_pattern():
+    check_conversion(
+        schema_in={'pattern': '^[a-z]+-[0-9]+$'},
+        accepted_targets=('ab-1', 'a-123', 1, None, ['x']),
+        unaccepted_targets=('ab', 'AB-1', 'ab-1 ', ''),
+    )
+
+
+def test_pattern_matches_anywhere():
+    check_conversion(
+        schema_in={'type': 'string', 'pattern': 'b+'},
+        accepted_targets=('b', 'abc', 'abbbc'),
+        unaccepted_targets=('ac', '', 1),
+    )
+
+
+def test_pattern_with_length():
+    check_conversion(
+        schema_in={'type': 'string', 'pattern': '^a', 'maxLength': 3},
+        accepted_targets=('a', 'abc'),
+        unaccepted_targets=('b', 'abcd', None),
+    )
+
+
+def test_pattern_properties():
+    check_conversion(
+        schema_in={
+            'type': 'object',
+            'properties': {
+                'id': {'type': 'integer'},
+                'x_name': {'maxLength': 3},
+            },
+            'patternProperties': {
+                '^x_': {'type': 'string'},
+                'name$': {'minLength': 2},
+            },
+        },
+        accepted_targets=(
+            {},
+            {'id': 1, 'x_a': 'a', 'other': None},
+            {'x_name': 'abc', 'first_name': 'ab', 'x_': ''},
+        ),
+        unaccepted_targets=(
+            {'id': 'a'},
+            {'x_a': 1},
+            # must match both patterns
+            {'x_name': 'a'},
+            # and the property's own schema
+            {'x_name': 'abcd'},
+            {'first_name': 'a'},
+            [],
+        ),
+    )
+
+
+def test_pattern_properties_and_additional_properties():
+    check_conversion(
+        schema_in={
+            'type': 'object',
+            'required': ['id', 'n1'],
+            'properties': {'id': {'type': 'integer'}},
+            'patternProperties': {'^n[0-9]+$': {'type': 'number'}},
+            'additionalProperties': False,
+        },
+        accepted_targets=(
+            {'id': 1, 'n1': 1},
+            {'id': 1, 'n1': 1.5, 'n22': 2},
+        ),
+        unaccepted_targets=(
+            {'id': 1},
+            {'id': 1, 'n1': 'a'},
+            {'id': 1, 'n1': 1, 'x': 1},
+            {'id': 1, 'n1': 1, 'n': 1},
+        ),
+    )
+    check_conversion(
+        schema_in={
+            'type': 'object',
+            'patternProperties': {'^n': {'type': 'number'}},
+            'additionalProperties': {'type': 'string'},
+        },
+        accepted_targets=({'n': 1, 'a': 'a'}, {}),
+        unaccepted_targets=({'n': 'a'}, {'a': 1}),
+    )
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_pattern_property_errors(backend):
+    validate = to_validator({
+        'type': 'object',
+        'patternProperties': {'^a': {'type': 'integer'}},
+        'additionalProperties': False,
+    }, backend=backend)
+    with pytest.raises(voluptuous.MultipleInvalid) as e:
+        validate({'a1': 'x', 'b': 1})
+    assert sorted(
+        (error.path, error.msg) for error in e.value.errors
+    ) == [(['a1'], 'expected int'), (['b'], 'extra keys not allowed')]
+
+
+@pytest.mark.parametrize('patterns', [
+    ['^a', 'b$', '[0-9]'],
+    # these can't be combined
+    ['^a', '(b)\\1'],
+    ['^a', '(?i)B'],
+])
+def test_pattern_set(patterns):
+    pattern_set = PatternSet(patterns)
+    for string in ('', 'a', 'b', 'ab', 'a1', 'bb', 'B', 'xyz', '1b'):
+        assert pattern_set.search(string) == tuple(
+            i for i, p in enumerate(patterns)
+            if compile_pattern(p).search(string)
+        )
+
+
+def test_patterns_are_compiled_once():
+    compile_pattern.cache_clear()
+    to_voluptuous({
+        'type': 'object',
+        'properties': {
+            'a': {'type': 'string', 'pattern': '^x'},
+            'b': {'type': 'array', 'items': {'pattern': '^x'}},
+        },
+        'patternProperties': {'^x': {}},
+    })
+    info = compile_pattern.cache_info()
+    assert info.misses == 1
+    assert info.currsize == 1
+
+
+def test_round_trip():
+    schema = loads(dumps(to_voluptuous({
+        'type': 'object',
+        'patternProperties': {'^a': {'pattern': '^b'}, '^c': {}},
+    })))
+    assert schema({'a': 'b'}) == {'a': 'b'}
+    with pytest.raises(voluptuous.MultipleInvalid):
+        schema({'a': 'a'})
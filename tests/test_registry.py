@@ -0,0 +1,141 @@
+import threading
+
+import pytest
+
+import voluptuary
+from voluptuary.compiled import CompiledSchema
+from voluptuary.registry import RegistryStats, SchemaRegistry, estimate_size
+
+SCHEMA = {'type': 'object', 'properties': {'a': {'type': 'integer'}}}
+
+
+def test_get():
+    registry = SchemaRegistry()
+    schema = registry.get(SCHEMA)
+    assert schema({'a': 1}) == {'a': 1}
+    # the same content is found by its hash
+    assert registry.get(dict(SCHEMA)) is schema
+    assert registry.get(SCHEMA, key='tenant') is not schema
+    assert registry.get({}, key='tenant') is registry.get(SCHEMA, 'tenant')
+    assert 'tenant' in registry
+    assert len(registry) == 2
+    assert registry.stats() == RegistryStats(
+        hits=3, misses=2, evictions=0, entries=2,
+        size=2 * estimate_size(SCHEMA),
+    )
+
+
+def test_backend():
+    registry = SchemaRegistry(backend='compiled', max_errors=1)
+    assert isinstance(registry.get(SCHEMA), CompiledSchema)
+
+
+def test_least_recently_used_are_evicted():
+    registry = SchemaRegistry(max_bytes=2, sizeof=lambda schema: 1)
+    a = registry.get(SCHEMA, 'a')
+    registry.get(SCHEMA, 'b')
+    assert registry.get(SCHEMA, 'a') is a
+    registry.get(SCHEMA, 'c')
+    assert 'a' in registry and 'c' in registry and 'b' not in registry
+    assert registry.evictions == 1
+    assert registry.size == 2
+
+
+def test_too_large_schema_evicts_the_others():
+    registry = SchemaRegistry(
+        max_bytes=10, sizeof=lambda schema: len(schema['enum'])
+    )
+    registry.get({'enum': [1, 2]}, 'small')
+    registry.get({'enum': list(range(20))}, 'large')
+    assert list(registry._entries) == ['large']
+    assert registry.stats().evictions == 1
+
+
+def test_discard():
+    registry = SchemaRegistry(sizeof=lambda schema: 1)
+    schema = registry.get(SCHEMA, 'a')
+    registry.discard('a')
+    registry.discard('b')
+    assert 'a' not in registry
+    assert registry.size == 0
+    assert registry.get(SCHEMA, 'a') is not schema
+
+
+def slow_conversions(monkeypatch, release, error=None):
+    """Make conversions wait for `release`, and count them"""
+    calls = []
+    to_validator = voluptuary.to_validator
+
+    def convert(schema, **kwargs):
+        calls.append(schema)
+        release.wait(5)
+        if error is not None:
+            raise error
+        return to_validator(schema, **kwargs)
+
+    monkeypatch.setattr(voluptuary, 'to_validator', convert)
+    return calls
+
+
+def get_concurrently(registry, n_threads, release):
+    results = [None] * n_threads
+    started = threading.Barrier(n_threads + 1)
+
+    def get(i):
+        started.wait()
+        try:
+            results[i] = registry.get(SCHEMA, 'key')
+        except Exception as e:
+            results[i] = e
+
+    threads = [
+        threading.Thread(target=get, args=(i, )) for i in range(n_threads)
+    ]
+    for thread in threads:
+        thread.start()
+    started.wait()
+    while registry.stats().hits + registry.stats().misses < n_threads:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_single_flight(monkeypatch):
+    release = threading.Event()
+    calls = slow_conversions(monkeypatch, release)
+    registry = SchemaRegistry()
+    results = get_concurrently(registry, 8, release)
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert registry.stats()[:2] == (7, 1)
+
+
+def test_single_flight_error(monkeypatch):
+    release = threading.Event()
+    error = ValueError('bad schema')
+    calls = slow_conversions(monkeypatch, release, error)
+    registry = SchemaRegistry()
+    results = get_concurrently(registry, 4, release)
+    assert len(calls) == 1
+    assert all(result is error for result in results)
+    assert len(registry) == 0
+    # failures aren't registered
+    with pytest.raises(ValueError):
+        registry.get(SCHEMA, 'key')
+    assert len(calls) == 2
+
+
+def test_discard_during_conversion(monkeypatch):
+    release = threading.Event()
+    slow_conversions(monkeypatch, release)
+    registry = SchemaRegistry()
+    thread = threading.Thread(target=registry.get, args=(SCHEMA, 'key'))
+    thread.start()
+    while not registry.misses:
+        pass
+    registry.discard('key')
+    release.set()
+    thread.join()
+    assert 'key' not in registry
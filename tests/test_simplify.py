@@ -0,0 +1,111 @@
+import pytest
+import voluptuous
+from voluptuous import All, Any, Length, Range, Schema
+
+from voluptuary import Converter, MultipleOf, NumberCheck, RefProxy
+from voluptuary import simplify, to_voluptuous
+from .conversion import check_conversion
+
+
+def errors(schema, value):
+    try:
+        schema(value)
+    except voluptuous.MultipleInvalid as e:
+        return sorted(str(x) for x in e.errors)
+    return []
+
+
+def test_wrappers_are_removed():
+    schema = simplify(Schema({
+        'a': Schema(All(Schema(int))),
+        'b': Schema(All([Schema(str)], Length())),
+        'c': Schema(Any(Schema(All(Schema(bool))))),
+    }))
+    assert schema.schema == {'a': int, 'b': [str], 'c': bool}
+
+
+def test_nested_all_is_flattened():
+    length = Length(min=1)
+    schema = simplify(Schema(All(Schema(All(list, length)), Schema(All()))))
+    assert list(schema.schema.validators) == [list, length]
+
+
+def test_number_checks_are_merged():
+    range_ = Range(min=0)
+    schema = simplify(Schema(All(Schema(int), MultipleOf(2), range_)))
+    check = schema.schema
+    assert isinstance(check, NumberCheck)
+    assert (check.types, check.multiple_of, check.range) == (int, 2, range_)
+
+
+def test_mappings_keep_their_schema():
+    inner = Schema({'a': int}, extra=voluptuous.PREVENT_EXTRA)
+    schema = simplify(Schema({'b': Schema(All(inner))}))
+    assert schema.schema['b'] is inner
+
+
+def test_input_is_not_modified():
+    converter = Converter({
+        'definitions': {
+            'node': {
+                'type': 'array',
+                'items': {'$ref': '#/definitions/node'},
+                'maxItems': 2,
+            },
+        },
+        '$ref': '#/definitions/node',
+    }, optimize=False)
+    original = converter.convert()
+    proxy = original.schema.validators[0][0]
+    schema = simplify(original)
+    assert proxy.target is original
+    new_proxy = schema.schema.validators[0][0]
+    assert isinstance(new_proxy, RefProxy)
+    assert new_proxy is not proxy
+    assert new_proxy.target is schema.schema
+    assert schema([[], [[]]]) == [[], [[]]]
+
+
+@pytest.mark.parametrize('json_schema, value', [
+    ({'type': 'integer', 'minimum': 0, 'multipleOf': 2}, -2),
+    ({'type': 'integer', 'minimum': 0, 'multipleOf': 2}, 3),
+    ({'type': 'integer', 'minimum': 0}, 'a'),
+    ({'type': 'number', 'exclusiveMaximum': True, 'maximum': 1}, 1),
+    ({'type': 'number', 'maximum': 1}, None),
+    ({'type': 'object', 'properties': {'a': {'type': 'number'}}}, {'a': 'x'}),
+    ({'type': 'array', 'items': {'type': 'string'}, 'maxItems': 1}, [1]),
+    ({'type': 'array', 'items': {'type': 'string'}, 'maxItems': 1}, ['a'] * 2),
+    ({'anyOf': [{'type': 'string'}, {'type': 'integer'}]}, 1.5),
+    ({'type': 'object', 'minProperties': 1}, {}),
+])
+def test_same_errors_as_unsimplified(json_schema, value):
+    expected = errors(to_voluptuous(json_schema, optimize=False), value)
+    assert expected
+    assert errors(to_voluptuous(json_schema), value) == expected
+
+
+def test_simplified_schema_conversion():
+    check_conversion(
+        schema_in={
+            'type': 'object',
+            'properties': {
+                'id': {'type': 'integer', 'minimum': 1, 'multipleOf': 3},
+                'ratio': {'type': 'number', 'maximum': 1},
+                'tags': {'type': 'array', 'items': {'type': 'string'}},
+                'either': {'anyOf': [{'type': 'null'}]},
+            },
+        },
+        accepted_targets=(
+            {},
+            {'id': 3, 'ratio': 0.5, 'tags': ['a'], 'either': None},
+        ),
+        unaccepted_targets=(
+            {'id': 0},
+            {'id': 4},
+            {'id': 3.0},
+            {'ratio': 1.5},
+            {'ratio': 'a'},
+            {'tags': [1]},
+            {'either': 1},
+        ),
+    )
@@ -1,6 +1,6 @@
-from voluptuous import Schema, All, Any, Length
+from voluptuous import Schema, All, Any, Length, Optional, Required
 
-from voluptuary import to_string
+from voluptuary import to_string, to_voluptuous
 
 
 def check(schema, expected):
@@ -42,6 +42,17 @@ def test_dict_to_string():
     )
 
 
+def test_markers_to_string():
+    check(Schema({Required('a'): int}), "Schema({Required('a'): int})")
+    check(Schema({Optional('a'): int}), "Schema({Optional('a'): int})")
+    converted = to_voluptuous({
+        'type': 'object',
+        'required': ['a'],
+        'properties': {'a': {'type': 'string'}, 'b': {'type': 'string'}},
+    })
+    check(converted, "Schema({'b': str, Required('a'): str})")
+
+
 def test_any_and_all_to_string():
     check(Any(), 'Any()')
     check(Any(int, str), 'Any(int, str)')
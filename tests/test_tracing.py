@@ -0,0 +1,56 @@
+import logging
+
+from voluptuary import Converter, to_voluptuous
+
+SCHEMA = {
+    'definitions': {
+        'id': {'type': 'integer', 'minimum': 0},
+    },
+    'type': 'object',
+    'properties': {
+        'id': {'$ref': '#/definitions/id'},
+        'parent_id': {'$ref': '#/definitions/id'},
+    },
+}
+
+
+def test_conversion_prints_nothing(capsys):
+    to_voluptuous(SCHEMA)
+    assert capsys.readouterr().out == ''
+
+
+def test_tracer_receives_events():
+    events = []
+    to_voluptuous(SCHEMA, tracer=events.append)
+
+    refs = [e for e in events if e.kind == 'ref']
+    assert [(e.ref, e.schema, e.depth) for e in refs] == [
+        ('#/definitions/id', SCHEMA['definitions']['id'], 2),
+    ]
+
+    nodes = [e for e in events if e.kind == 'node']
+    # the root schema finishes last, and includes the time of the others
+    root = nodes[-1]
+    assert root.schema is SCHEMA
+    assert root.depth == 0
+    assert all(e.depth > 0 for e in nodes[:-1])
+    assert all(0 <= e.seconds <= root.seconds for e in nodes)
+    assert SCHEMA['definitions']['id'] in [e.schema for e in nodes]
+
+
+def test_events_are_logged_at_debug_level(caplog):
+    with caplog.at_level(logging.DEBUG, logger='voluptuary'):
+        Converter(SCHEMA).convert()
+    messages = [r.getMessage() for r in caplog.records]
+    assert messages[0] == (
+        "Followed ref: #/definitions/id -> {'type': 'integer', 'minimum': 0}"
+    )
+    assert messages[-1].startswith('Converted in ')
+
+
+def test_no_tracing_by_default(caplog):
+    with caplog.at_level(logging.INFO, logger='voluptuary'):
+        converter = Converter(SCHEMA)
+        converter.convert()
+    assert converter._tracer is None
+    assert caplog.records == []
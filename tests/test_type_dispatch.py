@@ -0,0 +1,89 @@
+import collections
+
+import pytest
+
+from voluptuary import Resolver, TypeDispatch, split_by_type, to_voluptuous
+from voluptuary.cache import dumps, loads
+from .conversion import check_conversion
+
+
+def test_list_of_types():
+    check_conversion(
+        schema_in={'type': ['null', 'string', 'integer', 'object']},
+        accepted_targets=(
+            None, 'a', 1, -5, {}, {'a': 1}, collections.OrderedDict(),
+        ),
+        # a bool is not an integer, and 1.0 is not an integer in draft 4
+        unaccepted_targets=(True, False, 1.5, 1.0, []),
+    )
+
+
+def test_list_of_types_with_boolean_and_number():
+    check_conversion(
+        schema_in={'type': ['boolean', 'number']},
+        accepted_targets=(True, False, 1, 1.5),
+        unaccepted_targets=(None, '1', []),
+    )
+
+
+def test_union_of_types():
+    check_conversion(
+        schema_in={
+            'definitions': {
+                'id': {'type': 'integer', 'minimum': 1},
+            },
+            'anyOf': [
+                {'type': 'null'},
+                {'$ref': '#/definitions/id'},
+                {'type': 'array', 'items': {'type': 'string'}},
+                {
+                    'type': 'object',
+                    'required': ['id'],
+                    'properties': {'id': {'$ref': '#/definitions/id'}},
+                },
+            ],
+        },
+        accepted_targets=(None, 1, [], ['a'], {'id': 2}),
+        unaccepted_targets=(
+            0, True, 1.5, 'a', [1], {}, {'id': 0},
+        ),
+    )
+
+
+def test_one_of_types():
+    check_conversion(
+        schema_in={
+            'oneOf': [{'type': 'boolean'}, {'type': 'integer', 'maximum': 3}],
+        },
+        accepted_targets=(True, False, 3),
+        unaccepted_targets=(4, 1.0, None),
+    )
+
+
+def test_union_is_dispatched():
+    schema = to_voluptuous({
+        'anyOf': [{'type': 'string'}, {'type': 'integer', 'minimum': 0}],
+    })
+    dispatch = schema.schema
+    assert isinstance(dispatch, TypeDispatch)
+    assert list(dispatch.schemas) == ['string', 'integer']
+
+
+def test_round_trip():
+    schema = loads(dumps(to_voluptuous({'type': ['string', 'null']})))
+    assert schema('a') == 'a'
+    assert schema(None) is None
+    with pytest.raises(Exception):
+        schema(1)
+
+
+@pytest.mark.parametrize('schemas', [
+    # an integer is a number
+    [{'type': 'integer'}, {'type': 'number'}],
+    [{'type': 'string'}, {'type': 'string', 'maxLength': 1}],
+    [{'type': 'string'}, {'type': ['integer', 'null']}],
+    [{'type': 'string'}, {'maxLength': 1}],
+    [{'type': 'string'}],
+])
+def test_no_split_by_type(schemas):
+    assert split_by_type(schemas, Resolver({})) is None
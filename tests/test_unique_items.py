@@ -0,0 +1,77 @@
+import pytest
+import voluptuous
+
+from voluptuary import BACKENDS, find_duplicate, json_key, to_validator
+from .conversion import check_conversion
+
+
+def test_unique_items():
+    check_conversion(
+        schema_in={'type': 'array', 'uniqueItems': True},
+        accepted_targets=(
+            [],
+            [1, 2, 3],
+            [1, '1', True, None],
+            [0, False],
+            [[1], [1, 1], [[1]]],
+            [{'a': 1}, {'a': 1, 'b': 2}, {'a': '1'}],
+            [{'a': [1, {'b': True}]}, {'a': [1, {'b': 1}]}],
+        ),
+        unaccepted_targets=(
+            [1, 2, 1],
+            [1, 1.0],
+            [True, True],
+            [None, None],
+            [[1, 2], [1.0, 2]],
+            [{'a': 1, 'b': 2}, {'b': 2, 'a': 1}],
+            [{'a': [{'b': 1}]}, {'a': [{'b': 1.0}]}],
+        ),
+    )
+
+
+def test_unique_items_with_items():
+    check_conversion(
+        schema_in={
+            'type': 'array',
+            'items': {'type': 'integer'},
+            'maxItems': 3,
+            'uniqueItems': True,
+        },
+        accepted_targets=([], [1, 2, 3]),
+        unaccepted_targets=([1, 1], ['a'], [1, 2, 3, 4], [1, 2, 3, 3], 1),
+    )
+
+
+def test_unique_items_false():
+    check_conversion(
+        schema_in={'type': 'array', 'uniqueItems': False},
+        accepted_targets=([1, 1], [{}, {}]),
+        unaccepted_targets=({}, ),
+    )
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_duplicate_is_reported(backend):
+    validate = to_validator(
+        {'type': 'array', 'items': [{}, {}], 'uniqueItems': True},
+        backend=backend,
+    )
+    with pytest.raises(voluptuous.MultipleInvalid) as e:
+        validate(['a', 'b', 'a', 'b'])
+    assert e.value.errors[0].path == [2]
+    assert 'duplicate of item 0' in str(e.value.errors[0])
+
+
+def test_find_duplicate():
+    assert find_duplicate([]) is None
+    assert find_duplicate(list(range(1000))) is None
+    assert find_duplicate([1, 2, 3, 2, 1]) == (1, 3)
+    assert find_duplicate([True, 1, 1.0]) == (1, 2)
+
+
+def test_json_key():
+    assert json_key({'a': 1, 'b': [2]}) == json_key({'b': [2.0], 'a': 1})
+    assert json_key([True]) != json_key([1])
+    assert json_key([]) != json_key({})
+    assert json_key(['a']) != json_key('a')
+    hash(json_key({'a': [{}]}))
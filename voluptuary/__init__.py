@@ -1,22 +1,37 @@
+import collections
+import functools
+import hashlib
+import itertools
 import json
+import logging
+import re
+import time
 import warnings
-
-from jsonschema import RefResolver
+from urllib.parse import unquote
 
 import voluptuous
 from voluptuous import Schema, Any, All
 
+__version__ = '0.0.3'
+
 
 class EnumArray:
     """Validates an ordered array using an ordered list of schemas
 
     If additional_items is False, extra items are allowed past at the
     end of the array (you can have more items than schemas)
+
+    The errors of every item are collected, up to `max_errors` of them
+    (None for no limit).
     """
 
-    def __init__(self, schemas, additional_items):
+    max_errors = None
+
+    def __init__(self, schemas, additional_items, max_errors=None):
         self.schemas = schemas
         self.additional_items = additional_items
+        self.max_errors = max_errors
+        self._probes = [_probe(schema) for schema in schemas]
 
     def __call__(self, value):
         if not isinstance(value, list):
@@ -26,10 +41,103 @@ class EnumArray:
                 "additional items {} are not allowed"
                 .format(value[len(self.schemas):])
             )
-        for schema, v in zip(self.schemas, value):
-            schema(v)
+        errors = []
+        for i, (schema, v) in enumerate(zip(self.schemas, value)):
+            try:
+                schema(v)
+            except voluptuous.Invalid as e:
+                e.prepend([i])
+                if isinstance(e, voluptuous.MultipleInvalid):
+                    errors.extend(e.errors)
+                else:
+                    errors.append(e)
+                if self.max_errors is not None and \
+                        len(errors) >= self.max_errors:
+                    break
+        if errors:
+            raise voluptuous.MultipleInvalid(errors[:self.max_errors])
+        return value
+
+    def is_valid(self, value):
+        if not isinstance(value, list) or (
+            not self.additional_items and len(self.schemas) < len(value)
+        ):
+            return False
+        return all(probe(v) for probe, v in zip(self._probes, value))
+
+    def __getstate__(self):
+        return (self.schemas, self.additional_items, self.max_errors)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+
+class UniqueItems:
+    """Validate that the items of an array are unique, by JSON equality"""
+
+    def __call__(self, value):
+        if not isinstance(value, list):
+            raise voluptuous.Invalid("not a list")
+        duplicate = find_duplicate(value)
+        if duplicate is not None:
+            i, j = duplicate
+            raise voluptuous.Invalid(
+                "item is a duplicate of item %s" % i, path=[j]
+            )
+        return value
+
+    def is_valid(self, value):
+        return isinstance(value, list) and find_duplicate(value) is None
+
+    def __repr__(self):
+        return 'UniqueItems()'
+
+
+class Enum:
+    """Validate that a value is one of `values`, by JSON equality
+
+    Membership is a set lookup, however many values there are. Values are
+    looked up by their `json_key`, except for strings which are looked up
+    as they are.
+    """
+
+    def __init__(self, values):
+        self.values = values
+        self._strings = frozenset(v for v in values if type(v) is str)
+        self._keys = frozenset(json_key(v) for v in values)
+        if len(values) <= 10:
+            self.msg = 'value must be one of %s' % (values, )
+        else:
+            self.msg = 'value is not one of the %s allowed values' % (
+                len(values)
+            )
+
+    def __contains__(self, value):
+        if type(value) is str:
+            return value in self._strings
+        try:
+            return json_key(value) in self._keys
+        except TypeError:
+            # not a JSON value
+            return False
+
+    def __call__(self, value):
+        if value not in self:
+            raise voluptuous.InInvalid(self.msg)
         return value
 
+    def is_valid(self, value):
+        return value in self
+
+    def __getstate__(self):
+        return self.values
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+    def __repr__(self):
+        return 'Enum(%r)' % (self.values, )
+
 
 class MultipleOf:
     """Validate that a number is a multiple of another"""
@@ -46,85 +154,1651 @@ class MultipleOf:
             )
         return value
 
+    def is_valid(self, value):
+        return isinstance(value, (int, float)) and \
+            value % self.multiple_base == 0
 
-def to_voluptuous(schema):
-    return Converter(schema).convert()
 
+@functools.lru_cache(maxsize=1024)
+def compile_pattern(pattern):
+    """Compile a regular expression, sharing the result across the process
 
-class Converter(object):
+    Compiled patterns are kept in a bounded LRU cache, so each pattern is
+    compiled once no matter how many schemas (or conversions) use it.
+    """
+    return re.compile(pattern)
+
+
+# a reference to an earlier group, which would refer to the wrong group once
+# patterns are combined
+_BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=')
+
+
+def _combine(patterns):
+    """Combine patterns into one alternation, which a string matches if it
+    matches any of them
+
+    Returns None if the patterns can't be combined without changing their
+    meaning: if one has a backreference or inline flags.
+    """
+    default_flags = compile_pattern('').flags
+    for pattern in patterns:
+        if _BACKREFERENCE.search(pattern) or \
+                compile_pattern(pattern).flags != default_flags:
+            return None
+    try:
+        return compile_pattern('|'.join('(?:%s)' % p for p in patterns))
+    except re.error:
+        return None
+
+
+class PatternSet:
+    """Finds which of several regular expressions a string matches
+
+    The patterns are also combined into one alternation. A string which
+    matches none of them (like most property names, when the patterns are
+    for a few special ones) is rejected with a single search, instead of
+    one search per pattern.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._regexes = [compile_pattern(p) for p in self.patterns]
+        if len(self._regexes) == 1:
+            self._combined = self._regexes[0]
+        else:
+            self._combined = _combine(self.patterns)
+
+    def search(self, string):
+        """Return the indexes of the patterns that match part of `string`"""
+        if self._combined is not None:
+            if self._combined.search(string) is None:
+                return ()
+            elif len(self._regexes) == 1:
+                return (0, )
+        return tuple(
+            i for i, regex in enumerate(self._regexes) if regex.search(string)
+        )
+
+    def __getstate__(self):
+        return self.patterns
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+    def __repr__(self):
+        return 'PatternSet(%r)' % (self.patterns, )
+
+
+class Pattern:
+    """Validate that a string matches a regular expression
+
+    Like JSON Schema, the pattern may match any part of the string. Values
+    other than strings are accepted.
+    """
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self._regex = compile_pattern(pattern)
+
+    def __call__(self, value):
+        if not self.is_valid(value):
+            raise voluptuous.Invalid(
+                "does not match regular expression %s" % self.pattern
+            )
+        return value
+
+    def is_valid(self, value):
+        return not isinstance(value, str) or \
+            self._regex.search(value) is not None
+
+    def __getstate__(self):
+        return self.pattern
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+    def __repr__(self):
+        return 'Pattern(%r)' % (self.pattern, )
+
+
+class PatternProperties:
+    """Validates the properties of an object against `patternProperties`
+
+    `patterns` is a list of `(regular expression, schema)`. The value of
+    every property whose name matches a pattern is validated against its
+    schema, whether or not the property is one of `names` (those listed in
+    `properties`, validated elsewhere). Other properties are validated
+    against `additional`: a schema, False to reject them, or None to accept
+    them.
+
+    The errors of every property are collected, up to `max_errors` of them
+    (None for no limit).
+    """
+
+    max_errors = None
+
+    def __init__(self, patterns, names, additional=None, max_errors=None):
+        self.patterns = patterns
+        self.names = frozenset(names)
+        self.additional = additional
+        self.max_errors = max_errors
+        self._pattern_set = PatternSet(pattern for pattern, _ in patterns)
+        self._schemas = [schema for _, schema in patterns]
+        self._probes = [_probe(schema) for _, schema in patterns]
+        if additional is None or additional is False:
+            self._probe_additional = None
+        else:
+            self._probe_additional = _probe(additional)
+
+    def __call__(self, value):
+        if not isinstance(value, dict):
+            raise voluptuous.DictInvalid('expected a dictionary')
+        errors = []
+        for key, item in value.items():
+            matched = self._pattern_set.search(key) \
+                if isinstance(key, str) else ()
+            if matched:
+                schemas = [self._schemas[i] for i in matched]
+            elif key in self.names or self.additional is None:
+                continue
+            elif self.additional is False:
+                errors.append(
+                    voluptuous.Invalid('extra keys not allowed', path=[key])
+                )
+                schemas = ()
+            else:
+                schemas = (self.additional, )
+            for schema in schemas:
+                try:
+                    schema(item)
+                except voluptuous.Invalid as e:
+                    e.prepend([key])
+                    if isinstance(e, voluptuous.MultipleInvalid):
+                        errors.extend(e.errors)
+                    else:
+                        errors.append(e)
+            if self.max_errors is not None and len(errors) >= self.max_errors:
+                break
+        if errors:
+            raise voluptuous.MultipleInvalid(errors[:self.max_errors])
+        return value
+
+    def is_valid(self, value):
+        if not isinstance(value, dict):
+            return False
+        for key, item in value.items():
+            matched = self._pattern_set.search(key) \
+                if isinstance(key, str) else ()
+            if matched:
+                for i in matched:
+                    if not self._probes[i](item):
+                        return False
+            elif key in self.names or self.additional is None:
+                continue
+            elif self.additional is False or \
+                    not self._probe_additional(item):
+                return False
+        return True
+
+    def __getstate__(self):
+        return (self.patterns, self.names, self.additional, self.max_errors)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __repr__(self):
+        return 'PatternProperties(%r, additional=%r)' % (
+            self.patterns, self.additional
+        )
+
+
+def is_valid(schema, value):
+    """Return whether `value` is valid against a schema, without raising
+
+    Validators with an `is_valid` method (like converted schemas) are asked
+    with it, which doesn't build (and raise) errors only to throw them
+    away. Other schemas are probed like a `Schema` would validate them (see
+    `_probe`).
+    """
+    probe = getattr(schema, 'is_valid', None)
+    if probe is not None:
+        return probe(value)
+    return _probe(schema)(value)
+
+
+def _probe(node, schema=None):
+    """Return an `is_valid(value)` function for a node of a voluptuous
+    schema, which returns whether validating `value` against the node would
+    succeed
+
+    Mappings are probed with the `required` and `extra` settings of
+    `schema`, the `Schema` holding the node (defaults if None). Schemas and
+    validators with an `is_valid` method are probed with it, and types,
+    literals, mappings, `All`, `Any`, `SomeOf`, `Length` and `Range` without
+    calling anything that raises. Anything else is called, and is valid
+    unless it raises `voluptuous.Invalid`.
+
+    Nested `Schema`s are only probed (and compiled into a probe) when the
+    returned function first needs them, so this is never recursive.
+    """
+    method = getattr(node, 'is_valid', None)
+    if method is not None and not isinstance(node, type):
+        return method
+    elif isinstance(node, Schema):
+        return _probe(node.schema, node)
+    elif isinstance(node, type):
+        return lambda value: isinstance(value, node)
+    elif isinstance(node, dict):
+        return _probe_dict(node, schema)
+    elif isinstance(node, list) and len(node) == 1:
+        probe_item = _probe(node[0], schema)
+        return lambda value: isinstance(value, list) and all(
+            probe_item(item) for item in value
+        )
+    elif isinstance(node, list) and not node:
+        return lambda value: isinstance(value, list) and not value
+    elif type(node) is All or (
+        isinstance(node, (Any, voluptuous.SomeOf)) and
+        node.discriminant is None
+    ):
+        probes = [_probe(x, schema) for x in node.validators]
+        if type(node) is All:
+            return lambda value: all(probe(value) for probe in probes)
+        elif isinstance(node, Any):
+            return lambda value: any(probe(value) for probe in probes)
+        min_valid = node.min_valid or 0
+        max_valid = node.max_valid or len(probes)
+        return lambda value: min_valid <= sum(
+            1 for probe in probes if probe(value)
+        ) <= max_valid
+    elif type(node) is voluptuous.Length and node.msg is None:
+        return functools.partial(_has_length, node)
+    elif type(node) is voluptuous.Range and node.msg is None:
+        return functools.partial(_in_range, node)
+    elif isinstance(node, list):
+        # several schemas for each item
+        return _probe_by_calling(_rebuild(schema or Schema(None), node))
+    elif not callable(node):
+        return lambda value: value == node
+    return _probe_by_calling(node)
+
+
+def _probe_by_calling(validator):
+
+    def probe_by_calling(value):
+        try:
+            validator(value)
+        except (voluptuous.Invalid, ValueError):
+            return False
+        return True
+
+    return probe_by_calling
+
+
+def _probe_dict(mapping, schema):
+    """Probe a mapping, like `LimitedSchema` validates it"""
+    if not all(_is_plain_key(key) for key in mapping):
+        return _probe_by_calling(_rebuild(schema or Schema(None), mapping))
+    required = schema is not None and schema.required
+    extra = voluptuous.PREVENT_EXTRA if schema is None else schema.extra
+    probes = {}
+    required_names = []
+    for key, value in mapping.items():
+        if key is voluptuous.Extra:
+            continue
+        name = key.schema if isinstance(key, voluptuous.Marker) else key
+        probes[name] = _probe(value, schema)
+        if required or isinstance(key, voluptuous.Required):
+            required_names.append(name)
+    if voluptuous.Extra in mapping:
+        probe_extra = _probe(mapping[voluptuous.Extra], schema)
+    elif extra == voluptuous.PREVENT_EXTRA:
+        probe_extra = None
+    else:
+        probe_extra = _accept
+
+    def probe_dict(value):
+        if not isinstance(value, dict):
+            return False
+        for name in required_names:
+            if name not in value:
+                return False
+        for key, item in value.items():
+            probe = probes.get(key, probe_extra)
+            if probe is None or not probe(item):
+                return False
+        return True
+
+    return probe_dict
+
+
+def _accept(value):
+    return True
+
+
+def _has_length(length, value):
+    """Probe a `voluptuous.Length`"""
+    try:
+        return (length.min is None or len(value) >= length.min) and (
+            length.max is None or len(value) <= length.max
+        )
+    except TypeError:
+        return False
+
+
+def _in_range(range_, value):
+    """Probe a `voluptuous.Range`"""
+    try:
+        if range_.min is not None and not (
+            value >= range_.min if range_.min_included
+            else value > range_.min
+        ):
+            return False
+        return range_.max is None or (
+            value <= range_.max if range_.max_included
+            else value < range_.max
+        )
+    except TypeError:
+        return False
+
+
+class AnyOf(Any):
+    """An `Any` which probes its validators with `is_valid` first
+
+    A value which one validator accepts is accepted without raising (and
+    catching) the errors of the validators before it. Only when none
+    accepts it are they run again, to raise the same error as `Any`.
+    """
+
+    def __voluptuous_compile__(self, schema):
+        self._probes = [_probe(x, schema) for x in self.validators]
+        return Any.__voluptuous_compile__(self, schema)
+
+    def _exec(self, funcs, v, path=None):
+        if self.is_valid(v):
+            return v
+        return Any._exec(self, funcs, v, path)
+
+    def is_valid(self, value):
+        try:
+            probes = self._probes
+        except AttributeError:
+            probes = self._probes = [_probe(x) for x in self.validators]
+        for probe in probes:
+            if probe(value):
+                return True
+        return False
+
+
+class OneOf(voluptuous.SomeOf):
+    """A `SomeOf` of exactly one validator, which probes its validators
+    with `is_valid` first
+
+    Like `AnyOf`, the validators are only run again for the errors of a
+    value which doesn't match exactly one of them.
+    """
+
+    def __init__(self, validators, **kwargs):
+        voluptuous.SomeOf.__init__(
+            self, validators, min_valid=1, max_valid=1, **kwargs
+        )
+
+    def __voluptuous_compile__(self, schema):
+        self._probes = [_probe(x, schema) for x in self.validators]
+        return voluptuous.SomeOf.__voluptuous_compile__(self, schema)
+
+    def _exec(self, funcs, v, path=None):
+        if self.is_valid(v):
+            return v
+        return voluptuous.SomeOf._exec(self, funcs, v, path)
+
+    def is_valid(self, value):
+        try:
+            probes = self._probes
+        except AttributeError:
+            probes = self._probes = [_probe(x) for x in self.validators]
+        n_valid = 0
+        for probe in probes:
+            if probe(value):
+                n_valid += 1
+                if n_valid > 1:
+                    return False
+        return n_valid == 1
+
+
+NOT_MESSAGE = 'value should not be valid under the given schema'
+
+
+class Not:
+    """Validate that a value is not valid against `schema`
+
+    The value is probed with `is_valid`, so the errors of `schema` are
+    never built.
+    """
 
     def __init__(self, schema):
+        self.schema = schema
+        self._probe = _probe(schema)
+
+    def __call__(self, value):
+        if self._probe(value):
+            raise voluptuous.Invalid(NOT_MESSAGE)
+        return value
+
+    def is_valid(self, value):
+        return not self._probe(value)
+
+    def __getstate__(self):
+        # a tuple, since pickle skips `__setstate__` for a None state
+        return (self.schema, )
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __repr__(self):
+        return 'Not(%r)' % (self.schema, )
+
+
+class Dependencies:
+    """Validates the `dependencies` of an object
+
+    `properties` maps a property name to the set of names which are
+    required whenever the object has that property. `schemas` maps a
+    property name to a schema which the whole object must be valid against
+    whenever it has that property. Values other than objects are accepted.
+    """
+
+    def __init__(self, properties, schemas):
+        self.properties = {
+            key: frozenset(names) for key, names in properties.items()
+        }
+        self.schemas = schemas
+        self._probes = {key: _probe(x) for key, x in schemas.items()}
+
+    def __call__(self, value):
+        if not isinstance(value, dict):
+            return value
+        errors = []
+        keys = value.keys()
+        for key in self.properties.keys() & keys:
+            required = self.properties[key]
+            if not keys >= required:
+                errors.extend(
+                    voluptuous.RequiredFieldInvalid(
+                        'required key not provided, as a dependency of %s'
+                        % key,
+                        path=[name],
+                    ) for name in sorted(required - keys)
+                )
+        for key in self.schemas.keys() & keys:
+            try:
+                self.schemas[key](value)
+            except voluptuous.MultipleInvalid as e:
+                errors.extend(e.errors)
+            except voluptuous.Invalid as e:
+                errors.append(e)
+        if errors:
+            raise voluptuous.MultipleInvalid(errors)
+        return value
+
+    def is_valid(self, value):
+        if not isinstance(value, dict):
+            return True
+        keys = value.keys()
+        return all(
+            keys >= self.properties[key]
+            for key in self.properties.keys() & keys
+        ) and all(
+            self._probes[key](value) for key in self._probes.keys() & keys
+        )
+
+    def __getstate__(self):
+        return (self.properties, self.schemas)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __repr__(self):
+        return 'Dependencies(%r, %r)' % (self.properties, self.schemas)
+
+
+def _is_plain_key(key):
+    """Whether a mapping key is a string, or a `Required` string without a
+    default, or `Extra`"""
+    return key is voluptuous.Extra or type(key) is str or (
+        type(key) is voluptuous.Required and type(key.schema) is str and
+        key.default is voluptuous.UNDEFINED
+    )
+
+
+class ConvertedSchema(Schema):
+    """A `Schema` converted from a JSON Schema
+
+    Besides validating values like any `Schema`, it tells whether a value is
+    valid with `is_valid`, which returns a bool rather than raising. That
+    skips building errors (which is most of the cost of an invalid value),
+    so it is the fastest way to test or filter values.
+    """
+
+    def is_valid(self, value):
+        try:
+            probe = self._probe
+        except AttributeError:
+            probe = self._probe = _probe(self.schema, self)
+        return probe(value)
+
+
+class LimitedSchema(ConvertedSchema):
+    """A `Schema` which stops validating once it finds `max_errors` errors
+
+    Like `Schema`, this collects the errors of each value of a mapping and
+    each item of a sequence. But it stops as soon as it has `max_errors` of
+    them, so `max_errors=1` fails fast on the first error. Mappings with
+    keys other than strings, `Required` strings and `Extra` are validated
+    as usual.
+    """
+
+    def __init__(
+        self, schema, required=False, extra=voluptuous.PREVENT_EXTRA,
+        max_errors=1
+    ):
+        self.max_errors = max_errors
+        Schema.__init__(self, schema, required=required, extra=extra)
+
+    def _compile_dict(self, schema):
+        if not all(_is_plain_key(key) for key in schema):
+            return Schema._compile_dict(self, schema)
+        values = {}
+        required = []
+        for key, value in schema.items():
+            if key is voluptuous.Extra:
+                continue
+            name = key.schema if isinstance(key, voluptuous.Marker) else key
+            values[name] = self._compile(value)
+            if self.required or isinstance(key, voluptuous.Required):
+                required.append((name, key))
+        check_extra = None
+        if voluptuous.Extra in schema:
+            check_extra = self._compile(schema[voluptuous.Extra])
+        extra = self.extra
+        max_errors = self.max_errors
+
+        def validate_dict(path, data):
+            if not isinstance(data, dict):
+                raise voluptuous.DictInvalid('expected a dictionary', path)
+            out = data.__class__()
+            errors = []
+            for key, value in data.items():
+                key_path = path + [key]
+                validate = values.get(key, check_extra)
+                if validate is not None:
+                    try:
+                        out[key] = validate(key_path, value)
+                        continue
+                    except voluptuous.MultipleInvalid as e:
+                        new_errors = e.errors
+                    except voluptuous.Invalid as e:
+                        new_errors = [e]
+                    for error in new_errors:
+                        if len(error.path) <= len(key_path):
+                            error.error_type = 'dictionary value'
+                    errors.extend(new_errors)
+                elif extra == voluptuous.ALLOW_EXTRA:
+                    out[key] = value
+                    continue
+                elif extra == voluptuous.REMOVE_EXTRA:
+                    continue
+                else:
+                    errors.append(
+                        voluptuous.Invalid('extra keys not allowed', key_path)
+                    )
+                if len(errors) >= max_errors:
+                    raise voluptuous.MultipleInvalid(errors[:max_errors])
+            for name, key in required:
+                if name not in data:
+                    errors.append(voluptuous.RequiredFieldInvalid(
+                        getattr(key, 'msg', None) or
+                        'required key not provided',
+                        path + [key],
+                    ))
+            if errors:
+                raise voluptuous.MultipleInvalid(errors[:max_errors])
+            return out
+
+        return validate_dict
+
+    def _compile_sequence(self, schema, seq_type):
+        if seq_type is not list or not schema:
+            return Schema._compile_sequence(self, schema, seq_type)
+        compiled = [self._compile(s) for s in schema]
+        max_errors = self.max_errors
+
+        def validate_sequence(path, data):
+            if not isinstance(data, list):
+                raise voluptuous.SequenceTypeInvalid('expected a list', path)
+            out = []
+            errors = []
+            for i, value in enumerate(data):
+                index_path = path + [i]
+                invalid = None
+                for validate in compiled:
+                    try:
+                        result = validate(index_path, value)
+                    except voluptuous.Invalid as e:
+                        if len(e.path) > len(index_path):
+                            raise
+                        invalid = e
+                        continue
+                    if result is not voluptuous.Remove:
+                        out.append(result)
+                    break
+                else:
+                    errors.append(invalid)
+                    if len(errors) >= max_errors:
+                        break
+            if errors:
+                raise voluptuous.MultipleInvalid(errors)
+            return out
+
+        return validate_sequence
+
+
+def _rebuild(schema, inner):
+    """Return a schema like `schema` (a `Schema`), for `inner` instead"""
+    if isinstance(schema, LimitedSchema):
+        return LimitedSchema(
+            inner, required=schema.required, extra=schema.extra,
+            max_errors=schema.max_errors
+        )
+    elif isinstance(schema, ConvertedSchema):
+        return ConvertedSchema(
+            inner, required=schema.required, extra=schema.extra
+        )
+    return Schema(inner, required=schema.required, extra=schema.extra)
+
+
+class NumberCheck:
+    """Validate the type, multipleOf and range of a number in one call
+
+    `simplify` merges `All(int, MultipleOf(...), Range(...))` into this. It
+    raises the same errors as the validators it replaces. `types` is `int`,
+    or `(int, float)` for a JSON Schema number.
+    """
+
+    def __init__(self, types, multiple_of=None, range=None):
+        self.types = types
+        self.multiple_of = multiple_of
+        self.range = range
+
+    def __call__(self, value):
+        if not isinstance(value, self.types):
+            if self.types is int:
+                raise voluptuous.TypeInvalid('expected int')
+            # what Any(int, float) reports
+            raise voluptuous.AnyInvalid('expected int')
+        if self.multiple_of is not None and value % self.multiple_of != 0:
+            raise voluptuous.Invalid(
+                "%s is not a multiple of %s" % (value, self.multiple_of)
+            )
+        if self.range is not None:
+            self.range(value)
+        return value
+
+    def is_valid(self, value):
+        return isinstance(value, self.types) and (
+            self.multiple_of is None or value % self.multiple_of == 0
+        ) and (self.range is None or _in_range(self.range, value))
+
+    def __repr__(self):
+        return 'NumberCheck(%s, multiple_of=%r, range=%r)' % (
+            'int' if self.types is int else 'Any(int, float)',
+            self.multiple_of,
+            self.range,
+        )
+
+
+class DiscriminatedUnion:
+    """Validates a union of object schemas, told apart by one property
+
+    `choices` maps the `scalar_key` of each value the `key` property may
+    have to the schema of the only branch that allows it. An object with
+    the property is validated against that branch alone, rather than
+    against every branch. Anything else is validated against `fallback`,
+    the union of all branches.
+    """
+
+    def __init__(self, key, choices, fallback):
+        self.key = key
+        self.choices = choices
+        self.fallback = fallback
+        # probes are shared like the schemas of choices are
+        probes = {}
+        self._probes = {
+            value: probes.setdefault(id(schema), _probe(schema))
+            for value, schema in choices.items()
+        }
+        self._probe_fallback = _probe(fallback)
+
+    def __call__(self, value):
+        if isinstance(value, dict) and self.key in value:
+            try:
+                schema = self.choices[scalar_key(value[self.key])]
+            except (KeyError, TypeError):
+                raise voluptuous.ScalarInvalid(
+                    'not a valid value', path=[self.key]
+                )
+            return schema(value)
+        return self.fallback(value)
+
+    def is_valid(self, value):
+        if isinstance(value, dict) and self.key in value:
+            try:
+                probe = self._probes[scalar_key(value[self.key])]
+            except (KeyError, TypeError):
+                return False
+            return probe(value)
+        return self._probe_fallback(value)
+
+    def __getstate__(self):
+        return (self.key, self.choices, self.fallback)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __repr__(self):
+        return 'DiscriminatedUnion(%r, %s choices, fallback=%r)' % (
+            self.key, len(self.choices), self.fallback
+        )
+
+
+# JSON Schema type name -> python types of its values (but a bool is only a
+# boolean, despite being an int)
+JSON_TYPES = collections.OrderedDict([
+    ('string', (str, )),
+    ('integer', (int, )),
+    ('number', (int, float)),
+    ('boolean', (bool, )),
+    ('null', (type(None), )),
+    ('object', (dict, )),
+    ('array', (list, )),
+])
+
+
+class TypeDispatch:
+    """Validates a value against the schema for its JSON Schema type
+
+    `schemas` maps type names to the schema for values of that type, or to
+    None to accept any value of the type. Values of other types are
+    rejected. The schema is looked up by `type(value)` in a table, rather
+    than by trying each type in turn.
+    """
+
+    def __init__(self, schemas):
+        self.schemas = schemas
+        self._table = {}
+        self._probes = {}
+        for name, schema in schemas.items():
+            probe = _accept if schema is None else _probe(schema)
+            for type_ in JSON_TYPES[name]:
+                self._table.setdefault(type_, schema)
+                self._probes.setdefault(type_, probe)
+        self._msg = 'expected one of: %s' % ', '.join(schemas)
+
+    def __call__(self, value):
+        try:
+            schema = self._table[type(value)]
+        except KeyError:
+            schema = self._lookup(value)
+        if schema is None:
+            return value
+        return schema(value)
+
+    def is_valid(self, value):
+        try:
+            probe = self._probes[type(value)]
+        except KeyError:
+            try:
+                schema = self._lookup(value)
+            except voluptuous.Invalid:
+                return False
+            return schema is None or is_valid(schema, value)
+        return probe(value)
+
+    def _lookup(self, value):
+        """Find the schema for an instance of a subclass (e.g. of dict)"""
+        for name, schema in self.schemas.items():
+            if isinstance(value, JSON_TYPES[name]) and (
+                name == 'boolean' or not isinstance(value, bool)
+            ):
+                return schema
+        raise voluptuous.TypeInvalid(self._msg)
+
+    def __getstate__(self):
+        return self.schemas
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+    def __repr__(self):
+        return 'TypeDispatch(%r)' % (self.schemas, )
+
+
+# keywords whose values are data, rather than subschemas
+_DATA_KEYWORDS = frozenset(['enum', 'default', 'required'])
+# keywords whose values map names to subschemas
+_SCHEMA_MAP_KEYWORDS = frozenset(
+    ['definitions', 'properties', 'patternProperties', 'dependencies']
+)
+
+
+def index_pointers(schema):
+    """Return a dict of JSON pointer -> node, for every object and array in
+    the schema
+
+    Pointers are escaped (`~0` and `~1`) but not percent-encoded. Values of
+    keywords that hold data rather than schemas (like `enum`) are skipped.
+    """
+    index = {}
+    # (pointer, node, whether node maps names to subschemas)
+    stack = [('', schema, False)]
+    while stack:
+        pointer, node, is_schema_map = stack.pop()
+        index[pointer] = node
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if not isinstance(value, (dict, list)) or \
+                        (not is_schema_map and key in _DATA_KEYWORDS):
+                    continue
+                child = str(key).replace('~', '~0').replace('/', '~1')
+                stack.append((
+                    pointer + '/' + child,
+                    value,
+                    not is_schema_map and key in _SCHEMA_MAP_KEYWORDS,
+                ))
+        else:
+            for i, value in enumerate(node):
+                if isinstance(value, (dict, list)):
+                    stack.append(('%s/%s' % (pointer, i), value, False))
+    return index
+
+
+class Resolver(object):
+    """Resolves the `$ref`s of a schema
+
+    Refs within the document (like `#/definitions/thing`) are resolved here,
+    with a lookup in an index of every subschema by JSON pointer. The index
+    is built on the first such ref. jsonschema, which is slow to import, is
+    only imported to resolve any other (e.g. remote) refs.
+
+    This tracks a resolution scope the same way as jsonschema's
+    `RefResolver`: call `push_scope` with the url of a resolved ref before
+    converting its target, and `pop_scope` after.
+
+    `on_resolve`, if given, is called with the url and the target of every
+    resolved ref. Unless `index` is True, pointers are walked instead of
+    looked up, which is faster when only a few refs are resolved.
+    """
+
+    def __init__(self, schema, on_resolve=None, index=True):
+        self._schema = schema
+        self._scopes = ['']
+        self._fallback = None
+        self._index = None if index else {}
+        self._on_resolve = on_resolve
+
+    def resolve(self, ref):
+        """Return the url of the ref and the schema it points to"""
+        # within the document, as long as no ref has left it
+        if ref.startswith('#') and not self.base_uri:
+            url, resolved = ref, self._resolve_pointer(ref[1:])
+        else:
+            url, resolved = self._fallback_resolver().resolve_in_scope(
+                self._scopes[-1], ref
+            )
+        if self._on_resolve is not None:
+            self._on_resolve(url, resolved)
+        return url, resolved
+
+    @property
+    def base_uri(self):
+        """The uri of the document that refs are currently resolved in"""
+        return self._scopes[-1].partition('#')[0]
+
+    def push_scope(self, url):
+        self._scopes.append(url)
+
+    def pop_scope(self):
+        self._scopes.pop()
+
+    def _resolve_pointer(self, pointer):
+        if self._index is None:
+            self._index = index_pointers(self._schema)
+        try:
+            return self._index[pointer]
+        except KeyError:
+            pass
+        # percent-encoded, or pointing at something not in the index
+        return self._walk_pointer(pointer)
+
+    def _walk_pointer(self, pointer):
+        document = self._schema
+        for part in unquote(pointer).split('/')[1:]:
+            part = part.replace('~1', '/').replace('~0', '~')
+            if isinstance(document, list):
+                try:
+                    part = int(part)
+                except ValueError:
+                    pass
+            try:
+                document = document[part]
+            except (TypeError, LookupError):
+                raise Exception("Unresolvable JSON pointer: %r" % pointer)
+        return document
+
+    def _fallback_resolver(self):
+        if self._fallback is None:
+            self._fallback = _JsonschemaResolver(self._schema)
+        return self._fallback
+
+
+class _JsonschemaResolver(object):
+    """Resolves refs with jsonschema, for refs outside of the document"""
+
+    def __init__(self, schema):
+        from jsonschema import RefResolver
+        self._resolver = RefResolver('', schema)
+
+    def resolve_in_scope(self, scope, ref):
+        self._resolver.push_scope(scope)
+        try:
+            return self._resolver.resolve(ref)
+        finally:
+            self._resolver.pop_scope()
+
+
+class RefProxy:
+    """Forward reference to the converted target of a `$ref`
+
+    A self-referencing definition (e.g. a tree node) cannot be converted
+    before it is referenced. The proxy stands in for it and is bound to the
+    converted schema once conversion of the definition finishes.
+    """
+
+    def __init__(self, uri):
+        self.uri = uri
+        self.target = None
+
+    def __call__(self, value):
+        if self.target is None:
+            raise voluptuous.SchemaError(
+                "unresolved reference {}".format(self.uri)
+            )
+        return self.target(value)
+
+    def is_valid(self, value):
+        try:
+            probe = self._probe
+        except AttributeError:
+            if self.target is None:
+                raise voluptuous.SchemaError(
+                    "unresolved reference {}".format(self.uri)
+                )
+            probe = self._probe = _probe(self.target)
+        return probe(value)
+
+    def __getstate__(self):
+        return {'uri': self.uri, 'target': self.target}
+
+    def __repr__(self):
+        return 'RefProxy(%r)' % self.uri
+
+
+LOG = logging.getLogger(__name__)
+
+# marks a missing value, where None is a valid one
+_MISSING = object()
+
+
+# size in bytes of the digests which key objects and arrays
+_KEY_SIZE = 16
+
+
+def canonical_key(schema, memo=None):
+    """Return a key which is equal for structurally identical schemas
+
+    The key of an object or array is a fixed-size digest of its members,
+    built from the keys of the objects and arrays nested in it. Pass the
+    same dict as `memo` to key several subschemas of a schema: it keeps the
+    key of each object and array by id (along with the node, so the id
+    isn't reused), and each is then only hashed once however deep it is.
+
+    Returns None if the schema isn't JSON (or contains itself).
+    """
+    if isinstance(schema, str):
+        # can't be mistaken for the keys (bytes) of other schemas
+        return schema
+    elif not isinstance(schema, (dict, list)):
+        try:
+            return _scalar_part(schema)
+        except (TypeError, ValueError):
+            return None
+    if memo is None:
+        memo = {}
+    stack = [schema]
+    try:
+        while stack:
+            node = stack[-1]
+            entry = memo.get(id(node))
+            if entry is None:
+                # key the objects and arrays in the node first
+                memo[id(node)] = (node, None)
+                for child in node.values() if isinstance(node, dict) \
+                        else node:
+                    if isinstance(child, (dict, list)):
+                        child_entry = memo.get(id(child))
+                        if child_entry is None:
+                            stack.append(child)
+                        elif child_entry[1] is None:
+                            raise ValueError('the schema contains itself')
+                continue
+            stack.pop()
+            if entry[1] is None:
+                memo[id(node)] = (node, _digest(node, memo))
+    except (TypeError, ValueError):
+        # the objects and arrays still being keyed all contain the culprit
+        for node in stack:
+            if memo.get(id(node), (None, False))[1] is None:
+                memo[id(node)] = (node, False)
+    return memo[id(schema)][1] or None
+
+
+def _digest(node, memo):
+    """Hash an object or array, whose nested objects and arrays are keyed
+    in `memo`"""
+    if isinstance(node, dict):
+        parts = [b'{']
+        for key in sorted(node):
+            if not isinstance(key, str):
+                raise TypeError('keys must be strings')
+            parts.append(json.dumps(key).encode('utf-8'))
+            parts.append(_part(node[key], memo))
+    else:
+        parts = [b'[']
+        for value in node:
+            parts.append(_part(value, memo))
+    return hashlib.blake2b(b''.join(parts), digest_size=_KEY_SIZE).digest()
+
+
+def _part(value, memo):
+    if isinstance(value, (dict, list)):
+        digest = memo[id(value)][1]
+        if not digest:
+            raise TypeError('not JSON')
+        # fixed size, after the tag
+        return b'c' + digest
+    return _scalar_part(value)
+
+
+def _scalar_part(value):
+    # JSON scalars never contain a NUL character
+    return b's' + json.dumps(value).encode('utf-8') + b'\0'
+
+
+def scalar_key(value):
+    """Return a hashable key for a JSON scalar, which is equal for values
+    that JSON Schema considers equal
+
+    Unlike in Python, `true` is not equal to `1` (but `1` equals `1.0`).
+    The key of an array or object is not hashable.
+    """
+    if isinstance(value, bool):
+        return (bool, value)
+    elif isinstance(value, (int, float)):
+        return (float, value)
+    return (type(value), value)
+
+
+def json_key(value):
+    """Return a hashable key for any JSON value, which is equal for values
+    that JSON Schema considers equal
+
+    Like `scalar_key`, but arrays and objects have keys too. The key of an
+    object doesn't depend on the order of its properties.
+    """
+    if isinstance(value, dict):
+        return (dict, frozenset((k, json_key(v)) for k, v in value.items()))
+    elif isinstance(value, list):
+        return (list, tuple(json_key(v) for v in value))
+    return scalar_key(value)
+
+
+def find_duplicate(items):
+    """Return the indexes `(i, j)` of the first item `j` of a list which
+    equals an earlier item `i`, or None if the items are unique
+
+    Items are compared by their `json_key`, so this takes linear time.
+    """
+    keys = [json_key(item) for item in items]
+    if len(set(keys)) == len(keys):
+        return None
+    seen = {}
+    for j, key in enumerate(keys):
+        i = seen.setdefault(key, j)
+        if i != j:
+            return i, j
+
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+def _tag_values(schema):
+    """Return the values allowed by a property schema, if it is an `enum`
+    of scalars"""
+    if not isinstance(schema, dict):
+        return None
+    values = schema.get('enum')
+    if not isinstance(values, list) or not values or \
+            not all(isinstance(v, _SCALARS) for v in values):
+        return None
+    return values
+
+
+def _without_enum(schema, key):
+    """Copy an object schema, dropping the `enum` of property `key`"""
+    properties = dict(schema['properties'])
+    properties[key] = {
+        k: v for k, v in properties[key].items() if k != 'enum'
+    }
+    return dict(schema, properties=properties)
+
+
+def _resolve_branches(schemas, resolver):
+    """Return (url, schema) for each branch of a union, following a `$ref`
+    branch to its target (and url)"""
+    resolved = []
+    for schema in schemas:
+        url = None
+        if isinstance(schema, dict) and '$ref' in schema:
+            url, schema = resolver.resolve(schema['$ref'])
+        resolved.append((url, schema))
+    return resolved
+
+
+def split_by_type(schemas, resolver):
+    """Find the type of each branch of a union, if the types don't overlap
+
+    Returns None unless every branch has a single `type`, and no value is of
+    the type of two branches (e.g. 'integer' and 'number' overlap). Then a
+    value can only be valid for the branch of its type. Otherwise, returns
+    the list of type names.
+    """
+    if len(schemas) < 2:
+        return None
+    names = []
+    python_types = set()
+    for _, schema in _resolve_branches(schemas, resolver):
+        name = schema.get('type') if isinstance(schema, dict) else None
+        if not isinstance(name, str) or name not in JSON_TYPES or \
+                not python_types.isdisjoint(JSON_TYPES[name]):
+            return None
+        python_types.update(JSON_TYPES[name])
+        names.append(name)
+    return names
+
+
+def discriminate(schemas, resolver):
+    """Find a property which tells the branches of a union apart
+
+    That is a property every branch has in its `properties`, with an `enum`
+    of scalars, where no two branches allow the same value. Branches which
+    are a `$ref` are resolved with `resolver` to look at their target.
+
+    Returns None if there is no such property, or `(key, branches)` where
+    each branch is `(url, schema, values)`: the url to convert the branch
+    in (None if it wasn't a ref), the branch without the `enum` of the
+    property (it is checked by dispatching on the value instead) and the
+    values of the `enum`.
+    """
+    if len(schemas) < 2:
+        return None
+    resolved = _resolve_branches(schemas, resolver)
+    if not all(
+        isinstance(schema, dict) and isinstance(schema.get('properties'), dict)
+        for _, schema in resolved
+    ):
+        return None
+
+    keys = set(resolved[0][1]['properties'])
+    for _, schema in resolved[1:]:
+        keys.intersection_update(schema['properties'])
+    for key in sorted(keys, key=str):
+        seen = set()
+        branches = []
+        for url, schema in resolved:
+            values = _tag_values(schema['properties'][key])
+            if values is None:
+                break
+            value_keys = set(scalar_key(v) for v in values)
+            if not seen.isdisjoint(value_keys):
+                break
+            seen.update(value_keys)
+            branches.append((url, _without_enum(schema, key), values))
+        else:
+            return key, branches
+    return None
+
+
+ConversionEvent = collections.namedtuple(
+    'ConversionEvent', ['kind', 'schema', 'ref', 'depth', 'seconds']
+)
+ConversionEvent.__doc__ = """An event passed to the `tracer` of a `Converter`
+
+kind    'ref' when a `$ref` is followed for the first time, or 'node' when
+        conversion of a (sub)schema finishes
+schema  the (sub)schema, or the target of the ref
+ref     the `$ref` followed (None for 'node' events)
+depth   how deeply nested the (sub)schema is
+seconds time spent converting the (sub)schema, including all of its
+        subschemas (None for 'ref' events)
+"""
+
+
+def log_event(event):
+    """A tracer which logs events to the `voluptuary` logger"""
+    if event.kind == 'ref':
+        LOG.debug('Followed ref: %s -> %s', event.ref, event.schema)
+    else:
+        LOG.debug(
+            'Converted in %.3fms (depth %s): %s', event.seconds * 1e3,
+            event.depth, event.schema
+        )
+
+
+def to_voluptuous(
+    schema, tracer=None, optimize=True, max_errors=None, check_formats=False
+):
+    return Converter(
+        schema, tracer=tracer, optimize=optimize, max_errors=max_errors,
+        check_formats=check_formats,
+    ).convert()
+
+
+BACKENDS = ('voluptuous', 'compiled')
+
+
+def to_validator(
+    schema, backend='voluptuous', max_errors=None, check_formats=False
+):
+    """Convert a JSON Schema to a validator using the given backend
+
+    The 'voluptuous' backend returns a voluptuous `Schema` (the same as
+    `to_voluptuous`). The 'compiled' backend returns a `CompiledSchema` which
+    validates with specialized closures and skips voluptuous entirely.
+    Either way, call the result with a value to validate it.
+
+    With `max_errors`, validation stops once that many errors are found,
+    and with `check_formats` the `format` keyword is checked (see
+    `Converter`).
+    """
+    if backend == 'voluptuous':
+        return to_voluptuous(
+            schema, max_errors=max_errors, check_formats=check_formats
+        )
+    elif backend == 'compiled':
+        from voluptuary.compiled import compile_schema
+        return compile_schema(
+            schema, max_errors=max_errors, check_formats=check_formats
+        )
+    raise ValueError(
+        'Unknown backend %r. Expected one of %s' % (backend, BACKENDS)
+    )
+
+
+# keywords which only apply to objects
+_OBJECT_KEYWORDS = frozenset([
+    'properties', 'patternProperties', 'required', 'additionalProperties',
+    'minProperties', 'maxProperties',
+])
+
+
+def _as_object_schema(schema):
+    """Add `"type": "object"` to a schema of only object keywords
+
+    For schemas which only apply to objects (like those of `dependencies`),
+    this doesn't change what they accept, and lets them be converted.
+    """
+    if isinstance(schema, dict) and schema and 'type' not in schema and \
+            schema.keys() <= _OBJECT_KEYWORDS:
+        return dict(schema, type='object')
+    return schema
+
+
+class Converter(object):
+    """Converts a JSON Schema to a voluptuous schema
+
+    Structurally identical subschemas are converted once, and share the
+    same voluptuous schema. `deduplicated` counts the subschemas which were
+    shared instead of converted again.
+
+    `tracer` is an optional callable, which receives a `ConversionEvent` for
+    every followed ref and converted (sub)schema. Without a tracer, events
+    are logged with `log_event` if the `voluptuary` logger is enabled for
+    debug messages. Otherwise, tracing costs nothing.
+
+    Unless `optimize` is False, the result is flattened with `simplify`.
+
+    By default, validation reports every error, like voluptuous does. With
+    `max_errors`, it stops once that many errors are found, and reports at
+    most that many: `max_errors=1` fails fast, which is all that's needed
+    to tell whether a document is valid. The schema is then built from
+    `LimitedSchema`s instead of `Schema`s.
+
+    The `format` keyword is ignored, unless `check_formats` is True. Then
+    strings are checked with the checker of their format in
+    `voluptuary.formats.FORMATS` (formats without a checker are ignored).
+
+    With `incremental`, the converter keeps what it converted, and `update`
+    converts a new version of the schema reusing it. Since subschemas are
+    keyed by their content, only the subschemas which changed are converted
+    again, along with those which depend on a `$ref` whose target changed.
+    Conversions which the new version no longer uses are dropped.
+
+    Conversion doesn't recurse: the converters of nested subschemas are
+    kept on a stack (see `_convert`), so deeply nested schemas don't hit
+    the recursion limit.
+    """
+
+    def __init__(
+        self, schema, tracer=None, optimize=True, max_errors=None,
+        check_formats=False, incremental=False
+    ):
         self._entire_schema = schema
-        self._resolver = RefResolver('', self._entire_schema)
+        # converted schemas, keyed by the resolved uri of a `$ref`
+        self._ref_cache = {}
+        # converted schemas, keyed by (base uri, canonical_key(schema))
+        self._interned = {}
+        # the canonical_key memo of the schema being converted
+        self._keys = {}
+        self.deduplicated = 0
+        if incremental:
+            # What each interned schema (by key) and ref target (by uri)
+            # used while being converted: the keys of the interned schemas
+            # and the uris of the refs, which are collected in a stack of
+            # sets (one per schema being converted).
+            self._dependencies = {}
+            self._frames = [set()]
+            # uri of a ref -> canonical_key of its target
+            self._ref_keys = {}
+            self._simplifier = None
+            self._resolver = Resolver(schema, on_resolve=self._on_resolve)
+        else:
+            self._frames = None
+            self._resolver = Resolver(schema)
+        self._optimize = optimize
+        self._max_errors = max_errors
+        self._check_formats = check_formats
+        if max_errors is None:
+            self._schema = ConvertedSchema
+        else:
+            if max_errors < 1:
+                raise ValueError('max_errors must be at least 1')
+            self._schema = functools.partial(
+                LimitedSchema, max_errors=max_errors
+            )
+        if tracer is None and LOG.isEnabledFor(logging.DEBUG):
+            tracer = log_event
+        self._tracer = tracer
+        # the depth of the schema being converted, for tracing
+        self._depth = 0
 
     def convert(self):
-        return self._convert(self._entire_schema)
+        try:
+            if self._frames is not None:
+                return self._convert_incremental()
+            result = self._convert(self._entire_schema)
+        finally:
+            # the keys are only valid while the schema doesn't change
+            self._keys = {}
+        if self._optimize:
+            result = _Simplifier(self._schema).simplify(result)
+        elif not isinstance(result, Schema):
+            result = self._schema(result)
+        return result
+
+    def update(self, schema):
+        """Convert a new version of the schema, reusing the conversions of
+        the previous versions which still apply
+
+        The converter must be `incremental`.
+        """
+        if self._frames is None:
+            raise ValueError('Only an incremental Converter can be updated')
+        # Each known ref is resolved once, and then only the refs of what
+        # changed, so walking their pointers beats indexing every pointer.
+        resolver = Resolver(schema, on_resolve=self._on_resolve, index=False)
+        # refs whose target changed, or which no longer resolve
+        changed = set()
+        for url, key in self._ref_keys.items():
+            try:
+                _, resolved = resolver.resolve(url)
+            except Exception:
+                changed.add(url)
+                continue
+            if key is None or canonical_key(resolved, self._keys) != key:
+                changed.add(url)
+        self._invalidate(changed)
+        self._entire_schema = schema
+        self._resolver = resolver
+        return self.convert()
+
+    def _convert_incremental(self):
+        self._frames = [set()]
+        result = self._convert(self._entire_schema)
+        self._collect(self._frames.pop())
+        self._frames.append(set())
+        if self._optimize:
+            # simplified schemas are reused too
+            if self._simplifier is None:
+                self._simplifier = _Simplifier(self._schema)
+            result = self._simplifier.simplify(result)
+            self._simplifier.retain(itertools.chain(
+                self._interned.values(), self._ref_cache.values()
+            ))
+        elif not isinstance(result, Schema):
+            result = self._schema(result)
+        return result
+
+    def _on_resolve(self, url, resolved):
+        self._frames[-1].add(url)
+        if url not in self._ref_keys:
+            self._ref_keys[url] = canonical_key(resolved, self._keys)
+
+    def _invalidate(self, changed):
+        """Forget the conversions which depend on the `changed` refs, even
+        through other refs and interned schemas"""
+        if not changed:
+            return
+        dependents = collections.defaultdict(list)
+        for node, dependencies in self._dependencies.items():
+            for dependency in dependencies:
+                dependents[dependency].append(node)
+        stale = set(changed)
+        stack = list(changed)
+        while stack:
+            for node in dependents.get(stack.pop(), ()):
+                if node not in stale:
+                    stale.add(node)
+                    stack.append(node)
+        for node in stale:
+            self._dependencies.pop(node, None)
+            if isinstance(node, tuple):
+                del self._interned[node]
+            else:
+                self._ref_cache.pop(node, None)
+                self._ref_keys.pop(node, None)
+
+    def _collect(self, roots):
+        """Forget the conversions which aren't used by `roots`, even through
+        other refs and interned schemas"""
+        live = set()
+        stack = list(roots)
+        while stack:
+            node = stack.pop()
+            if node not in live:
+                live.add(node)
+                stack.extend(self._dependencies.get(node, ()))
+        for cache in (
+            self._interned, self._dependencies, self._ref_cache,
+            self._ref_keys
+        ):
+            for node in [node for node in cache if node not in live]:
+                del cache[node]
 
     def _convert(self, schema):
+        """Convert a schema, and the subschemas nested in it
+
+        Each schema is converted by a generator (see `_convert_node`), which
+        yields the subschemas it needs converted. Rather than converting
+        them by recursion, this keeps the generators on a stack, so the
+        depth of Python calls doesn't grow with the nesting of the schema.
+        Identical schemas are only converted once (see `_lookup`).
+        """
+        tracer = self._tracer
+        # (generator, key, schema, start time) per schema being converted
+        stack = []
+        # the schema to convert next, or `_MISSING` to resume the generator
+        # on top of the stack with `value` (or `error`)
+        pending = schema
+        value = error = None
+        while True:
+            if pending is not _MISSING:
+                start = time.perf_counter() if tracer is not None else None
+                key, value = self._lookup(pending)
+                if value is _MISSING:
+                    self._enter(key)
+                    stack.append((self._convert_node(pending), key, pending,
+                                  start))
+                    value = None
+                elif tracer is not None:
+                    self._trace(pending, len(stack), start)
+                pending = _MISSING
+                if not stack:
+                    return value
+
+            steps, key, node, start = stack[-1]
+            if tracer is not None:
+                self._depth = len(stack)
+            try:
+                if error is None:
+                    pending = steps.send(value)
+                else:
+                    pending, error = steps.throw(error), None
+                continue
+            except StopIteration as e:
+                value, error = e.value, None
+                stack.pop()
+                self._leave(key, value)
+            except Exception as e:
+                error = e
+                stack.pop()
+                self._leave(key, None, failed=True)
+            if error is None and tracer is not None:
+                self._trace(node, len(stack), start)
+            if not stack:
+                if error is not None:
+                    raise error
+                return value
+
+    def _lookup(self, schema):
+        """Return the key of a schema, and its conversion if it was already
+        converted (or else `_MISSING`)"""
+        # The base uri is part of the key, since the same refs point to
+        # different schemas in different documents.
+        key = canonical_key(schema, self._keys)
+        if key is None:
+            return None, _MISSING
+        key = (self._resolver.base_uri, key)
+        result = self._interned.get(key, _MISSING)
+        if result is not _MISSING:
+            self.deduplicated += 1
+            if self._frames is not None:
+                self._frames[-1].add(key)
+        return key, result
+
+    def _enter(self, key):
+        """Start converting a schema with this key"""
+        if self._frames is not None and key is not None:
+            self._frames.append(set())
+
+    def _leave(self, key, result, failed=False):
+        """Finish converting a schema with this key, into `result`"""
+        if key is None:
+            return
+        if self._frames is not None:
+            dependencies = frozenset(self._frames.pop())
+            if failed:
+                return
+            self._dependencies[key] = dependencies
+            self._frames[-1].add(key)
+        if not failed:
+            self._interned[key] = result
+
+    def _trace(self, schema, depth, start):
+        self._tracer(
+            ConversionEvent(
+                'node', schema, None, depth, time.perf_counter() - start
+            )
+        )
+
+    def _convert_node(self, schema):
+        """Convert a schema, yielding each subschema to convert and
+        receiving its conversion
+
+        This and the other generators it delegates to (with `yield from`)
+        are driven by `_convert`.
+        """
         if not schema:
-            return Schema(object)
+            return self._schema(object)
         elif isinstance(schema, list):
-            schemas = [self._convert(x) for x in schema]
-            return Schema(Any(*schemas))
+            if all(name in JSON_TYPES for name in schema):
+                return self._schema(TypeDispatch(
+                    collections.OrderedDict((name, None) for name in schema)
+                ))
+            schemas = []
+            for x in schema:
+                schemas.append((yield x))
+            return self._schema(AnyOf(*schemas))
         elif isinstance(schema, dict) and '$ref' in schema:
-            with self._resolver.resolving(schema['$ref']) as resolved:
-                print('Followed ref: %s -> %s' % (schema['$ref'], resolved))
-                return self._convert(resolved)
+            return (yield from self._convert_ref(schema['$ref']))
+        elif isinstance(schema, dict) and 'enum' in schema:
+            return self._schema(All(
+                (yield from self._convert_without(schema, 'enum')),
+                Enum(schema['enum']),
+            ))
+        elif isinstance(schema, dict) and 'dependencies' in schema:
+            return self._schema(All(
+                (yield from self._convert_without(schema, 'dependencies')),
+                (yield from self._convert_dependencies(
+                    schema['dependencies']
+                )),
+            ))
+        elif isinstance(schema, dict) and 'not' in schema:
+            return self._schema(All(
+                (yield from self._convert_without(schema, 'not')),
+                Not((yield schema['not'])),
+            ))
+        elif isinstance(schema, dict) and 'format' in schema:
+            result = yield from self._convert_without(schema, 'format')
+            validator = self._format_validator(schema['format'])
+            if validator is None:
+                return result
+            return self._schema(All(result, validator))
         elif isinstance(schema, dict) and 'type' in schema:
-            result = self._convert(schema['type'])
             if schema['type'] == 'object':
-                required_props = schema.get('required', [])
-                properties = schema.get('properties', {})
-                additional_props = schema.get('additionalProperties')
-                # handle all keys in properties, careful to mark those fields
-                # that are required.
-                for key, val in properties.items():
-                    if key in required_props:
-                        result = result.extend(
-                            {
-                                voluptuous.Required(key): self._convert(val),
-                            }
-                        )
-                    else:
-                        result = result.extend({key: self._convert(val)})
-                for key in required_props:
-                    if key not in properties:
-                        # required fields not mentioned in properties must
-                        # respect the additionalProperties schema (if it is not
-                        # a bool). else, any value is accepted.
-                        if isinstance(additional_props, dict):
-                            result = result.extend(
-                                {
-                                    voluptuous.Required(key): self.
-                                    _convert(additional_props)
-                                }
-                            )
-                        else:
-                            result = result.extend(
-                                {
-                                    voluptuous.Required(key): object,
-                                }
-                            )
-
-                if 'additionalProperties' in schema:
-                    if additional_props is False:
-                        result.extra = voluptuous.PREVENT_EXTRA
-                    elif additional_props is True:
-                        result.extra = voluptuous.ALLOW_EXTRA
-                    else:
-                        result = result.extend(
-                            {
-                                voluptuous.Extra: self.
-                                _convert(additional_props),
-                            }
-                        )
-                if 'minProperties' in schema or 'maxProperties' in schema:
-                    length = voluptuous.Length(
-                        min=schema.get('minProperties'),
-                        max=schema.get('maxProperties'),
-                    )
-                    result = Schema(All(result, length))
-            elif schema['type'] == 'array':
+                return (yield from self._convert_object(schema))
+            result = yield schema['type']
+            if schema['type'] == 'array':
                 if 'items' in schema:
                     items = schema['items']
                     length = voluptuous.Length(
@@ -132,19 +1806,31 @@ class Converter(object):
                         max=schema.get('maxItems'),
                     )
                     if isinstance(items, dict):
-                        return Schema(All([self._convert(items)], length))
+                        result = self._schema(
+                            All([(yield items)], length)
+                        )
                     elif isinstance(items, list):
+                        schemas = []
+                        for x in items:
+                            schemas.append((yield x))
                         array_validator = EnumArray(
-                            [self._convert(x) for x in items],
+                            schemas,
                             additional_items=schema.get(
                                 'additionalItems', True
                             ),
+                            max_errors=self._max_errors,
                         )
-                        return Schema(All(array_validator, length))
+                        result = self._schema(All(array_validator, length))
                     else:
                         raise Exception(
                             "Invalid schema for `items`: {}".format(schema)
                         )
+                if schema.get('uniqueItems'):
+                    result = self._schema(All(result, UniqueItems()))
+            elif schema['type'] == 'string':
+                validators = self._string_validators(schema)
+                if validators:
+                    result = self._schema(All(result, *validators))
             elif schema['type'] in ('integer', 'number'):
                 _schemas = [result]
                 if 'multipleOf' in schema:
@@ -157,42 +1843,543 @@ class Converter(object):
                 )
                 if r.min is not None or r.max is not None:
                     _schemas.append(r)
-                result = Schema(All(*_schemas))
+                result = self._schema(All(*_schemas))
 
             return result
         elif isinstance(schema, dict) and 'anyOf' in schema:
-            schemas = [self._convert(x) for x in schema['anyOf']]
-            return Schema(Any(*schemas))
+            return (yield from self._convert_union(
+                schema['anyOf'], one_of=False
+            ))
         elif isinstance(schema, dict) and 'allOf' in schema:
-            schemas = [self._convert(x) for x in schema['allOf']]
-            return Schema(All(*schemas))
+            schemas = []
+            for x in schema['allOf']:
+                schemas.append((yield x))
+            return self._schema(All(*schemas))
         elif isinstance(schema, dict) and 'oneOf' in schema:
-            schemas = [self._convert(x) for x in schema['oneOf']]
-            return voluptuous.SomeOf(schemas, min_valid=1, max_valid=1)
-        elif isinstance(
-            schema, dict
-        ) and ('minLength' in schema or 'maxLength' in schema):
-            return voluptuous.Length(
-                min=schema.get('minLength'),
-                max=schema.get('maxLength'),
-            )
+            return (yield from self._convert_union(
+                schema['oneOf'], one_of=True
+            ))
+        elif isinstance(schema, dict) and any(
+            k in schema for k in ('minLength', 'maxLength', 'pattern')
+        ):
+            validators = self._string_validators(schema)
+            if len(validators) == 1:
+                return validators[0]
+            return self._schema(All(*validators))
         elif schema == 'string':
-            return Schema(str)
+            return self._schema(str)
         elif schema == 'integer':
-            return Schema(int)
+            return self._schema(int)
         elif schema == 'number':
-            return Schema(Any(int, float))
+            return self._schema(Any(int, float))
         elif schema == 'boolean':
-            return Schema(bool)
+            return self._schema(bool)
         elif schema == 'null':
-            return Schema(None)
+            return self._schema(None)
         elif schema == 'object':
-            return Schema({}, extra=voluptuous.ALLOW_EXTRA)
+            return self._schema({}, extra=voluptuous.ALLOW_EXTRA)
         elif schema == 'array':
-            return Schema(list)
+            return self._schema(list)
         else:
             raise Exception("Failed to convert schema: %s" % schema)
 
+    def _convert_without(self, schema, keyword):
+        """Convert a schema, ignoring one of its keywords"""
+        return (yield {k: v for k, v in schema.items() if k != keyword})
+
+    def _convert_dependencies(self, dependencies):
+        properties = {}
+        schemas = {}
+        for key, dependency in dependencies.items():
+            if isinstance(dependency, list):
+                properties[key] = dependency
+            else:
+                schemas[key] = yield _as_object_schema(dependency)
+        return Dependencies(properties, schemas)
+
+    def _format_validator(self, name):
+        """Return a validator for a format, or None to ignore it"""
+        if not self._check_formats:
+            return None
+        from voluptuary.formats import FORMATS, Format
+        checker = FORMATS.get(name)
+        if checker is None:
+            return None
+        return Format(name, checker)
+
+    def _string_validators(self, schema):
+        validators = []
+        if 'minLength' in schema or 'maxLength' in schema:
+            validators.append(voluptuous.Length(
+                min=schema.get('minLength'),
+                max=schema.get('maxLength'),
+            ))
+        if 'pattern' in schema:
+            validators.append(Pattern(schema['pattern']))
+        return validators
+
+    def _convert_object(self, schema):
+        """Convert an object schema into a single voluptuous dict schema
+
+        The whole mapping is built before compiling one `Schema`, since
+        repeatedly calling `Schema.extend` copies the mapping each time.
+        """
+        required_props = schema.get('required', [])
+        properties = schema.get('properties', {})
+        additional_props = schema.get('additionalProperties')
+        pattern_props = schema.get('patternProperties')
+        extra = voluptuous.ALLOW_EXTRA
+        mapping = {}
+        # handle all keys in properties, careful to mark those fields that
+        # are required.
+        for key, val in properties.items():
+            if key in required_props:
+                mapping[voluptuous.Required(key)] = yield val
+            else:
+                mapping[key] = yield val
+        for key in required_props:
+            if key not in properties:
+                # required fields not mentioned in properties must respect
+                # the additionalProperties schema (if it is not a bool). else,
+                # any value is accepted. With patternProperties, that is
+                # checked along with the other properties below.
+                if isinstance(additional_props, dict) and not pattern_props:
+                    mapping[voluptuous.Required(key)] = yield additional_props
+                else:
+                    mapping[voluptuous.Required(key)] = object
+
+        if pattern_props:
+            # whether a property is additional depends on the patterns too
+            if isinstance(additional_props, dict):
+                additional_props = yield additional_props
+            elif additional_props is not False:
+                additional_props = None
+            patterns = []
+            for pattern, x in pattern_props.items():
+                patterns.append((pattern, (yield x)))
+            patterns = PatternProperties(
+                patterns,
+                properties,
+                additional_props,
+                max_errors=self._max_errors,
+            )
+            result = self._schema(All(
+                self._schema(mapping, extra=voluptuous.ALLOW_EXTRA), patterns
+            ))
+        else:
+            if 'additionalProperties' in schema:
+                if additional_props is False:
+                    extra = voluptuous.PREVENT_EXTRA
+                elif additional_props is not True:
+                    mapping[voluptuous.Extra] = yield additional_props
+            result = self._schema(mapping, extra=extra)
+        if 'minProperties' in schema or 'maxProperties' in schema:
+            length = voluptuous.Length(
+                min=schema.get('minProperties'),
+                max=schema.get('maxProperties'),
+            )
+            result = self._schema(All(result, length))
+        return result
+
+    def _convert_union(self, schemas, one_of):
+        """Convert `anyOf` or `oneOf`
+
+        If a property tells the branches apart (see `discriminate`), this
+        returns a `DiscriminatedUnion` which only validates an object
+        against the branch its value of the property selects. If the
+        branches are of different types (see `split_by_type`), this returns
+        a `TypeDispatch` to the branch of the value's type.
+        """
+        found = discriminate(schemas, self._resolver)
+        converted = []
+        if found is None:
+            names = split_by_type(schemas, self._resolver)
+            if names is not None:
+                dispatch = collections.OrderedDict()
+                for name, x in zip(names, schemas):
+                    dispatch[name] = yield x
+                return self._schema(TypeDispatch(dispatch))
+            for x in schemas:
+                converted.append((yield x))
+        else:
+            key, branches = found
+            for url, branch, _ in branches:
+                converted.append(
+                    (yield from self._convert_in_scope(url, branch))
+                )
+        if one_of:
+            union = self._schema(OneOf(converted))
+        else:
+            union = self._schema(AnyOf(*converted))
+        if found is None:
+            return union
+        choices = {
+            scalar_key(value): schema
+            for schema, (_, _, values) in zip(converted, branches)
+            for value in values
+        }
+        return self._schema(DiscriminatedUnion(key, choices, union))
+
+    def _convert_in_scope(self, url, schema):
+        """Convert a schema, in the scope of `url` if it's not None"""
+        if url is None:
+            return (yield schema)
+        self._resolver.push_scope(url)
+        try:
+            return (yield schema)
+        finally:
+            self._resolver.pop_scope()
+
+    def _convert_ref(self, ref):
+        """Convert the target of a `$ref`, at most once per resolved uri
+
+        While the target is being converted, the cache holds a `RefProxy`
+        so that recursive references terminate.
+        """
+        url, resolved = self._resolver.resolve(ref)
+        if url in self._ref_cache:
+            return self._ref_cache[url]
+
+        proxy = RefProxy(url)
+        self._ref_cache[url] = proxy
+        if self._tracer is not None:
+            self._tracer(
+                ConversionEvent('ref', resolved, ref, self._depth, None)
+            )
+        self._resolver.push_scope(url)
+        if self._frames is not None:
+            # what the target uses
+            self._frames.append(set())
+        try:
+            result = yield resolved
+        except Exception:
+            del self._ref_cache[url]
+            raise
+        finally:
+            self._resolver.pop_scope()
+            if self._frames is not None:
+                dependencies = frozenset(self._frames.pop())
+        if self._frames is not None:
+            self._dependencies[url] = dependencies
+        proxy.target = result
+        self._ref_cache[url] = result
+        return result
+
+
+def simplify(schema):
+    """Return an equivalent voluptuous schema with less nesting
+
+    Conversion wraps nearly everything in a `Schema`, and often in an `All`
+    of one validator. Each layer is another call (and exception handler)
+    per validated value. This removes them:
+
+    - a `Schema` around anything other than a mapping is unwrapped, since
+      the enclosing schema compiles it the same way (unless its content is
+      nested too deeply, which voluptuous would compile by recursion)
+    - `All`s are flattened into their parent `All`, and an `All` or `Any` of
+      one validator is replaced by the validator
+    - `Length`s without bounds (and `object`) are dropped from an `All`
+    - a number type followed by `MultipleOf` and/or `Range` is merged into
+      one `NumberCheck`
+
+    The result is always a `Schema`. The schema passed in is not modified.
+    Validators which are shared (or recursive, through a `RefProxy`) are
+    simplified once, and stay shared.
+    """
+    return _Simplifier().simplify(schema)
+
+
+def _is_validator(node):
+    """Whether a schema node can be called to validate a value by itself"""
+    return callable(node) and not isinstance(node, type)
+
+
+def _has_mapping(node):
+    """Whether compiling the node depends on the enclosing `Schema`
+
+    Mappings are compiled with the `required` and `extra` settings of the
+    `Schema` around them, so a `Schema` holding one can't be unwrapped.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            return True
+        elif isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, voluptuous.validators._WithSubValidators):
+            stack.extend(node.validators)
+    return False
+
+
+# Voluptuous compiles the lists, mappings and `All`s (etc.) nested in a
+# `Schema` recursively, so `Schema`s whose content is nested deeper than this
+# aren't unwrapped.
+_MAX_UNWRAPPED_NESTING = 32
+
+
+def _is_shallow(node):
+    """Whether the schema compiling a node would recurse less than
+    `_MAX_UNWRAPPED_NESTING` levels deep"""
+    stack = [(node, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if isinstance(node, dict):
+            children = node.values()
+        elif isinstance(node, list):
+            children = node
+        elif isinstance(node, voluptuous.validators._WithSubValidators):
+            children = node.validators
+        else:
+            continue
+        if depth == _MAX_UNWRAPPED_NESTING:
+            return False
+        stack.extend((child, depth + 1) for child in children)
+    return True
+
+
+class _Simplifier(object):
+
+    def __init__(self, make_schema=Schema):
+        # wraps nodes which can't validate by themselves
+        self._make_schema = make_schema
+        # id(node) -> (node, simplified node). The node is kept so its id
+        # can't be reused by another object.
+        self._memo = {}
+        # id(simplified node) -> (simplified node, `Schema` wrapping it)
+        self._schemas = {}
+        # (new proxy, target), bound after everything else is simplified
+        self._proxies = []
+
+    def retain(self, nodes):
+        """Forget the simplified nodes, other than those of `nodes`
+
+        This keeps what a new version of a schema can share with the ones
+        simplified so far.
+        """
+        memo = {}
+        for node in nodes:
+            key = id(node)
+            if key in self._memo:
+                memo[key] = self._memo[key]
+        self._memo = memo
+        self._schemas = {}
+
+    def simplify(self, schema):
+        result = self._simplify(schema)
+        if not isinstance(result, Schema):
+            result = self._wrap(result)
+        while self._proxies:
+            proxy, target = self._proxies.pop()
+            proxy.target = self._validator(self._simplify(target))
+        return result
+
+    def _validator(self, node):
+        """Wrap a simplified node in a `Schema` if it can't validate alone"""
+        return node if _is_validator(node) else self._wrap(node)
+
+    def _wrap(self, node):
+        key = id(node)
+        if key not in self._schemas:
+            self._schemas[key] = (node, self._make_schema(node))
+        return self._schemas[key][1]
+
+    def _simplify(self, node):
+        """Simplify a node, and the nodes nested in it
+
+        Like `Converter._convert`, this keeps the generators simplifying
+        the nested nodes on a stack, rather than recursing.
+        """
+        # (id, node, generator) per node being simplified
+        stack = []
+        value = self._lookup(node, stack)
+        while stack:
+            key, node, steps = stack[-1]
+            try:
+                child = steps.send(value)
+            except StopIteration as e:
+                stack.pop()
+                value = e.value
+                self._memo[key] = (node, value)
+            else:
+                value = self._lookup(child, stack)
+        return value
+
+    def _lookup(self, node, stack):
+        """Return the simplified node if it's known, or else push a generator
+        simplifying it on `stack`"""
+        key = id(node)
+        try:
+            return self._memo[key][1]
+        except KeyError:
+            pass
+        if isinstance(node, RefProxy):
+            # the target may contain the proxy, so it is bound later
+            result = RefProxy(node.uri)
+            self._proxies.append((result, node.target))
+            self._memo[key] = (node, result)
+            return result
+        stack.append((key, node, self._simplify_node(node)))
+        return None
+
+    def _simplify_all(self, nodes):
+        """Simplify a sequence of nodes, returning it if nothing changed"""
+        result = []
+        for x in nodes:
+            result.append((yield x))
+        if all(a is b for a, b in zip(result, nodes)):
+            return nodes
+        return type(nodes)(result)
+
+    def _simplify_node(self, node):
+        """Simplify a node, yielding each nested node to simplify and
+        receiving its simplification"""
+        if isinstance(node, Schema):
+            return (yield from self._simplify_schema(node))
+        elif isinstance(node, list):
+            return (yield from self._simplify_all(node))
+        elif type(node) is All:
+            return (yield from self._simplify_and(node))
+        elif type(node) in (Any, AnyOf):
+            validators = yield from self._simplify_all(node.validators)
+            if len(validators) == 1:
+                return validators[0]
+            elif validators is node.validators:
+                return node
+            return type(node)(*validators)
+        elif type(node) is OneOf:
+            validators = yield from self._simplify_all(node.validators)
+            if validators is node.validators:
+                return node
+            return OneOf(validators)
+        elif type(node) is voluptuous.SomeOf:
+            validators = yield from self._simplify_all(node.validators)
+            if validators is node.validators:
+                return node
+            return voluptuous.SomeOf(
+                validators, min_valid=node.min_valid, max_valid=node.max_valid
+            )
+        elif isinstance(node, DiscriminatedUnion):
+            choices = {}
+            for key, value in node.choices.items():
+                choices[key] = self._validator((yield value))
+            fallback = self._validator((yield node.fallback))
+            if fallback is node.fallback and all(
+                choices[k] is v for k, v in node.choices.items()
+            ):
+                return node
+            return DiscriminatedUnion(node.key, choices, fallback)
+        elif isinstance(node, TypeDispatch):
+            schemas = collections.OrderedDict()
+            for name, value in node.schemas.items():
+                if value is not None:
+                    value = self._validator((yield value))
+                schemas[name] = value
+            if all(schemas[k] is v for k, v in node.schemas.items()):
+                return node
+            return TypeDispatch(schemas)
+        elif isinstance(node, PatternProperties):
+            patterns = []
+            for pattern, x in node.patterns:
+                patterns.append((pattern, self._validator((yield x))))
+            additional = node.additional
+            if additional is not None and additional is not False:
+                additional = self._validator((yield additional))
+            if additional is node.additional and all(
+                a[1] is b[1] for a, b in zip(patterns, node.patterns)
+            ):
+                return node
+            return PatternProperties(
+                patterns, node.names, additional, max_errors=node.max_errors
+            )
+        elif isinstance(node, Not):
+            schema = yield node.schema
+            # `is_valid` checks types and None without a `Schema`
+            if schema is not None and not isinstance(schema, type):
+                schema = self._validator(schema)
+            return node if schema is node.schema else Not(schema)
+        elif isinstance(node, Dependencies):
+            schemas = {}
+            for key, value in node.schemas.items():
+                schemas[key] = self._validator((yield value))
+            if all(schemas[k] is v for k, v in node.schemas.items()):
+                return node
+            return Dependencies(node.properties, schemas)
+        elif isinstance(node, EnumArray):
+            schemas = []
+            for x in node.schemas:
+                schemas.append(self._validator((yield x)))
+            if all(a is b for a, b in zip(schemas, node.schemas)):
+                return node
+            return EnumArray(
+                schemas, node.additional_items, max_errors=node.max_errors
+            )
+        return node
+
+    def _simplify_schema(self, node):
+        if isinstance(node.schema, dict):
+            mapping = {}
+            for key, value in node.schema.items():
+                mapping[key] = yield value
+            if all(mapping[k] is v for k, v in node.schema.items()):
+                return node
+            return _rebuild(node, mapping)
+        inner = yield node.schema
+        if not _has_mapping(inner) and _is_shallow(inner):
+            return inner
+        elif inner is node.schema:
+            return node
+        return _rebuild(node, inner)
+
+    def _simplify_and(self, node):
+        validators = []
+        for validator in (yield from self._simplify_all(node.validators)):
+            if type(validator) is All and validator.msg is None:
+                validators.extend(validator.validators)
+            elif validator is object or (
+                isinstance(validator, voluptuous.Length) and
+                validator.min is None and validator.max is None
+            ):
+                # accepts anything
+                continue
+            else:
+                validators.append(validator)
+        validators = _merge_number_checks(validators)
+        if not validators:
+            return object
+        elif len(validators) == 1:
+            return validators[0]
+        elif len(validators) == len(node.validators) and all(
+            a is b for a, b in zip(validators, node.validators)
+        ):
+            return node
+        return All(*validators, msg=node.msg)
+
+
+def _number_type(validator):
+    """Return the python types of a number type check, or None"""
+    if validator is int:
+        return int
+    elif type(validator) is Any and \
+            tuple(validator.validators) == (int, float):
+        return (int, float)
+    return None
+
+
+def _merge_number_checks(validators):
+    """Merge a number type check and the checks following it"""
+    if len(validators) < 2 or _number_type(validators[0]) is None:
+        return validators
+    check = NumberCheck(_number_type(validators[0]))
+    rest = list(validators[1:])
+    if rest and isinstance(rest[0], MultipleOf):
+        check.multiple_of = rest.pop(0).multiple_base
+    if rest and type(rest[0]) is voluptuous.Range and rest[0].msg is None:
+        check.range = rest.pop(0)
+    if len(rest) == len(validators) - 1:
+        return validators
+    return [check] + rest
+
 
 def to_string(schema, warned=[]):
     if not warned:
@@ -204,11 +2391,21 @@ def to_string(schema, warned=[]):
         warned.append(True)
 
     result = ''
-    # Handling Schema
-    if hasattr(schema, 'schema'):
-        result += '%s(' % schema.__class__.__name__
+    # Handling Schema. Compiled validators like All() also get a `schema`
+    # attribute pointing back at their parent, so check the type here.
+    if isinstance(schema, Schema):
+        # a `ConvertedSchema` is a `Schema` with an extra method
+        result += '%s(' % (
+            'Schema' if type(schema) is ConvertedSchema
+            else schema.__class__.__name__
+        )
         result += to_string(schema.schema)
         result += ')'
+    # Handling markers of keys, like Required
+    elif isinstance(schema, voluptuous.Marker):
+        result += '%s(%s)' % (
+            schema.__class__.__name__, to_string(schema.schema)
+        )
     # Handling _WithSubValidators
     elif hasattr(schema, 'validators'):
         result += '%s(' % schema.__class__.__name__
@@ -228,12 +2425,3 @@ def to_string(schema, warned=[]):
     else:
         result += repr(schema)
     return result
-
-
-if __name__ == '__main__':
-    import sys
-    with open(sys.argv[1]) as f:
-        data = json.load(f)
-    schema = to_voluptuous(data)
-    print(repr(schema))
-    print(to_string(schema))
@@ -0,0 +1,5 @@
+import sys
+
+from voluptuary.cli import main
+
+sys.exit(main())
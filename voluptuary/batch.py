@@ -0,0 +1,212 @@
+"""Validating many documents against one schema"""
+import collections
+import concurrent.futures
+import functools
+import itertools
+import os
+import time
+
+import voluptuous
+
+import voluptuary
+from voluptuary.compiled import CompiledSchema
+
+ValidationResult = collections.namedtuple(
+    'ValidationResult', ['ok', 'value', 'errors']
+)
+ValidationResult.__doc__ = """The result of validating one document
+
+`value` is the validated value if `ok`, and the original document
+otherwise. `errors` is a sequence of `voluptuous.Invalid` (empty if `ok`).
+"""
+
+# Building results with tuple.__new__ skips the (comparatively slow)
+# namedtuple constructor, which is noticeable when validating many records
+_new_result = tuple.__new__
+_NO_ERRORS = ()
+
+
+def _errors(e):
+    """Flatten an error into a list, dropping the tracebacks
+
+    The tracebacks keep every frame between the raise and the handler
+    alive. We never report them, so drop them rather than hold on to them
+    for as long as the caller keeps the results.
+    """
+    errors = e.errors if isinstance(e, voluptuous.MultipleInvalid) else [e]
+    result = []
+    for error in errors:
+        if isinstance(error, voluptuous.MultipleInvalid):
+            result.extend(_errors(error))
+        else:
+            error.__traceback__ = None
+            result.append(error)
+    return result
+
+
+def validate_many(schema, documents):
+    """Validate each document against the schema, without raising
+
+    Yields a `ValidationResult` per document, in order. `schema` is a
+    converted schema (from `to_voluptuous` or `to_validator`), or any
+    callable that raises `voluptuous.Invalid`. `documents` can be any
+    iterable, and is consumed lazily.
+    """
+    if isinstance(schema, CompiledSchema):
+        # Calling the checks directly skips `CompiledSchema.__call__`, which
+        # wraps every error into a new `MultipleInvalid`.
+        check = schema._check
+        for document in documents:
+            try:
+                check(document, [])
+            except voluptuous.Invalid as e:
+                yield _new_result(
+                    ValidationResult, (False, document, _errors(e))
+                )
+            else:
+                yield _new_result(
+                    ValidationResult, (True, document, _NO_ERRORS)
+                )
+        return
+
+    for document in documents:
+        try:
+            value = schema(document)
+        except voluptuous.Invalid as e:
+            yield _new_result(ValidationResult, (False, document, _errors(e)))
+        else:
+            yield _new_result(ValidationResult, (True, value, _NO_ERRORS))
+
+
+def filter_valid(schema, documents):
+    """Yield the documents which are valid against the schema, in order
+
+    Documents are tested with `voluptuary.is_valid`, so no errors are built
+    for the invalid ones. `schema` is a converted schema (from
+    `to_voluptuous` or `to_validator`), or any voluptuous schema.
+    """
+    probe = getattr(schema, 'is_valid', None)
+    if probe is None:
+        probe = functools.partial(voluptuary.is_valid, schema)
+    return filter(probe, documents)
+
+
+# Adaptive chunking aims for chunks that take about this long to validate:
+# long enough to amortize the cost of sending a chunk to a worker, and short
+# enough to keep all workers busy until the end of the input.
+_TARGET_CHUNK_SECONDS = 0.05
+_MIN_CHUNK_SIZE = 16
+_MAX_CHUNK_SIZE = 8192
+
+# the converted schema of a worker process
+_worker_schema = None
+
+
+def _init_worker(json_schema, backend, max_errors, check_formats):
+    global _worker_schema
+    _worker_schema = voluptuary.to_validator(
+        json_schema, backend=backend, max_errors=max_errors,
+        check_formats=check_formats,
+    )
+
+
+def _picklable(errors):
+    """Replace markers in error paths by the key they mark
+
+    voluptuous reports a missing key with the `Required` marker in the
+    path, and markers can't be pickled.
+    """
+    for error in errors:
+        if any(isinstance(key, voluptuous.Marker) for key in error.path):
+            error.path[:] = [
+                key.schema if isinstance(key, voluptuous.Marker) else key
+                for key in error.path
+            ]
+    return errors
+
+
+def _validate_chunk(documents):
+    """Validate a chunk in a worker process
+
+    Returns the errors of each document (None if it is valid), and the time
+    taken. The validated values are not sent back, since a converted schema
+    never changes the value.
+    """
+    start = time.perf_counter()
+    errors = [
+        None if ok else _picklable(errors)
+        for ok, _, errors in validate_many(_worker_schema, documents)
+    ]
+    return errors, time.perf_counter() - start
+
+
+def _next_chunk_size(chunk_size, n_documents, seconds):
+    """Pick the next chunk size from how long the last chunk took"""
+    if seconds <= 0:
+        ideal = chunk_size * 2
+    else:
+        ideal = int(n_documents * _TARGET_CHUNK_SECONDS / seconds)
+    # change gradually, so one slow or fast chunk doesn't swing the size
+    ideal = max(chunk_size // 2, min(chunk_size * 2, ideal))
+    return max(_MIN_CHUNK_SIZE, min(_MAX_CHUNK_SIZE, ideal))
+
+
+def validate_parallel(
+    json_schema, documents, backend='voluptuous', max_workers=None,
+    chunk_size=None, max_errors=None, check_formats=False
+):
+    """Validate documents across a pool of processes, without raising
+
+    Like `validate_many`, this yields a `ValidationResult` per document, in
+    the order of `documents`. Since converted schemas cannot be pickled,
+    this takes the JSON Schema itself, and each worker process converts it
+    once (using `backend`, `max_errors` and `check_formats`). Formats
+    registered with `voluptuary.formats.register_format` in this process are
+    only known to the workers if they are forked.
+
+    Documents are sent to the workers in chunks. If `chunk_size` is not
+    given, it adapts to how long the chunks take to validate. At most a few
+    chunks per worker are in flight, so `documents` may be a long stream.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(json_schema, backend, max_errors, check_formats),
+    )
+    adaptive = chunk_size is None
+    if adaptive:
+        chunk_size = _MIN_CHUNK_SIZE
+    max_pending = 2 * max_workers
+    documents = iter(documents)
+    pending = collections.deque()
+    try:
+        while True:
+            while len(pending) < max_pending:
+                chunk = list(itertools.islice(documents, chunk_size))
+                if not chunk:
+                    break
+                pending.append(
+                    (chunk, executor.submit(_validate_chunk, chunk))
+                )
+            if not pending:
+                break
+
+            chunk, future = pending.popleft()
+            errors, seconds = future.result()
+            if adaptive:
+                chunk_size = _next_chunk_size(chunk_size, len(chunk), seconds)
+            for document, document_errors in zip(chunk, errors):
+                if document_errors is None:
+                    yield _new_result(
+                        ValidationResult, (True, document, _NO_ERRORS)
+                    )
+                else:
+                    yield _new_result(
+                        ValidationResult, (False, document, document_errors)
+                    )
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
@@ -0,0 +1,220 @@
+"""Persistent on-disk cache of converted schemas
+
+Converting a large number of JSON Schemas on every process start can be
+slow. `SchemaCache` stores each converted voluptuous schema in a cache
+directory, keyed by a hash of the canonicalized JSON Schema, so later
+processes only pay the (much cheaper) cost of loading it.
+
+Invalidation: the versions of voluptuary and voluptuous are part of the
+key, so an upgrade of either never loads entries written by another
+version. Entries for old versions are never hit again and are eventually
+evicted, since the cache directory is bounded in size and evicts the
+least recently used entries first.
+
+Security: entries are pickles, which can run any code when loaded, so the
+cache directory must be trusted.
+"""
+import copyreg
+import hashlib
+import io
+import json
+import os
+import pickle
+import tempfile
+
+import voluptuous
+from voluptuous.validators import _WithSubValidators
+
+import voluptuary
+
+_SUFFIX = '.pickle'
+
+
+def _reduce_with_sub_validators(obj):
+    # `_compiled` and `_probes` hold closures, and `schema` is a reference
+    # back to the parent schema. They are set again when the parent schema
+    # compiles.
+    state = {
+        k: v
+        for k, v in vars(obj).items()
+        if k not in ('_compiled', '_probes', 'schema')
+    }
+    return copyreg.__newobj__, (type(obj), ), state
+
+
+def _set_schema_state(schema, state):
+    schema.__dict__.update(state)
+    # By now, everything the schema holds is loaded: only a `RefProxy` can
+    # refer back to a schema being loaded, and it is only called (not
+    # compiled) by the schemas holding it.
+    schema._compiled = schema._compile(schema.schema)
+
+
+def _reduce_schema(schema):
+    # A Schema compiles itself into closures, which can't be pickled. Build
+    # it again from its arguments instead. The (empty) schema is created
+    # first and compiled once its state is set: with recursive refs, the
+    # arguments may refer back to the schema itself.
+    state = {
+        k: v
+        for k, v in vars(schema).items() if k not in ('_compiled', '_probe')
+    }
+    return (
+        copyreg.__newobj__, (type(schema), ), state, None, None,
+        _set_schema_state
+    )
+
+
+def _reduce_marker(marker):
+    # Markers hold a compiled Schema and a cached hash function. The
+    # converter only creates markers without defaults or descriptions.
+    return type(marker), (marker.schema, marker.msg)
+
+
+def _subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        for x in _subclasses(subclass):
+            yield x
+
+
+def _dispatch_table():
+    table = copyreg.dispatch_table.copy()
+    for cls in [voluptuous.Schema] + list(_subclasses(voluptuous.Schema)):
+        table[cls] = _reduce_schema
+    for cls in _subclasses(_WithSubValidators):
+        table[cls] = _reduce_with_sub_validators
+    for cls in (voluptuous.Required, voluptuous.Optional):
+        table[cls] = _reduce_marker
+    return table
+
+
+def dumps(schema):
+    """Serialize a converted voluptuous schema to bytes"""
+    buf = io.BytesIO()
+    pickler = pickle.Pickler(buf, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = _dispatch_table()
+    pickler.dump(schema)
+    return buf.getvalue()
+
+
+def loads(data):
+    """Load a voluptuous schema serialized with `dumps`"""
+    return pickle.loads(data)
+
+
+def schema_key(schema):
+    """Return a hash of the canonicalized JSON Schema
+
+    The key also covers the versions of voluptuary and voluptuous.
+    """
+    canonical = json.dumps(
+        [voluptuary.__version__, voluptuous.__version__, schema],
+        sort_keys=True,
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class SchemaCache(object):
+    """Converts JSON Schemas, caching the results in `directory`
+
+    The directory is kept under `max_bytes` by evicting the least recently
+    used entries. Several processes may share a directory. Entries which
+    fail to load are converted again.
+
+    Entries are pickles, and loading one can run any code: only use a
+    directory which nobody untrusted can write to.
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # estimated size of the directory, computed on first store
+        self._size = None
+        os.makedirs(directory, exist_ok=True)
+
+    def to_voluptuous(self, schema):
+        """Return the converted schema, loading it from the cache if present
+        """
+        path = self._path(schema_key(schema))
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            data = None
+        if data is not None:
+            try:
+                result = loads(data)
+            except Exception:
+                # Corrupt, or written before a change to the classes it
+                # refers to (which the version in the key doesn't cover
+                # between releases). It's replaced below.
+                _remove(path)
+            else:
+                self._touch(path)
+                return result
+
+        result = voluptuary.to_voluptuous(schema)
+        self._store(path, dumps(result))
+        return result
+
+    def clear(self):
+        for path, _, _ in self._entries():
+            _remove(path)
+        self._size = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def _entries(self):
+        """Yield (path, size, mtime) for every entry in the directory"""
+        for name in os.listdir(self.directory):
+            if not name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            yield path, stat.st_size, stat.st_mtime
+
+    def _touch(self, path):
+        # mark as recently used for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _store(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            _remove(tmp_path)
+            return
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self._size = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if self._size <= self.max_bytes:
+                break
+            _remove(path)
+            self._size -= size
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,199 @@
+"""Command line interface
+
+    $ voluptuary convert schema.json
+    $ voluptuary validate schema.json records.ndjson
+    $ cat records.ndjson | voluptuary validate schema.json
+"""
+import argparse
+import collections
+import json
+import sys
+import time
+
+import voluptuary
+from voluptuary.batch import validate_many, validate_parallel
+
+
+def convert(args):
+    with open(args.schema) as f:
+        data = json.load(f)
+    schema = voluptuary.to_voluptuous(data)
+    print(repr(schema))
+    print(voluptuary.to_string(schema))
+    return 0
+
+
+def _read_records(f, line_numbers, bad_lines, stats):
+    """Parse each non-blank line of `f`, one line at a time
+
+    The line number of each record is appended to `line_numbers`. Lines
+    which aren't valid JSON are not yielded, but appended to `bad_lines` as
+    (line number, error).
+    """
+    for line_number, line in enumerate(f, 1):
+        stats['bytes'] += len(line)
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line.decode('utf-8'))
+        except ValueError as e:
+            bad_lines.append((line_number, e))
+            continue
+        line_numbers.append(line_number)
+        yield record
+
+
+def _report_bad_lines(bad_lines, stats, quiet, before=None):
+    """Report the lines which aren't valid JSON as invalid records, up to
+    line `before` (or all of them)"""
+    while bad_lines and (before is None or bad_lines[0][0] < before):
+        line_number, error = bad_lines.popleft()
+        stats['records'] += 1
+        stats['invalid'] += 1
+        if not quiet:
+            print('line %s: invalid JSON: %s' % (line_number, error))
+
+
+def validate(args):
+    with open(args.schema) as f:
+        json_schema = json.load(f)
+
+    if args.records == '-':
+        f = sys.stdin.buffer
+    else:
+        f = open(args.records, 'rb')
+
+    stats = collections.Counter()
+    line_numbers = collections.deque()
+    bad_lines = collections.deque()
+    start = time.perf_counter()
+    try:
+        records = _read_records(f, line_numbers, bad_lines, stats)
+        if args.jobs > 1:
+            results = validate_parallel(
+                json_schema,
+                records,
+                args.backend,
+                max_workers=args.jobs,
+                max_errors=args.max_errors,
+                check_formats=args.check_formats,
+            )
+        else:
+            schema = voluptuary.to_validator(
+                json_schema,
+                args.backend,
+                max_errors=args.max_errors,
+                check_formats=args.check_formats,
+            )
+            results = validate_many(schema, records)
+
+        for ok, value, errors in results:
+            line_number = line_numbers.popleft()
+            # in line order, with the records around them
+            _report_bad_lines(bad_lines, stats, args.quiet, line_number)
+            stats['records'] += 1
+            if ok:
+                continue
+            stats['invalid'] += 1
+            if not args.quiet:
+                for e in errors:
+                    print('line %s: %s' % (line_number, e))
+        _report_bad_lines(bad_lines, stats, args.quiet)
+    finally:
+        if f is not sys.stdin.buffer:
+            f.close()
+
+    seconds = time.perf_counter() - start
+    print(
+        '%s records, %s invalid, %.0f records/s, %.2f MB/s' % (
+            stats['records'],
+            stats['invalid'],
+            stats['records'] / seconds if seconds else 0,
+            stats['bytes'] / 1e6 / seconds if seconds else 0,
+        ),
+        file=sys.stderr,
+    )
+    return 1 if stats['invalid'] else 0
+
+
+def _positive_int(string):
+    try:
+        value = int(string)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise argparse.ArgumentTypeError(
+            'expected a positive integer, got %r' % string
+        )
+    return value
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(
+        prog='voluptuary',
+        description='Convert JSON Schemas to voluptuous schemas',
+    )
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    convert_parser = subparsers.add_parser(
+        'convert', help='print the voluptuous schema for a JSON Schema'
+    )
+    convert_parser.add_argument('schema', help='path to a JSON Schema')
+    convert_parser.set_defaults(func=convert)
+
+    validate_parser = subparsers.add_parser(
+        'validate',
+        help='validate newline delimited JSON records against a JSON Schema',
+    )
+    validate_parser.add_argument('schema', help='path to a JSON Schema')
+    validate_parser.add_argument(
+        'records',
+        nargs='?',
+        default='-',
+        help='path to a file of JSON records, one per line (default: stdin)',
+    )
+    validate_parser.add_argument(
+        '--backend',
+        choices=voluptuary.BACKENDS,
+        default='compiled',
+        help='validation backend (default: %(default)s)',
+    )
+    validate_parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=1,
+        help='number of processes to validate with (default: %(default)s)',
+    )
+    validate_parser.add_argument(
+        '--max-errors',
+        type=_positive_int,
+        metavar='N',
+        help='stop validating a record after N errors (default: report all '
+        'errors)',
+    )
+    validate_parser.add_argument(
+        '--check-formats',
+        action='store_true',
+        help='check the `format` of strings (date-time, email, hostname, '
+        'ipv4, ipv6 and uri)',
+    )
+    validate_parser.add_argument(
+        '-q',
+        '--quiet',
+        action='store_true',
+        help='only print the summary, not each error',
+    )
+    validate_parser.set_defaults(func=validate)
+    return parser
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    # `voluptuary schema.json` is short for `voluptuary convert schema.json`
+    if argv and argv[0] not in ('convert', 'validate', '-h', '--help'):
+        argv = ['convert'] + list(argv)
+    args = make_parser().parse_args(argv)
+    return args.func(args)
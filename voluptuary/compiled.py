@@ -0,0 +1,1157 @@
+"""Compiled validation backend
+
+Instead of building a tree of voluptuous validators, this compiles a JSON
+Schema into plain Python closures. Type checks, ranges and lengths are
+checked inline, which avoids the nested `Schema(All(...))` wrappers (and the
+call frames and exception handlers that come with them) for every value.
+
+Errors are reported the same way a voluptuous `Schema` reports them: a
+`voluptuous.MultipleInvalid` whose errors carry the path to the bad value.
+"""
+import functools
+import itertools
+import sys
+
+import voluptuous
+
+from voluptuary import JSON_TYPES, NOT_MESSAGE, Enum, PatternSet, Resolver
+from voluptuary import canonical_key
+from voluptuary import compile_pattern, discriminate, find_duplicate
+from voluptuary import scalar_key, split_by_type
+
+# type name -> (python types, excluded types, error message)
+_TYPES = {
+    'string': ((str, ), (), 'expected str'),
+    'integer': ((int, ), (bool, ), 'expected int'),
+    'number': ((int, float), (bool, ), 'expected a number'),
+    'boolean': ((bool, ), (), 'expected bool'),
+    'null': ((type(None), ), (), 'expected None'),
+    'object': ((dict, ), (), 'expected a dictionary'),
+    'array': ((list, ), (), 'expected list'),
+}
+
+
+def is_type(value, name):
+    """Return whether `value` is an instance of the JSON Schema type `name`
+
+    This follows JSON Schema rather than Python: a bool is not an integer or
+    a number, and an integer is a number.
+    """
+    types, excluded, _ = _TYPES[name]
+    return isinstance(value, types) and not isinstance(value, excluded)
+
+
+class CompiledSchema:
+    """A validator compiled from a JSON Schema
+
+    Call it with a value to validate it. Like `voluptuous.Schema`, this
+    returns the value if it is valid and raises `voluptuous.MultipleInvalid`
+    otherwise. `is_valid` only answers whether the value is valid, without
+    raising (or building) any errors.
+    """
+
+    def __init__(self, check, json_schema, make_probe):
+        self._check = check
+        self.json_schema = json_schema
+        self._make_probe = make_probe
+        self._probe = None
+
+    def __call__(self, value):
+        try:
+            self._check(value, [])
+        except voluptuous.MultipleInvalid:
+            raise
+        except voluptuous.Invalid as e:
+            raise voluptuous.MultipleInvalid([e])
+        return value
+
+    def is_valid(self, value):
+        if self._probe is None:
+            # probes are only compiled when first needed
+            self._probe = self._make_probe()
+            self._make_probe = None
+        return self._probe(value)
+
+    def __repr__(self):
+        return 'CompiledSchema(%r)' % (self.json_schema, )
+
+
+def compile_schema(schema, max_errors=None, check_formats=False):
+    return Compiler(
+        schema, max_errors=max_errors, check_formats=check_formats
+    ).compile()
+
+
+# what `Compiler._build` compiles a schema into
+_CHECK = 'check'
+_PROBE = 'probe'
+# what `Compiler._lookup` returns for a schema which isn't compiled yet
+_MISSING = object()
+
+
+def _accept(value, path):
+    pass
+
+
+def _valid(value):
+    return True
+
+
+def _invalid(value):
+    return False
+
+
+def _collect(errors, e):
+    if isinstance(e, voluptuous.MultipleInvalid):
+        errors.extend(e.errors)
+    else:
+        errors.append(e)
+
+
+class Compiler(object):
+    """Compiles a JSON Schema into a `CompiledSchema`
+
+    Every error is reported by default. With `max_errors`, checks stop as
+    soon as that many errors are found (1 fails fast).
+
+    Like `Converter`, this only checks the `format` keyword if
+    `check_formats` is True.
+
+    Besides checks, which raise errors, schemas can be compiled into probes:
+    `is_valid(value)` functions which only return whether a value is valid.
+    `anyOf`, `oneOf` and `not` use probes to find the valid branches, and
+    only run the checks to report the errors of a value which is invalid.
+
+    Like conversion, compiling doesn't recurse (see `_build`), so deeply
+    nested schemas don't hit the recursion limit.
+    """
+
+    def __init__(self, schema, max_errors=None, check_formats=False):
+        if max_errors is not None and max_errors < 1:
+            raise ValueError('max_errors must be at least 1')
+        self._entire_schema = schema
+        self._max_errors = max_errors
+        self._check_formats = check_formats
+        self._resolver = Resolver(self._entire_schema)
+        # compiled checks, keyed by the resolved uri of a `$ref`
+        self._ref_cache = {}
+        # compiled checks, keyed by (base uri, canonical_key(schema))
+        self._interned = {}
+        # the canonical_key memo of the schema
+        self._keys = {}
+        self.deduplicated = 0
+        # probes, keyed like the checks above
+        self._probe_refs = {}
+        self._probes = {}
+
+    def compile(self):
+        return CompiledSchema(
+            self._compile(self._entire_schema),
+            self._entire_schema,
+            functools.partial(self._probe, self._entire_schema),
+        )
+
+    def _compile(self, schema):
+        """Compile a schema into a check"""
+        return self._build(_CHECK, schema)
+
+    def _probe(self, schema):
+        """Compile a schema into a probe"""
+        return self._build(_PROBE, schema)
+
+    def _build(self, kind, schema):
+        """Compile a schema into a check or a probe (by `kind`), and the
+        subschemas nested in it
+
+        Like `Converter._convert`, this drives generators (see
+        `_compile_node` and `_probe_node`) which yield a `(kind, subschema)`
+        request for each subschema they need compiled. The generators are
+        kept on a stack rather than called by recursion, so deeply nested
+        schemas don't hit the recursion limit. Identical schemas share their
+        checks and probes (see `_lookup`).
+        """
+        # (generator, kind, key) per schema being compiled
+        stack = []
+        # the request to compile next, or None to resume the generator on
+        # top of the stack with `value` (or `error`)
+        pending = (kind, schema)
+        value = error = None
+        while True:
+            if pending is not None:
+                kind, schema = pending
+                pending = None
+                key, value = self._lookup(kind, schema)
+                if value is _MISSING:
+                    node = self._compile_node if kind is _CHECK \
+                        else self._probe_node
+                    stack.append((node(schema), kind, key))
+                    value = None
+                elif not stack:
+                    return value
+
+            steps, kind, key = stack[-1]
+            try:
+                if error is None:
+                    pending = steps.send(value)
+                else:
+                    pending, error = steps.throw(error), None
+                continue
+            except StopIteration as e:
+                value, error = e.value, None
+                stack.pop()
+                if key is not None:
+                    self._built(kind)[key] = value
+            except Exception as e:
+                error = e
+                stack.pop()
+            if not stack:
+                if error is not None:
+                    raise error
+                return value
+
+    def _built(self, kind):
+        """Return the checks or probes (by `kind`) of the interned schemas"""
+        return self._interned if kind is _CHECK else self._probes
+
+    def _lookup(self, kind, schema):
+        """Return the key of a schema, and its check or probe (by `kind`) if
+        it was already compiled (or else `_MISSING`)"""
+        key = canonical_key(schema, self._keys)
+        if key is None:
+            return None, _MISSING
+        key = (self._resolver.base_uri, key)
+        result = self._built(kind).get(key, _MISSING)
+        if result is not _MISSING and kind is _CHECK:
+            self.deduplicated += 1
+        return key, result
+
+    def _in_scope(self, kind, url, schema):
+        """Request a schema, in the scope of `url` if it's not None"""
+        if url is None:
+            return (yield kind, schema)
+        self._resolver.push_scope(url)
+        try:
+            return (yield kind, schema)
+        finally:
+            self._resolver.pop_scope()
+
+    def _compile_node(self, schema):
+        """Compile a schema into a `check(value, path)` function, yielding
+        a request for each subschema to compile (see `_build`)
+
+        The check returns nothing if the value is valid and raises
+        `voluptuous.Invalid` otherwise. Each keyword is compiled into its own
+        check, and only applies to values of the type the keyword is about.
+        """
+        if not schema:
+            return _accept
+        elif not isinstance(schema, dict):
+            raise Exception("Failed to compile schema: %s" % schema)
+        elif '$ref' in schema:
+            return (yield from self._compile_ref(schema['$ref']))
+
+        checks = []
+        if 'type' in schema:
+            checks.append(self._compile_type(schema['type']))
+        if 'enum' in schema:
+            checks.append(self._compile_enum(schema['enum']))
+        if any(k in schema for k in _OBJECT_KEYWORDS):
+            checks.append((yield from self._compile_object(schema)))
+        if any(k in schema for k in _ARRAY_KEYWORDS):
+            checks.append((yield from self._compile_array(schema)))
+        if any(k in schema for k in _NUMBER_KEYWORDS):
+            checks.append(self._compile_number(schema))
+        if any(k in schema for k in _STRING_KEYWORDS):
+            checks.append(self._compile_string(schema))
+        if 'format' in schema and self._check_formats:
+            checks.append(self._compile_format(schema['format']))
+        if 'dependencies' in schema:
+            checks.append((yield from self._compile_dependencies(
+                schema['dependencies']
+            )))
+        if 'not' in schema:
+            checks.append(_not((yield _PROBE, schema['not'])))
+        if 'allOf' in schema:
+            checks.extend((yield from _each(_CHECK, schema['allOf'])))
+        if 'anyOf' in schema:
+            checks.append(
+                (yield from self._compile_union(schema['anyOf'], _any_of))
+            )
+        if 'oneOf' in schema:
+            checks.append(
+                (yield from self._compile_union(schema['oneOf'], _one_of))
+            )
+        return _sequence(checks)
+
+    def _compile_ref(self, ref):
+        url, resolved = self._resolver.resolve(ref)
+        if url in self._ref_cache:
+            return self._ref_cache[url]
+
+        # a forward reference, so that recursive refs terminate
+        target = []
+
+        def check_ref(value, path):
+            target[0](value, path)
+
+        self._ref_cache[url] = check_ref
+        self._resolver.push_scope(url)
+        try:
+            target.append((yield _CHECK, resolved))
+        except Exception:
+            del self._ref_cache[url]
+            raise
+        finally:
+            self._resolver.pop_scope()
+        return check_ref
+
+    def _compile_type(self, type_):
+        names, types, excluded = _type_spec(type_)
+        if isinstance(type_, list):
+            msg = 'expected one of: %s' % ', '.join(names)
+        else:
+            msg = _TYPES[type_][2]
+        error = voluptuous.DictInvalid if names == ['object'] \
+            else voluptuous.TypeInvalid
+
+        if excluded:
+
+            def check_type(value, path):
+                if not isinstance(value, types) or isinstance(value, excluded):
+                    raise error(msg, path)
+        else:
+
+            def check_type(value, path):
+                if not isinstance(value, types):
+                    raise error(msg, path)
+
+        return check_type
+
+    def _compile_enum(self, values):
+        enum = Enum(values)
+        msg = enum.msg
+
+        def check_enum(value, path):
+            if value not in enum:
+                raise voluptuous.InInvalid(msg, path)
+
+        return check_enum
+
+    def _compile_object(self, schema):
+        properties = {}
+        for key, val in schema.get('properties', {}).items():
+            properties[key] = yield _CHECK, val
+        required = schema.get('required', [])
+        additional = schema.get('additionalProperties', True)
+        if additional is True:
+            check_additional = None
+        elif additional is False:
+            check_additional = False
+        else:
+            check_additional = yield _CHECK, additional
+        pattern_props = schema.get('patternProperties', {})
+        if pattern_props:
+            pattern_set = PatternSet(pattern_props)
+            pattern_checks = yield from _each(_CHECK, pattern_props.values())
+        else:
+            pattern_set = None
+        min_props = schema.get('minProperties')
+        max_props = schema.get('maxProperties')
+        max_errors = self._max_errors or sys.maxsize
+
+        # (property or None, indexes of the matched patterns) -> check
+        matched_checks = {}
+
+        def check_matched(key, matched):
+            """Return the check for a property which matches patterns"""
+            name = key if key in properties else None
+            try:
+                return matched_checks[name, matched]
+            except KeyError:
+                checks = [pattern_checks[i] for i in matched]
+                if name is not None:
+                    checks.insert(0, properties[name])
+                check = matched_checks[name, matched] = _sequence(checks)
+                return check
+
+        def check_object(value, path):
+            if not isinstance(value, dict):
+                return
+            errors = []
+            for key in required:
+                if key not in value:
+                    errors.append(
+                        voluptuous.RequiredFieldInvalid(
+                            'required key not provided', path + [key]
+                        )
+                    )
+            for key, item in value.items():
+                check = properties.get(key, check_additional)
+                if pattern_set is not None and isinstance(key, str):
+                    matched = pattern_set.search(key)
+                    if matched:
+                        check = check_matched(key, matched)
+                if check is None:
+                    continue
+                elif check is False:
+                    errors.append(
+                        voluptuous.Invalid(
+                            'extra keys not allowed', path + [key]
+                        )
+                    )
+                else:
+                    try:
+                        check(item, path + [key])
+                        continue
+                    except voluptuous.Invalid as e:
+                        _collect(errors, e)
+                if len(errors) >= max_errors:
+                    raise voluptuous.MultipleInvalid(errors[:max_errors])
+            if min_props is not None and len(value) < min_props:
+                errors.append(
+                    voluptuous.LengthInvalid(
+                        'length of value must be at least %s' % min_props,
+                        path,
+                    )
+                )
+            if max_props is not None and len(value) > max_props:
+                errors.append(
+                    voluptuous.LengthInvalid(
+                        'length of value must be at most %s' % max_props,
+                        path,
+                    )
+                )
+            if errors:
+                raise voluptuous.MultipleInvalid(errors[:max_errors])
+
+        return check_object
+
+    def _compile_array(self, schema):
+        items = schema.get('items', {})
+        additional = schema.get('additionalItems', True)
+        min_items = schema.get('minItems')
+        max_items = schema.get('maxItems')
+        unique = schema.get('uniqueItems', False)
+        if isinstance(items, dict):
+            check_item = yield _CHECK, items
+            check_items = None
+        elif isinstance(items, list):
+            check_item = None
+            check_items = yield from _each(_CHECK, items)
+            if isinstance(additional, dict):
+                check_additional = yield _CHECK, additional
+            else:
+                check_additional = additional
+        else:
+            raise Exception("Invalid schema for `items`: {}".format(schema))
+
+        max_errors = self._max_errors or sys.maxsize
+
+        def check_array(value, path):
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                raise voluptuous.LengthInvalid(
+                    'length of value must be at least %s' % min_items, path
+                )
+            if max_items is not None and len(value) > max_items:
+                raise voluptuous.LengthInvalid(
+                    'length of value must be at most %s' % max_items, path
+                )
+            if unique:
+                duplicate = find_duplicate(value)
+                if duplicate is not None:
+                    raise voluptuous.Invalid(
+                        'item is a duplicate of item %s' % duplicate[0],
+                        path + [duplicate[1]],
+                    )
+            if check_item is not None:
+                if check_item is _accept:
+                    return
+                checks = itertools.repeat(check_item)
+            else:
+                if len(value) > len(check_items):
+                    if check_additional is False:
+                        raise voluptuous.Invalid(
+                            'additional items {} are not allowed'
+                            .format(value[len(check_items):]),
+                            path,
+                        )
+                    elif check_additional is True:
+                        checks = check_items
+                    else:
+                        checks = itertools.chain(
+                            check_items, itertools.repeat(check_additional)
+                        )
+                else:
+                    checks = check_items
+            errors = None
+            for i, (check, item) in enumerate(zip(checks, value)):
+                try:
+                    check(item, path + [i])
+                except voluptuous.Invalid as e:
+                    if errors is None:
+                        errors = []
+                    _collect(errors, e)
+                    if len(errors) >= max_errors:
+                        break
+            if errors:
+                raise voluptuous.MultipleInvalid(errors[:max_errors])
+
+        return check_array
+
+    def _compile_number(self, schema):
+        minimum = schema.get('minimum')
+        maximum = schema.get('maximum')
+        exclusive_min = schema.get('exclusiveMinimum', False)
+        exclusive_max = schema.get('exclusiveMaximum', False)
+        multiple_of = schema.get('multipleOf')
+
+        def check_number(value, path):
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return
+            if minimum is not None:
+                if exclusive_min and value <= minimum:
+                    raise voluptuous.RangeInvalid(
+                        'value must be higher than %s' % minimum, path
+                    )
+                elif value < minimum:
+                    raise voluptuous.RangeInvalid(
+                        'value must be at least %s' % minimum, path
+                    )
+            if maximum is not None:
+                if exclusive_max and value >= maximum:
+                    raise voluptuous.RangeInvalid(
+                        'value must be lower than %s' % maximum, path
+                    )
+                elif value > maximum:
+                    raise voluptuous.RangeInvalid(
+                        'value must be at most %s' % maximum, path
+                    )
+            if multiple_of is not None and value % multiple_of != 0:
+                raise voluptuous.Invalid(
+                    '%s is not a multiple of %s' % (value, multiple_of), path
+                )
+
+        return check_number
+
+    def _compile_string(self, schema):
+        min_length = schema.get('minLength')
+        max_length = schema.get('maxLength')
+        pattern = schema.get('pattern')
+        regex = None if pattern is None else compile_pattern(pattern)
+
+        def check_string(value, path):
+            if not isinstance(value, str):
+                return
+            if min_length is not None and len(value) < min_length:
+                raise voluptuous.LengthInvalid(
+                    'length of value must be at least %s' % min_length, path
+                )
+            if max_length is not None and len(value) > max_length:
+                raise voluptuous.LengthInvalid(
+                    'length of value must be at most %s' % max_length, path
+                )
+            if regex is not None and regex.search(value) is None:
+                raise voluptuous.Invalid(
+                    'does not match regular expression %s' % pattern, path
+                )
+
+        return check_string
+
+    def _compile_format(self, name):
+        from voluptuary.formats import FORMATS
+        checker = FORMATS.get(name)
+        if checker is None:
+            return _accept
+        msg = 'value is not a valid %s' % name
+
+        def check_format(value, path):
+            if isinstance(value, str) and not checker(value):
+                raise voluptuous.Invalid(msg, path)
+
+        return check_format
+
+    def _compile_dependencies(self, dependencies):
+        properties = {
+            key: frozenset(names) for key, names in dependencies.items()
+            if isinstance(names, list)
+        }
+        schemas = {}
+        for key, schema in dependencies.items():
+            if not isinstance(schema, list):
+                schemas[key] = yield _CHECK, schema
+
+        def check_dependencies(value, path):
+            if not isinstance(value, dict):
+                return
+            errors = []
+            keys = value.keys()
+            for key in properties.keys() & keys:
+                required = properties[key]
+                if not keys >= required:
+                    errors.extend(
+                        voluptuous.RequiredFieldInvalid(
+                            'required key not provided, as a dependency of %s'
+                            % key,
+                            path + [name],
+                        ) for name in sorted(required - keys)
+                    )
+            for key in schemas.keys() & keys:
+                try:
+                    schemas[key](value, path)
+                except voluptuous.Invalid as e:
+                    _collect(errors, e)
+            if errors:
+                raise voluptuous.MultipleInvalid(errors)
+
+        return check_dependencies
+
+    def _compile_union(self, schemas, combine):
+        """Compile `anyOf` or `oneOf`, with `combine(checks, probes)`
+
+        If a property tells the branches apart (see `discriminate`), an
+        object is only checked against the branch its value of the property
+        selects. If the branches are of different types (see
+        `split_by_type`), a value is only checked against the branch of its
+        type.
+        """
+        found = discriminate(schemas, self._resolver)
+        if found is None:
+            names = split_by_type(schemas, self._resolver)
+            if names is not None:
+                return _by_type(names, (yield from _each(_CHECK, schemas)))
+            return combine(
+                (yield from _each(_CHECK, schemas)),
+                (yield from _each(_PROBE, schemas)),
+            )
+
+        key, branches = found
+        checks = []
+        probes = []
+        for url, branch, _ in branches:
+            checks.append((yield from self._in_scope(_CHECK, url, branch)))
+            probes.append((yield from self._in_scope(_PROBE, url, branch)))
+        choices = {
+            scalar_key(value): check
+            for check, (_, _, values) in zip(checks, branches)
+            for value in values
+        }
+        check_union = combine(checks, probes)
+
+        def check_discriminated(value, path):
+            if isinstance(value, dict) and key in value:
+                try:
+                    check = choices[scalar_key(value[key])]
+                except (KeyError, TypeError):
+                    raise voluptuous.ScalarInvalid(
+                        'not a valid value', path + [key]
+                    )
+                check(value, path)
+            else:
+                check_union(value, path)
+
+        return check_discriminated
+
+    def _probe_node(self, schema):
+        """Compile a schema into an `is_valid(value)` function, yielding
+        a request for each subschema to compile (see `_build`)
+
+        This mirrors `_compile_node`: each keyword is compiled into its own
+        probe, which accepts values of the types the keyword isn't about.
+        """
+        if not schema:
+            return _valid
+        elif not isinstance(schema, dict):
+            raise Exception("Failed to compile schema: %s" % schema)
+        elif '$ref' in schema:
+            return (yield from self._probe_ref(schema['$ref']))
+
+        probes = []
+        # the probe of an object also checks the type, if it must be one
+        is_object = schema.get('type') == 'object' and any(
+            k in schema for k in _OBJECT_KEYWORDS
+        )
+        if 'type' in schema and not is_object:
+            probes.append(self._probe_type(schema['type']))
+        if 'enum' in schema:
+            probes.append(Enum(schema['enum']).__contains__)
+        if any(k in schema for k in _OBJECT_KEYWORDS):
+            probes.append((yield from self._probe_object(schema, is_object)))
+        if any(k in schema for k in _ARRAY_KEYWORDS):
+            probes.append((yield from self._probe_array(schema)))
+        if any(k in schema for k in _NUMBER_KEYWORDS):
+            probes.append(self._probe_number(schema))
+        if any(k in schema for k in _STRING_KEYWORDS):
+            probes.append(self._probe_string(schema))
+        if 'format' in schema and self._check_formats:
+            probes.append(self._probe_format(schema['format']))
+        if 'dependencies' in schema:
+            probes.append((yield from self._probe_dependencies(
+                schema['dependencies']
+            )))
+        if 'not' in schema:
+            probe_not = yield _PROBE, schema['not']
+            probes.append(lambda value: not probe_not(value))
+        if 'allOf' in schema:
+            probes.extend((yield from _each(_PROBE, schema['allOf'])))
+        if 'anyOf' in schema:
+            probes.append((yield from self._probe_union(
+                schema['anyOf'], _probe_any_of
+            )))
+        if 'oneOf' in schema:
+            probes.append((yield from self._probe_union(
+                schema['oneOf'], _probe_one_of
+            )))
+        return _probe_all(probes)
+
+    def _probe_ref(self, ref):
+        url, resolved = self._resolver.resolve(ref)
+        if url in self._probe_refs:
+            return self._probe_refs[url]
+
+        # a forward reference, so that recursive refs terminate
+        target = []
+
+        def probe_ref(value):
+            return target[0](value)
+
+        self._probe_refs[url] = probe_ref
+        self._resolver.push_scope(url)
+        try:
+            target.append((yield _PROBE, resolved))
+        except Exception:
+            del self._probe_refs[url]
+            raise
+        finally:
+            self._resolver.pop_scope()
+        return probe_ref
+
+    def _probe_type(self, type_):
+        _, types, excluded = _type_spec(type_)
+        if excluded:
+            return lambda value: (
+                isinstance(value, types) and not isinstance(value, excluded)
+            )
+        return lambda value: isinstance(value, types)
+
+    def _probe_object(self, schema, is_object):
+        properties = {}
+        for key, val in schema.get('properties', {}).items():
+            properties[key] = yield _PROBE, val
+        required = tuple(schema.get('required', []))
+        additional = schema.get('additionalProperties', True)
+        if additional is True:
+            probe_additional = _valid
+        elif additional is False:
+            probe_additional = _invalid
+        else:
+            probe_additional = yield _PROBE, additional
+        pattern_props = schema.get('patternProperties', {})
+        if pattern_props:
+            pattern_set = PatternSet(pattern_props)
+            pattern_probes = yield from _each(_PROBE, pattern_props.values())
+        else:
+            pattern_set = None
+        min_props = schema.get('minProperties')
+        max_props = schema.get('maxProperties')
+        property_probes = [
+            (key, probe) for key, probe in properties.items()
+            if probe is not _valid
+        ]
+
+        if probe_additional is _valid and pattern_set is None:
+            # only the properties of the schema need probing
+            def probe_object(value):
+                if not isinstance(value, dict):
+                    return not is_object
+                for key in required:
+                    if key not in value:
+                        return False
+                if min_props is not None and len(value) < min_props:
+                    return False
+                if max_props is not None and len(value) > max_props:
+                    return False
+                for key, probe in property_probes:
+                    if key in value and not probe(value[key]):
+                        return False
+                return True
+
+            return probe_object
+
+        def probe_object(value):
+            if not isinstance(value, dict):
+                return not is_object
+            for key in required:
+                if key not in value:
+                    return False
+            if min_props is not None and len(value) < min_props:
+                return False
+            if max_props is not None and len(value) > max_props:
+                return False
+            for key, item in value.items():
+                if pattern_set is not None and isinstance(key, str):
+                    matched = pattern_set.search(key)
+                    if matched:
+                        probe = properties.get(key, _valid)
+                        if not probe(item) or not all(
+                            pattern_probes[i](item) for i in matched
+                        ):
+                            return False
+                        continue
+                if not properties.get(key, probe_additional)(item):
+                    return False
+            return True
+
+        return probe_object
+
+    def _probe_array(self, schema):
+        items = schema.get('items', {})
+        additional = schema.get('additionalItems', True)
+        min_items = schema.get('minItems')
+        max_items = schema.get('maxItems')
+        unique = schema.get('uniqueItems', False)
+        if isinstance(items, dict):
+            probe_item = yield _PROBE, items
+            probe_items = None
+        elif isinstance(items, list):
+            probe_item = None
+            probe_items = yield from _each(_PROBE, items)
+            if isinstance(additional, dict):
+                probe_additional = yield _PROBE, additional
+            else:
+                probe_additional = _valid if additional else None
+        else:
+            raise Exception("Invalid schema for `items`: {}".format(schema))
+
+        def probe_array(value):
+            if not isinstance(value, list):
+                return True
+            if min_items is not None and len(value) < min_items:
+                return False
+            if max_items is not None and len(value) > max_items:
+                return False
+            if unique and find_duplicate(value) is not None:
+                return False
+            if probe_item is not None:
+                return probe_item is _valid or all(map(probe_item, value))
+            n_items = len(probe_items)
+            if len(value) > n_items:
+                if probe_additional is None:
+                    return False
+                elif not all(map(probe_additional, value[n_items:])):
+                    return False
+            return all(probe(item) for probe, item in zip(probe_items, value))
+
+        return probe_array
+
+    def _probe_number(self, schema):
+        minimum = schema.get('minimum')
+        maximum = schema.get('maximum')
+        exclusive_min = schema.get('exclusiveMinimum', False)
+        exclusive_max = schema.get('exclusiveMaximum', False)
+        multiple_of = schema.get('multipleOf')
+
+        def probe_number(value):
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return True
+            if minimum is not None and (
+                value <= minimum if exclusive_min else value < minimum
+            ):
+                return False
+            if maximum is not None and (
+                value >= maximum if exclusive_max else value > maximum
+            ):
+                return False
+            return multiple_of is None or value % multiple_of == 0
+
+        return probe_number
+
+    def _probe_string(self, schema):
+        min_length = schema.get('minLength')
+        max_length = schema.get('maxLength')
+        pattern = schema.get('pattern')
+        regex = None if pattern is None else compile_pattern(pattern)
+
+        def probe_string(value):
+            if not isinstance(value, str):
+                return True
+            if min_length is not None and len(value) < min_length:
+                return False
+            if max_length is not None and len(value) > max_length:
+                return False
+            return regex is None or regex.search(value) is not None
+
+        return probe_string
+
+    def _probe_format(self, name):
+        from voluptuary.formats import FORMATS
+        checker = FORMATS.get(name)
+        if checker is None:
+            return _valid
+        return lambda value: not isinstance(value, str) or checker(value)
+
+    def _probe_dependencies(self, dependencies):
+        properties = {
+            key: frozenset(names) for key, names in dependencies.items()
+            if isinstance(names, list)
+        }
+        schemas = {}
+        for key, schema in dependencies.items():
+            if not isinstance(schema, list):
+                schemas[key] = yield _PROBE, schema
+
+        def probe_dependencies(value):
+            if not isinstance(value, dict):
+                return True
+            keys = value.keys()
+            for key in properties.keys() & keys:
+                if not keys >= properties[key]:
+                    return False
+            for key in schemas.keys() & keys:
+                if not schemas[key](value):
+                    return False
+            return True
+
+        return probe_dependencies
+
+    def _probe_union(self, schemas, combine):
+        """Compile `anyOf` or `oneOf` into a probe, like `_compile_union`"""
+        found = discriminate(schemas, self._resolver)
+        if found is None:
+            probes = yield from _each(_PROBE, schemas)
+            names = split_by_type(schemas, self._resolver)
+            if names is not None:
+                return _probe_by_type(names, probes)
+            return combine(probes)
+
+        key, branches = found
+        probes = []
+        for url, branch, _ in branches:
+            probes.append((yield from self._in_scope(_PROBE, url, branch)))
+        choices = {
+            scalar_key(value): probe
+            for probe, (_, _, values) in zip(probes, branches)
+            for value in values
+        }
+        probe_union = combine(probes)
+
+        def probe_discriminated(value):
+            if isinstance(value, dict) and key in value:
+                try:
+                    probe = choices[scalar_key(value[key])]
+                except (KeyError, TypeError):
+                    return False
+                return probe(value)
+            return probe_union(value)
+
+        return probe_discriminated
+
+
+def _each(kind, schemas):
+    """Request the check or probe (by `kind`) of each of `schemas`"""
+    results = []
+    for schema in schemas:
+        results.append((yield kind, schema))
+    return results
+
+
+def _not(probe):
+    """Check that a value is invalid against the schema of `probe`"""
+
+    def check_not(value, path):
+        if probe(value):
+            raise voluptuous.Invalid(NOT_MESSAGE, path)
+
+    return check_not
+
+
+def _type_spec(type_):
+    """Return (names, python types, excluded types) for a `type` keyword"""
+    names = type_ if isinstance(type_, list) else [type_]
+    types = tuple(t for name in names for t in _TYPES[name][0])
+    # a bool is only excluded if no accepted type allows it
+    if bool in types:
+        excluded = ()
+    else:
+        excluded = tuple(t for name in names for t in _TYPES[name][1])
+    return names, types, excluded
+
+
+def _by_type(names, checks):
+    """Check a value with the check for its type, out of one per type"""
+    table = {}
+    for name, check in zip(names, checks):
+        for type_ in JSON_TYPES[name]:
+            table.setdefault(type_, check)
+    msg = 'expected one of: %s' % ', '.join(names)
+
+    def check_by_type(value, path):
+        try:
+            check = table[type(value)]
+        except KeyError:
+            # an instance of a subclass, e.g. of dict
+            for name, check in zip(names, checks):
+                if is_type(value, name):
+                    break
+            else:
+                raise voluptuous.TypeInvalid(msg, path)
+        check(value, path)
+
+    return check_by_type
+
+
+def _any_of(checks, probes):
+    """Check that a value is valid against at least one of `checks`
+
+    The branches are probed first, so the checks only run (to find the
+    error to report) if the value is invalid.
+    """
+
+    def check_any_of(value, path):
+        for probe in probes:
+            if probe(value):
+                return
+        error = None
+        for check in checks:
+            try:
+                check(value, path)
+                return
+            except voluptuous.Invalid as e:
+                if error is None or len(e.path) > len(error.path):
+                    error = e
+        raise voluptuous.AnyInvalid(error.msg, error.path)
+
+    return check_any_of
+
+
+def _one_of(checks, probes):
+    """Check that a value is valid against exactly one of `checks`, probing
+    the branches first like `_any_of`"""
+
+    def check_one_of(value, path):
+        n_valid = 0
+        for probe in probes:
+            if probe(value):
+                n_valid += 1
+        if n_valid == 1:
+            return
+        elif n_valid > 1:
+            raise voluptuous.Invalid(
+                'value matched %s schemas in oneOf, expected exactly one'
+                % n_valid, path
+            )
+        for check in checks:
+            try:
+                check(value, path)
+            except voluptuous.Invalid as e:
+                raise voluptuous.AnyInvalid(e.msg, e.path)
+        # the probes found no valid branch, so never accept the value
+        raise voluptuous.AnyInvalid(
+            'not valid under any of the given schemas', path
+        )
+
+    return check_one_of
+
+
+def _probe_all(probes):
+    """Combine probes into one, which is valid if they all are"""
+    probes = [p for p in probes if p is not _valid]
+    if not probes:
+        return _valid
+    elif len(probes) == 1:
+        return probes[0]
+    elif len(probes) == 2:
+        first, second = probes
+        return lambda value: first(value) and second(value)
+
+    def probe_all(value):
+        for probe in probes:
+            if not probe(value):
+                return False
+        return True
+
+    return probe_all
+
+
+def _probe_any_of(probes):
+
+    def probe_any_of(value):
+        for probe in probes:
+            if probe(value):
+                return True
+        return False
+
+    return probe_any_of
+
+
+def _probe_one_of(probes):
+    return lambda value: sum(1 for probe in probes if probe(value)) == 1
+
+
+def _probe_by_type(names, probes):
+    """Probe a value with the probe for its type, like `_by_type`"""
+    table = {}
+    for name, probe in zip(names, probes):
+        for type_ in JSON_TYPES[name]:
+            table.setdefault(type_, probe)
+
+    def probe_by_type(value):
+        try:
+            probe = table[type(value)]
+        except KeyError:
+            for name, probe in zip(names, probes):
+                if is_type(value, name):
+                    return probe(value)
+            return False
+        return probe(value)
+
+    return probe_by_type
+
+
+_OBJECT_KEYWORDS = (
+    'properties',
+    'patternProperties',
+    'required',
+    'additionalProperties',
+    'minProperties',
+    'maxProperties',
+)
+_ARRAY_KEYWORDS = (
+    'items',
+    'additionalItems',
+    'minItems',
+    'maxItems',
+    'uniqueItems',
+)
+_STRING_KEYWORDS = ('minLength', 'maxLength', 'pattern')
+_NUMBER_KEYWORDS = (
+    'minimum',
+    'maximum',
+    'exclusiveMinimum',
+    'exclusiveMaximum',
+    'multipleOf',
+)
+
+
+def _sequence(checks):
+    """Combine checks into one, which stops at the first failing check"""
+    checks = [c for c in checks if c is not _accept]
+    if not checks:
+        return _accept
+    elif len(checks) == 1:
+        return checks[0]
+    elif len(checks) == 2:
+        first, second = checks
+
+        def check_both(value, path):
+            first(value, path)
+            second(value, path)
+
+        return check_both
+
+    def check_all(value, path):
+        for check in checks:
+            check(value, path)
+
+    return check_all
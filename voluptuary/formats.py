@@ -0,0 +1,149 @@
+"""Checkers for the `format` keyword
+
+JSON Schema only asks validators to check formats optionally, so formats
+are only checked when conversion is asked to (`check_formats=True`). Then
+each format with a checker in `FORMATS` is checked, and other formats are
+ignored.
+
+A checker takes a string and returns whether it is valid. Values which
+aren't strings are never checked. Register a checker for another format
+(or replace a built-in one) with `register_format`.
+
+The built-in checkers avoid generic parsers: dates and times are matched
+with a precompiled regular expression and their fields range checked by
+hand, rather than with `datetime.strptime`. Only IPv6 addresses, with their
+many abbreviated forms, are parsed with `ipaddress`.
+"""
+import ipaddress
+import re
+
+import voluptuous
+
+_DATE_TIME = re.compile(
+    r'([0-9]{4})-([0-9]{2})-([0-9]{2})[Tt]'
+    r'([0-9]{2}):([0-9]{2}):([0-9]{2})(?:\.[0-9]+)?'
+    r'(?:[Zz]|[+-]([0-9]{2}):([0-9]{2}))'
+)
+_DAYS_IN_MONTH = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def is_date_time(value):
+    """An RFC 3339 date-time, like 2017-07-21T17:32:28Z"""
+    match = _DATE_TIME.fullmatch(value)
+    if match is None:
+        return False
+    year, month, day, hour, minute, second, offset_hour, offset_minute = (
+        match.groups()
+    )
+    month = int(month)
+    day = int(day)
+    if not 1 <= month <= 12 or not 1 <= day <= _DAYS_IN_MONTH[month]:
+        return False
+    if month == 2 and day == 29:
+        year = int(year)
+        if year % 4 or (year % 100 == 0 and year % 400):
+            return False
+    # a second of 60 is a leap second
+    if int(hour) > 23 or int(minute) > 59 or int(second) > 60:
+        return False
+    if offset_hour is not None and (
+        int(offset_hour) > 23 or int(offset_minute) > 59
+    ):
+        return False
+    return True
+
+
+_EMAIL = re.compile(
+    r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+    r'@[A-Za-z0-9](?:[A-Za-z0-9-]*[A-Za-z0-9])?'
+    r'(?:\.[A-Za-z0-9](?:[A-Za-z0-9-]*[A-Za-z0-9])?)*'
+)
+
+
+def is_email(value):
+    """An email address, with an unquoted local part and a domain name"""
+    return _EMAIL.fullmatch(value) is not None
+
+
+_HOSTNAME = re.compile(
+    r'(?=.{1,253}$)'
+    r'[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?'
+    r'(?:\.[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?)*'
+)
+
+
+def is_hostname(value):
+    """An RFC 1034 host name, of labels of at most 63 characters"""
+    return _HOSTNAME.fullmatch(value) is not None
+
+
+_OCTET = r'(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])'
+_IPV4 = re.compile(r'(?:%s\.){3}%s' % (_OCTET, _OCTET))
+
+
+def is_ipv4(value):
+    """An IPv4 address in dotted-quad notation, without leading zeros"""
+    # several times faster than parsing it with `ipaddress`
+    return _IPV4.fullmatch(value) is not None
+
+
+def is_ipv6(value):
+    """An IPv6 address, without a scope id"""
+    if '%' in value:
+        return False
+    try:
+        ipaddress.IPv6Address(value)
+    except ValueError:
+        return False
+    return True
+
+
+_URI = re.compile(
+    r"[A-Za-z][A-Za-z0-9+.-]*:"
+    r"(?:[A-Za-z0-9._~:/?#\[\]@!$&'()*+,;=-]|%[0-9A-Fa-f]{2})*"
+)
+
+
+def is_uri(value):
+    """An absolute RFC 3986 URI, with a scheme"""
+    return _URI.fullmatch(value) is not None
+
+
+# format name -> checker
+FORMATS = {
+    'date-time': is_date_time,
+    'email': is_email,
+    'hostname': is_hostname,
+    'ipv4': is_ipv4,
+    'ipv6': is_ipv6,
+    'uri': is_uri,
+}
+
+
+def register_format(name, checker):
+    """Check strings of format `name` with `checker(value) -> bool`
+
+    This affects schemas converted afterwards. Returns the checker.
+    """
+    FORMATS[name] = checker
+    return checker
+
+
+class Format:
+    """Validate that a string is of a format, with its checker"""
+
+    def __init__(self, name, checker):
+        self.name = name
+        self.checker = checker
+        self.msg = 'value is not a valid %s' % name
+
+    def __call__(self, value):
+        if not self.is_valid(value):
+            raise voluptuous.Invalid(self.msg)
+        return value
+
+    def is_valid(self, value):
+        return not isinstance(value, str) or self.checker(value)
+
+    def __repr__(self):
+        return 'Format(%r)' % (self.name, )
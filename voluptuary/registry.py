@@ -0,0 +1,183 @@
+"""In-memory registry of converted schemas, shared between threads
+
+A service validating documents against many JSON Schemas (e.g. one per
+tenant) converts each schema once and keeps the result. `SchemaRegistry`
+does that safely from many threads:
+
+- single-flight: when several threads ask for a schema that isn't
+  converted yet, one converts it and the others wait for its result
+- bounded: the least recently used schemas are evicted once the estimated
+  size of the converted schemas exceeds `max_bytes`
+- observable: `hits`, `misses` and `evictions` count what happened
+"""
+import collections
+import json
+import threading
+
+import voluptuary
+from voluptuary.cache import schema_key
+
+# Converted schemas take about this many bytes of memory per character of
+# (compact) JSON Schema, for both backends
+_BYTES_PER_CHAR = 40
+
+RegistryStats = collections.namedtuple(
+    'RegistryStats', ['hits', 'misses', 'evictions', 'entries', 'size']
+)
+RegistryStats.__doc__ = """A snapshot of the counters of a `SchemaRegistry`
+
+`misses` counts conversions, and `hits` every other lookup (including the
+threads which waited for another thread's conversion). `size` is the
+estimated size in bytes of the `entries` converted schemas.
+"""
+
+
+def estimate_size(schema):
+    """Estimate the memory used by the conversion of a JSON Schema"""
+    return _BYTES_PER_CHAR * len(
+        json.dumps(schema, separators=(',', ':'), default=repr)
+    )
+
+
+class _Flight(object):
+    """A conversion in progress, which other threads can wait for"""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+
+    def set(self, result=None, error=None):
+        self._result = result
+        self._error = error
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class SchemaRegistry(object):
+    """Converts JSON Schemas once, keeping the most recently used results
+
+    Schemas are converted with `backend`, `max_errors` and `check_formats`
+    (see `voluptuary.to_validator`). The registry holds at most about
+    `max_bytes` of converted schemas, as estimated by `sizeof(schema)`
+    (`estimate_size` by default). A schema larger than that on its own is
+    still returned, but evicts every other one.
+    """
+
+    def __init__(
+        self, max_bytes=256 * 1024 * 1024, backend='voluptuous',
+        max_errors=None, check_formats=False, sizeof=estimate_size
+    ):
+        self.max_bytes = max_bytes
+        self._backend = backend
+        self._max_errors = max_errors
+        self._check_formats = check_formats
+        self._sizeof = sizeof
+        self._lock = threading.Lock()
+        # key -> (converted schema, estimated size), least recently used
+        # first
+        self._entries = collections.OrderedDict()
+        # key -> _Flight, for the schemas being converted
+        self._flights = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, schema, key=None):
+        """Return the converted schema, converting it if it isn't registered
+
+        Schemas are registered under `key`, which defaults to a hash of
+        their content (see `voluptuary.cache.schema_key`). Hashing a large
+        schema on every lookup is slow, so pass a key (like a schema id) if
+        there is one. A schema is only converted if nothing is registered
+        under its key, so `discard` the key when the schema changes.
+        """
+        if key is None:
+            key = schema_key(schema)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+                converting = True
+            else:
+                self.hits += 1
+                converting = False
+        if not converting:
+            return flight.wait()
+
+        try:
+            result = voluptuary.to_validator(
+                schema, backend=self._backend, max_errors=self._max_errors,
+                check_formats=self._check_formats,
+            )
+            size = self._sizeof(schema)
+        except BaseException as e:
+            with self._lock:
+                self._land(key, flight)
+            flight.set(error=e)
+            raise
+        with self._lock:
+            # unless the key was discarded during the conversion
+            if self._land(key, flight):
+                self._entries[key] = (result, size)
+                self.size += size
+                self._evict()
+        flight.set(result)
+        return result
+
+    def discard(self, key):
+        """Forget the schema registered under `key`, if any
+
+        A conversion in progress for the key isn't registered when it ends.
+        """
+        with self._lock:
+            self._flights.pop(key, None)
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._flights.clear()
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return RegistryStats(
+                self.hits, self.misses, self.evictions, len(self._entries),
+                self.size,
+            )
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _land(self, key, flight):
+        """Remove a finished flight, returning whether it was still current
+        """
+        if self._flights.get(key) is not flight:
+            return False
+        del self._flights[key]
+        return True
+
+    def _evict(self):
+        # keeps the entry which was just added, even if it's too large
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1